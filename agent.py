@@ -1,10 +1,16 @@
+import argparse
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from connectors.factory import get_provider
-from core.analyzer import ContextAnalyzer
-from core.file_manager import FileManager
+from core import operations
+from core.diff import preview
+from core.batch import ON_EDIT
+from core.file_manager import FSYNC_POLICIES
+from core.manifest import EDITED, Manifest
+from core.writer import BackgroundWriter
 
-# --- Configuration Loader (no changes) ---
+# --- Configuration Loader ---
 def load_config():
     try:
         with open('config.json', 'r') as f:
@@ -14,65 +20,98 @@ def load_config():
     except json.JSONDecodeError:
         return {"error": "config.json is not formatted correctly."}
 
-# --- Function to Handle Model Creation (no changes) ---
-def handle_create_model(ai_provider, project_path):
+# --- Generated Code Preview ---
+def show_code(result, changes, label="C# Code"):
+    """Prints new files in full and, for files that exist, only what would change."""
+    if not changes["exists"]:
+        print(f"\n--- 🤖 Generated {label} ---\n" + result["code"] + "\n-----------------------------\n")
+    elif changes["identical"]:
+        print(f"\nℹ️ {result['file_path']} already holds exactly this code.")
+    else:
+        print(f"\n--- 🤖 Changes to {result['file_path']} (+{changes['added']} -{changes['removed']}) ---")
+        print("\n".join(changes["diff"]) + "\n-----------------------------\n")
+
+# --- Save Confirmation ---
+def confirm_save(writer, file_path, question="Do you want to save this file?"):
+    """Asks before saving, warning first if the file was edited by hand since Synapse generated it."""
+    manifest = writer.file_manager.manifest_for(file_path)
+    if manifest is not None and manifest.state(file_path) == EDITED:
+        print(f"⚠️ {file_path} was edited by hand since Synapse generated it; saving overwrites those edits.")
+    return input(f"{question} [y/n]: ").lower() == 'y'
+
+# --- Function to Handle Model Creation ---
+def handle_create_model(ai_provider, project_path, writer):
     print("\n--- Create New C# Model ---")
     if not os.path.isdir(project_path):
         print(f"❌ Error: Project path '{project_path}' does not exist.")
         return
     model_name = input("Enter the model name (e.g., Product, User):\n> ").strip().capitalize()
     properties = input("Enter the properties as a comma-separated list (e.g., string Name, decimal Price):\n> ")
-    project_name = os.path.basename(project_path)
-    namespace = f"{project_name}.Models"
-    prompt = f"""Generate a C# model class file. Namespace: {namespace}, Model Name: {model_name}, Properties: {properties}. Instructions: Create a public class with an 'Id' property. Add specified properties with data annotations. Return only raw C# code."""
     print("\n✅ Prompt engineered. Generating C# code...")
-    generated_code = ai_provider.generate_text(prompt).strip()
-    print("\n--- 🤖 Generated C# Code ---\n" + generated_code + "\n-----------------------------\n")
-    if input("Do you want to save this file? [y/n]: ").lower() == 'y':
-        FileManager().create_file(os.path.join(project_path, "Models", f"{model_name}.cs"), generated_code)
+    result = operations.create_model(ai_provider, project_path, model_name, properties)
+    show_code(result, preview(result["file_path"], result["code"]))
+    if confirm_save(writer, result["file_path"]):
+        writer.write(result["file_path"], result["code"])
     else:
         print("❌ Aborted.")
 
-# --- Function for Controller Creation (no changes) ---
-def handle_create_controller(ai_provider, project_path):
+# --- Function for Controller Creation ---
+def handle_create_controller(ai_provider, project_path, writer):
     print("\n--- Create New C# Controller ---")
     if not os.path.isdir(project_path):
         print(f"❌ Error: Project path '{project_path}' does not exist.")
         return
     model_name = input("Enter the Model name for the controller (e.g., Product):\n> ").strip().capitalize()
-    context_name = input("Enter your DbContext class name (e.g., ApplicationDbContext):\n> ").strip()
-    project_name = os.path.basename(project_path)
-    controller_name = f"{model_name}sController"
-    prompt = f"""Generate a complete C# controller with full async CRUD actions. Project: {project_name}, Model: {model_name}, DbContext: {context_name}, Controller: {controller_name}. Instructions: Inherit from Controller, use DI for the DbContext, generate Index, Details, Create (GET/POST), Edit (GET/POST), Delete (GET/POST) actions. Use [ValidateAntiForgeryToken]. Return only raw C# code."""
+    # Every lookup below shares one refresh of the project index
+    analyzer = operations.load_analyzer(project_path)
+    detected = operations.find_context(project_path, model_name, analyzer)
+    if detected:
+        context_name = input(f"Enter your DbContext class name [{detected}]:\n> ").strip() or detected
+    else:
+        context_name = input("Enter your DbContext class name (e.g., ApplicationDbContext):\n> ").strip()
     print("\n✅ Prompt engineered. Generating C# controller code...")
-    generated_code = ai_provider.generate_text(prompt).strip()
-    print("\n--- 🤖 Generated C# Code ---\n" + generated_code + "\n-----------------------------\n")
-    if input("Do you want to save this file? [y/n]: ").lower() == 'y':
-        FileManager().create_file(os.path.join(project_path, "Controllers", f"{controller_name}.cs"), generated_code)
+    result = operations.create_controller(ai_provider, project_path, model_name, context_name, analyzer=analyzer)
+    if "error" in result:
+        print(f"❌ {result['error']}")
+        return
+    show_code(result, preview(result["file_path"], result["code"]))
+    if confirm_save(writer, result["file_path"]):
+        writer.write(result["file_path"], result["code"])
+        model = operations.describe_model(project_path, model_name, analyzer)
+        if model and not model["db_set"] and input(f"Add a DbSet<{model_name}> to {context_name}? [y/n]: ").lower() == 'y':
+            patched = operations.ensure_db_set(project_path, model_name, context_name, analyzer)
+            if "error" in patched:
+                print(f"❌ {patched['error']}")
     else:
         print("❌ Aborted.")
 
-# --- Function for General Analysis (no changes) ---
+# --- Function for General Analysis ---
 def handle_general_analysis(ai_provider, project_path):
     print("\n🔍 Running general analysis...")
-    analyzer = ContextAnalyzer(project_path)
-    report = analyzer.analyze()
-    if "error" in report:
-        print(f"❌ Analysis failed: {report['error']}")
-        return
-    done_items = [f"Model '{m}' has a Controller." for m in report["models"] if m in report["controllers"]]
-    remaining_items = [f"Model '{m}' is missing a Controller." for m in report["models"] if m not in report["controllers"]]
-    if not done_items and not remaining_items:
+    status = operations.general_analysis(ai_provider, project_path)
+    if "error" in status:
+        print(f"❌ Analysis failed: {status['error']}")
+        return
+    if len(status["projects"]) > 1:
+        print("📦 Projects: " + ", ".join(f"{name} ({ns})" for name, ns in status["projects"].items()))
+    if status["changes"]:
+        print("🔄 Changes since the last analysis:")
+        for key, change in status["changes"].items():
+            for name in change["added"]:
+                print(f"   + {key}: {name}")
+            for name in change["removed"]:
+                print(f"   - {key}: {name}")
+    elif status["changes"] is not None:
+        print("ℹ️ No changes since the last analysis.")
+    if status["summary"] is None:
         print("ℹ️ No models found to analyze.")
         return
-    status_report = f"Completed: {', '.join(done_items) or 'None'}. Missing: {', '.join(remaining_items) or 'None'}."
-    prompt = f"You are an expert ASP.NET project manager. Based on this status, give a brief, friendly summary and suggest the next logical step. Status: {status_report}"
-    print("✅ Analysis logic complete. Generating summary...")
-    ai_summary = ai_provider.generate_text(prompt)
-    print("\n--- 🤖 AI Project Analysis ---\n" + ai_summary + "\n-----------------------------\n")
+    reused = " (summary reused, project unchanged)" if status["cached"] else ""
+    print(f"✅ Analysis logic complete{reused}.")
+    print("\n--- 🤖 AI Project Analysis ---\n" + status["summary"] + "\n-----------------------------\n")
 
-# --- NEW Function for View Generation ---
-def handle_generate_views(ai_provider, project_path):
+# --- Function for View Generation ---
+def handle_generate_views(ai_provider, project_path, writer):
     """Orchestrates the generation of all 5 standard CRUD views for a model."""
     print("\n--- Generate CRUD Views ---")
     if not os.path.isdir(project_path):
@@ -80,74 +119,217 @@ def handle_generate_views(ai_provider, project_path):
         return
 
     model_name = input("Enter the Model name to generate views for (e.g., Product):\n> ").strip().capitalize()
-    properties_str = input(f"Enter the properties of the '{model_name}' model (e.g., Name, Price, CreatedDate):\n> ")
-    
-    project_name = os.path.basename(project_path)
-    view_folder_path = os.path.join(project_path, "Views", f"{model_name}s")
-    views_to_generate = ["Index", "Create", "Edit", "Details", "Delete"]
-
-    for view_name in views_to_generate:
-        print(f"\n--- Generating '{view_name}' view for '{model_name}' ---")
-        
-        prompt = f"""
-        You are an expert ASP.NET Core developer specializing in Razor views.
-        Generate the C# Razor code for the '{view_name}.cshtml' view for a model named '{model_name}'.
-
-        Project Namespace: {project_name}
-        Model Name: {model_name}
-        Model Properties: {properties_str}
-
-        Specific Instructions for '{view_name}' view:
-        - Index View: Create a table listing all items. Include columns for properties. Add 'Edit', 'Details', 'Delete' links for each row and a 'Create New' link at the top.
-        - Create View: Generate a form with input fields for all specified properties. Use 'asp-for' tag helpers. Include a 'Create' button and a 'Back to List' link.
-        - Edit View: Generate a form similar to the Create view but include a hidden input for the 'Id'.
-        - Details View: Display all properties of a single item in a definition list (`<dl>`). Include 'Edit' and 'Back to List' links.
-        - Delete View: Display the details of the item to be deleted and a confirmation form with a 'Delete' button.
-        
-        The model is located at `@model {project_name}.Models.{model_name}`.
-        Only return the raw C# Razor code for the {view_name}.cshtml file. Do not include any extra text or markdown.
-        """
-        
-        generated_code = ai_provider.generate_text(prompt).strip()
-        print("\n--- 🤖 Generated Razor Code ---\n" + generated_code + "\n-----------------------------\n")
-
-        if input(f"Do you want to save this '{view_name}.cshtml' file? [y/n]: ").lower() == 'y':
-            FileManager().create_file(os.path.join(view_folder_path, f"{view_name}.cshtml"), generated_code)
-        else:
-            print("❌ Aborted for this file.")
+    model = operations.describe_model(project_path, model_name)
+    hint = " (leave empty to use the properties found in the project)" if model else ""
+    properties_str = input(f"Enter the properties of the '{model_name}' model (e.g., Name, Price, CreatedDate){hint}:\n> ")
+
+    def prepare(view_name):
+        result = operations.generate_view(ai_provider, project_path, model_name, properties_str, view_name, model=model)
+        return result, preview(result["file_path"], result["code"])
+
+    # The next view is generated and diffed in the background while the user reviews this one
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        upcoming = executor.submit(prepare, operations.VIEW_NAMES[0])
+        for index, view_name in enumerate(operations.VIEW_NAMES):
+            print(f"\n--- Generating '{view_name}' view for '{model_name}' ---")
+            result, changes = upcoming.result()
+            if index + 1 < len(operations.VIEW_NAMES):
+                upcoming = executor.submit(prepare, operations.VIEW_NAMES[index + 1])
+            show_code(result, changes, "Razor Code")
+
+            if confirm_save(writer, result["file_path"], f"Do you want to save this '{view_name}.cshtml' file?"):
+                writer.write(result["file_path"], result["code"])
+            else:
+                print("❌ Aborted for this file.")
     print("\n✅ View generation process complete.")
 
 
+# --- Command Line Arguments ---
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Project Synapse: AI scaffolding for ASP.NET projects.")
+    parser.add_argument("--cache", action="store_true",
+                        help="Answer repeated prompts from the response cache (also 'response_cache.enabled' in config.json).")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser("serve", help="Run a local HTTP API with a job queue and worker pool.")
+    serve_parser.add_argument("--host", help="Interface to bind (default 127.0.0.1).")
+    serve_parser.add_argument("--port", type=int, help="Port to listen on (default 8765).")
+    serve_parser.add_argument("--workers", type=int, help="Number of worker threads (default 2).")
+    serve_parser.add_argument("--queue-size", type=int, help="Maximum number of queued jobs (default 32).")
+    serve_parser.add_argument("--verbose", action="store_true", help="Log every HTTP request.")
+    serve_parser.add_argument("--watch", action="store_true", help="Watch analysed and searched projects so their index stays hot.")
+
+    batch_parser = subparsers.add_parser("batch", help="Scaffold many entities from a JSON spec.")
+    batch_parser.add_argument("spec", help="Path to the batch spec JSON file.")
+    batch_parser.add_argument("--dry-run", action="store_true", help="Plan and estimate the run without calling the provider.")
+    batch_parser.add_argument("--force", action="store_true", help="Regenerate files even if the manifest says they are up to date.")
+    batch_parser.add_argument("--workers", type=int, default=1, help="Number of parallel generation calls (default 1).")
+    batch_parser.add_argument("--fsync", choices=FSYNC_POLICIES, default="file",
+                              help="Sync the written files (default) or leave it to the OS.")
+    batch_parser.add_argument("--on-edit", choices=ON_EDIT, default="skip",
+                              help="For files edited by hand: keep them (default), overwrite with a warning or merge.")
+
+    find_parser = subparsers.add_parser("find", help="Search the project's types, properties and files.")
+    find_parser.add_argument("query", help="Name or part of a name; 'Folder/Name' also matches the path.")
+    find_parser.add_argument("--project", required=True, help="Path to the ASP.NET project.")
+    find_parser.add_argument("--fuzzy", action="store_true", help="Also list near matches (typos, missing letters).")
+    find_parser.add_argument("--limit", type=int, default=20, help="Maximum number of results (default 20).")
+    find_parser.add_argument("--references", action="store_true", help="Also list the controllers that mention the query.")
+
+    workspace_parser = subparsers.add_parser("workspace", help="Scaffold and analyse several projects in one run.")
+    workspace_parser.add_argument("workspace", help="Path to the workspace JSON file.")
+    workspace_parser.add_argument("--dry-run", action="store_true", help="Plan and estimate the run without calling the provider.")
+    workspace_parser.add_argument("--force", action="store_true", help="Regenerate files even if the manifest says they are up to date.")
+    workspace_parser.add_argument("--analyze", action="store_true", help="Also run the general analysis for every project.")
+    workspace_parser.add_argument("--workers", type=int, default=1, help="Size of the worker pool shared by all projects (default 1).")
+    workspace_parser.add_argument("--fsync", choices=FSYNC_POLICIES, default="file",
+                                  help="Sync the written files (default) or leave it to the OS.")
+    workspace_parser.add_argument("--on-edit", choices=ON_EDIT, default="skip",
+                                  help="For files edited by hand: keep them (default), overwrite with a warning or merge.")
+    return parser.parse_args(argv)
+
+# --- Server Mode ---
+def run_server(ai_provider, config, args):
+    from core.server import serve
+    server_config = config.get("server", {})
+    serve(
+        ai_provider,
+        host=args.host or server_config.get("host", "127.0.0.1"),
+        port=args.port or server_config.get("port", 8765),
+        workers=args.workers or server_config.get("workers", 2),
+        queue_size=args.queue_size or server_config.get("queue_size", 32),
+        verbose=args.verbose,
+        watch=args.watch or server_config.get("watch", False),
+    )
+
+# --- Batch Scaffolding ---
+def run_batch(ai_provider, args):
+    from core import batch
+    spec = batch.load_spec(args.spec)
+    if "error" in spec:
+        print(f"❌ {spec['error']}")
+        return
+    plan = batch.build_plan(ai_provider, spec, force=args.force, on_edit=args.on_edit)
+    if "error" in plan:
+        print(f"❌ {plan['error']}")
+        return
+    batch.print_estimate(batch.estimate_plan(ai_provider, plan), plan["project_path"])
+    if args.dry_run:
+        print("\nℹ️ Dry run: nothing was generated.")
+        return
+    results = batch.run_plan(ai_provider, plan, workers=args.workers, fsync=args.fsync)
+    print(f"\n✅ Batch complete: {results['saved']} saved ({results['merged']} merged), {results['unchanged']} unchanged "
+          f"(not rewritten), {results['skipped']} up to date, {results['kept']} kept (edited by hand), {results['failed']} failed.")
+
+# --- Symbol Search ---
+def run_find(args):
+    results = operations.find_symbols(args.project, args.query, limit=args.limit, fuzzy=args.fuzzy)
+    if isinstance(results, dict):
+        print(f"❌ {results['error']}")
+        return
+    if not results:
+        print(f"ℹ️ Nothing matches '{args.query}'.")
+    for match in results:
+        print(f"{match['name']:<32} {match['kind']:<10} {match['path']}  ({match['container']})")
+    if args.references:
+        references = operations.find_references(args.project, args.query)
+        print(f"\n🔗 Controllers referencing '{args.query}': " + (", ".join(r["controller"] for r in references) or "none"))
+
+# --- Multi-Project Workspace ---
+def run_workspace(ai_provider, args):
+    from core import batch
+    from core.workspace import Workspace, load_workspace
+    definition = load_workspace(args.workspace)
+    if "error" in definition:
+        print(f"❌ {definition['error']}")
+        return
+    with Workspace(ai_provider, definition["projects"], workers=args.workers, fsync=args.fsync) as workspace:
+        plans = workspace.plan(force=args.force, on_edit=args.on_edit)
+        for plan in plans:
+            if "error" in plan:
+                print(f"❌ {plan['error']}")
+                return
+        if plans:
+            estimates = [batch.estimate_plan(ai_provider, plan) for plan in plans]
+            for plan, estimate in zip(plans, estimates):
+                batch.print_estimate(estimate, plan["project_path"])
+            if len(plans) > 1:
+                batch.print_estimate(batch.combine_estimates(estimates), f"workspace ({len(plans)} projects)")
+        if args.dry_run:
+            print("\nℹ️ Dry run: nothing was generated.")
+            return
+        if plans:
+            for plan, results in zip(plans, workspace.run(plans)):
+                print(f"✅ {plan['project_path']}: {results['saved']} saved ({results['merged']} merged), "
+                      f"{results['unchanged']} unchanged, {results['skipped']} up to date, "
+                      f"{results['kept']} kept (edited by hand), {results['failed']} failed.")
+        if args.analyze:
+            for project_path, result in workspace.analyze().items():
+                if "error" in result:
+                    print(f"\n❌ Analysis of {project_path} failed: {result['error']}")
+                elif result["summary"] is None:
+                    print(f"\nℹ️ {project_path}: no models found to analyze.")
+                else:
+                    print(f"\n--- 🤖 AI Project Analysis: {project_path} ---\n" + result["summary"] + "\n-----------------------------\n")
+
 # --- Main Function with Final Menu ---
-def main():
+def main(argv=None):
+    args = parse_args(argv)
     print("🚀 Welcome to Project Synapse!")
+    if args.command == "find":
+        # Works on the local index only, no provider needed
+        run_find(args)
+        return
     config = load_config()
     if "error" in config:
         print(f"❌ {config['error']}")
         return
+    if args.cache:
+        config.setdefault("response_cache", {})["enabled"] = True
     ai_provider = get_provider(config)
     if not ai_provider:
         print("❌ Could not initialize AI provider. Exiting.")
         return
+    if args.command == "serve":
+        run_server(ai_provider, config, args)
+        return
+    if args.command == "batch":
+        run_batch(ai_provider, args)
+        return
+    if args.command == "workspace":
+        run_workspace(ai_provider, args)
+        return
     project_path = input("First, please enter the full path to your target ASP.NET project:\n> ")
-    while True:
-        print("\n--- Synapse Menu ---")
-        print("[1] Create a new C# Model")
-        print("[2] Create a new C# Controller")
-        print("[3] Generate CRUD Views for a Model")
-        print("[4] Run General Project Analysis")
-        print("[q] Quit")
-        choice = input("> ").lower()
-
-        if choice == '1': handle_create_model(ai_provider, project_path)
-        elif choice == '2': handle_create_controller(ai_provider, project_path)
-        elif choice == '3': handle_generate_views(ai_provider, project_path)
-        elif choice == '4': handle_general_analysis(ai_provider, project_path)
-        elif choice == 'q':
-            print("👋 Goodbye!")
-            break
-        else:
-            print("Invalid choice, please try again.")
+    if config.get("watch_project") and os.path.isdir(project_path):
+        from core.watcher import watch_project
+        print(f"👀 Watching project for changes ({watch_project(project_path).backend}).")
+    # Saves are written in the background so the next generation doesn't wait on the disk
+    writer_config = config.get("writer", {})
+    writer = BackgroundWriter(workers=writer_config.get("workers", 2), queue_size=writer_config.get("queue_size", 64)).start()
+    if os.path.isdir(project_path):
+        writer.file_manager.track(Manifest(project_path))
+    try:
+        while True:
+            print("\n--- Synapse Menu ---")
+            print("[1] Create a new C# Model")
+            print("[2] Create a new C# Controller")
+            print("[3] Generate CRUD Views for a Model")
+            print("[4] Run General Project Analysis")
+            print("[q] Quit")
+            choice = input("> ").lower()
+
+            if choice == '1': handle_create_model(ai_provider, project_path, writer)
+            elif choice == '2': handle_create_controller(ai_provider, project_path, writer)
+            elif choice == '3': handle_generate_views(ai_provider, project_path, writer)
+            elif choice == '4': handle_general_analysis(ai_provider, project_path)
+            elif choice == 'q':
+                print("👋 Goodbye!")
+                break
+            else:
+                print("Invalid choice, please try again.")
+    finally:
+        for paths, error in writer.close():
+            print(f"❌ Could not save {', '.join(paths)}: {error}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
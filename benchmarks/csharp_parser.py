@@ -0,0 +1,100 @@
+"""
+Measures core.csharp.parse_csharp throughput in MB/s on synthetic entity,
+DbContext and controller sources (or on the .cs files of a real project).
+
+    python benchmarks/csharp_parser.py                 # ~8 MB of synthetic C#
+    python benchmarks/csharp_parser.py --project PATH  # every .cs file under PATH
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.csharp import parse_csharp
+from core.indexer import scan_project
+
+ENTITY = b'''using System.ComponentModel.DataAnnotations;
+// Entity %(i)d: comments with class Fake { } must be ignored
+namespace Shop.Models
+{
+    [Table("Products%(i)d")]
+    public partial class Product%(i)d : BaseEntity
+    {
+        [Key]
+        public int Id { get; set; }
+        [Required, StringLength(100)]
+        public string Name { get; set; } = "class Nope {";
+        public decimal? Price { get; set; }
+        public int CategoryId { get; set; }
+        public virtual Category Category { get; set; }
+        public virtual ICollection<OrderLine> Lines { get; set; } = new List<OrderLine>();
+        public string Display => $"{Name} ({Price:C})";
+        /* block comment { */
+        public override string ToString() { return @"verbatim "" {" + Name; }
+    }
+}
+'''
+
+CONTROLLER = b'''namespace Shop.Controllers;
+
+public class Products%(i)dController : Controller
+{
+    private readonly AppDbContext _context;
+    public Products%(i)dController(AppDbContext context) { _context = context; }
+
+    public async Task<IActionResult> Index() => View(await _context.Products.ToListAsync());
+
+    [HttpPost, ValidateAntiForgeryToken]
+    public async Task<IActionResult> Create([Bind("Id,Name,Price")] Product product)
+    {
+        if (ModelState.IsValid) { _context.Add(product); await _context.SaveChangesAsync(); return RedirectToAction(nameof(Index)); }
+        return View(product);
+    }
+}
+'''
+
+
+def synthetic_sources(megabytes):
+    sources = []
+    size = 0
+    i = 0
+    while size < megabytes * 1024 * 1024:
+        for template in (ENTITY, CONTROLLER):
+            data = template % {b"i": i}
+            sources.append(data)
+            size += len(data)
+        i += 1
+    return sources
+
+
+def project_sources(project_path):
+    sources = []
+    for rel_path in scan_project(project_path, extensions=(".cs",)):
+        with open(os.path.join(project_path, rel_path), 'rb') as f:
+            sources.append(f.read())
+    return sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--project", help="Parse the .cs files of this project instead of synthetic sources.")
+    parser.add_argument("--megabytes", type=float, default=8, help="Size of the synthetic corpus (default 8).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs to take the best of (default 3).")
+    args = parser.parse_args()
+
+    sources = project_sources(args.project) if args.project else synthetic_sources(args.megabytes)
+    total = sum(len(data) for data in sources)
+    best = None
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        types = sum(len(parse_csharp(data)) for data in sources)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{len(sources)} files, {total / 1e6:.1f} MB, {types} types")
+    print(f"parse_csharp: {total / 1e6 / best:.1f} MB/s ({best:.2f}s best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Creating the directories for 10k files spread over a scaffold-shaped tree
+(Views/<Entity>/ folders): the old per-file os.path.exists + os.makedirs against
+FileManager's session directory cache, per file and up front for the whole batch.
+Besides the time it counts stat/mkdir calls, which are what costs on NFS or SMB.
+Then times whole create_file runs (fsync off) to show the share of the write.
+
+    python benchmarks/directory_cache.py                   # 10000 files
+    python benchmarks/directory_cache.py --files 2000 --dir /mnt/share/tmp
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.file_manager import FileManager
+
+
+def file_paths(root, files, per_folder=5):
+    return [os.path.join(root, "Views", f"Entity{i // per_folder}", f"View{i % per_folder}.cshtml") for i in range(files)]
+
+
+@contextlib.contextmanager
+def counting_calls(counts):
+    """Counts os.stat and os.mkdir calls (os.path.exists and os.makedirs go through them)."""
+    originals = os.stat, os.mkdir
+
+    def stat(*args, **kwargs):
+        counts["stat"] += 1
+        return originals[0](*args, **kwargs)
+
+    def mkdir(*args, **kwargs):
+        counts["mkdir"] += 1
+        return originals[1](*args, **kwargs)
+
+    os.stat, os.mkdir = stat, mkdir
+    try:
+        yield counts
+    finally:
+        os.stat, os.mkdir = originals
+
+
+def per_file_makedirs(paths):
+    for path in paths:
+        parent = os.path.dirname(path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent, exist_ok=True)
+
+
+def run(label, workdir, function, paths_for):
+    root = os.path.join(workdir, label.replace(" ", "-"))
+    paths = paths_for(root)
+    counts = {"stat": 0, "mkdir": 0}
+    with contextlib.redirect_stdout(io.StringIO()), counting_calls(counts):
+        started = time.perf_counter()
+        function(paths)
+        elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms   stat: {counts['stat']:6}   mkdir: {counts['mkdir']:5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=10000, help="Number of files (default 10000).")
+    parser.add_argument("--dir", help="Directory to write in (default: a temp dir), e.g. on a network share.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="synapse-bench-", dir=args.dir)
+    paths_for = lambda root: file_paths(root, args.files)
+    try:
+        print(f"Directories for {args.files} files:")
+        run("exists + makedirs per file", workdir, per_file_makedirs, paths_for)
+        cached = FileManager(fsync="off")
+        run("cache, per file", workdir, lambda paths: [cached.make_directories([os.path.dirname(p)]) for p in paths], paths_for)
+        run("cache, whole batch", workdir, FileManager(fsync="off").make_directories,
+            lambda root: [os.path.dirname(path) for path in paths_for(root)])
+
+        print(f"\nWriting {args.files} files (fsync off):")
+        content = "@model Bench.Models.Entity\n<h1>Entity</h1>\n"
+        manager = FileManager(fsync="off")
+        run("create_file", workdir, lambda paths: [manager.create_file(path, content) for path in paths], paths_for)
+        run("transaction", workdir, lambda paths: manager.write_files({path: content for path in paths}), paths_for)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
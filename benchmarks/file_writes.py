@@ -0,0 +1,63 @@
+"""
+Compares writing a scaffold-shaped set of files (one folder of views per entity)
+with independent FileManager.create_file calls against one write transaction,
+under each fsync policy.
+
+    python benchmarks/file_writes.py                  # 2000 files
+    python benchmarks/file_writes.py --files 500 --dir /mnt/share/tmp
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.file_manager import FSYNC_POLICIES, FileManager
+
+VIEW = "@model Bench.Models.Entity{i}\n<h1>Entity {i}</h1>\n" + "<p>@Model.Name</p>\n" * 40
+
+
+def scaffold_files(root, files, per_folder=5):
+    return {os.path.join(root, "Views", f"Entity{i // per_folder}", f"View{i % per_folder}.cshtml"): VIEW.format(i=i)
+            for i in range(files)}
+
+
+def timed(write):
+    # FileManager reports every file; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        write()
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000, help="Number of files per run (default 2000).")
+    parser.add_argument("--dir", help="Directory to write in (default: a temp dir), e.g. on a network share.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="synapse-bench-", dir=args.dir)
+    try:
+        for policy in FSYNC_POLICIES:
+            files = scaffold_files(os.path.join(workdir, f"single-{policy}"), args.files)
+            manager = FileManager(fsync=policy)
+
+            def one_by_one():
+                for file_path, content in files.items():
+                    manager.create_file(file_path, content)
+
+            single = timed(one_by_one)
+            files = scaffold_files(os.path.join(workdir, f"batch-{policy}"), args.files)
+            batched = timed(lambda: manager.write_files(files))
+            print(f"fsync={policy:<9} create_file: {single:6.2f}s   transaction: {batched:6.2f}s   ({single / batched:4.1f}x)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Builds a synthetic solution and times a cold ProjectIndex refresh (scan + parse +
+SQLite write) with 1, 2, 4, ... parser processes up to the machine's core count.
+
+    python benchmarks/parallel_index.py                  # 100k files
+    python benchmarks/parallel_index.py --files 20000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.project_index import ProjectIndex
+
+ENTITY = '''namespace Bench.Module{module}.Models
+{{
+    // Entity {i}
+    public class Entity{i} : BaseEntity
+    {{
+        [Key]
+        public int Id {{ get; set; }}
+        [Required, StringLength(200)]
+        public string Name {{ get; set; }} = "";
+        public decimal Amount {{ get; set; }}
+        public int ParentId {{ get; set; }}
+        public virtual Entity{parent} Parent {{ get; set; }}
+        public virtual ICollection<Entity{child}> Children {{ get; set; }} = new List<Entity{child}>();
+        public override string ToString() => $"{{Name}} ({{Amount}})";
+    }}
+}}
+'''
+
+
+def build_tree(root, files, per_folder=500):
+    for i in range(files):
+        module = i // per_folder
+        folder = os.path.join(root, f"Module{module}", "Models")
+        if i % per_folder == 0:
+            os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"Entity{i}.cs"), 'w', encoding='utf-8') as f:
+            f.write(ENTITY.format(module=module, i=i, parent=max(i - 1, 0), child=i + 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000, help="Number of .cs files to generate (default 100000).")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, cores} | {2 ** k for k in range(1, 7) if 2 ** k < cores})
+    workdir = tempfile.mkdtemp(prefix="synapse-bench-")
+    try:
+        project = os.path.join(workdir, "Bench")
+        print(f"Generating {args.files:,} files...")
+        build_tree(project, args.files)
+        baseline = None
+        for workers in counts:
+            db_path = os.path.join(workdir, f"index-{workers}.db")
+            index = ProjectIndex(project, db_path=db_path, workers=workers)
+            started = time.perf_counter()
+            index.refresh()
+            elapsed = time.perf_counter() - started
+            index.close()
+            baseline = baseline or elapsed
+            print(f"{workers:>3} worker(s): {elapsed:6.2f}s  speedup {baseline / elapsed:4.2f}x")
+        if cores == 1:
+            print("Only one core available: nothing to compare.")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Times core.search.SearchIndex on the symbols of a synthetic solution: building the
+trigram index (in a SQLite file, as the project index keeps it), substring and fuzzy
+queries from a fresh connection, and re-indexing a single file.
+
+    python benchmarks/symbol_search.py                 # 100k files
+    python benchmarks/symbol_search.py --files 20000
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.search import SearchIndex
+
+PROPERTIES = ("Id", "Name", "Amount", "ParentId", "Parent", "Children", "CreatedAt")
+QUERIES = (
+    ("exact", "Entity4242", False),
+    ("prefix", "Entity99", False),
+    ("substring", "ity123", False),
+    ("short", "Id", False),
+    ("path", "Module8/Entity42", False),
+    ("fuzzy", "Enitty4242", True),
+)
+
+
+def synthetic_symbols(files, per_folder=500):
+    for i in range(files):
+        module = i // per_folder
+        properties = [{"name": name, "type": "int", "attributes": []} for name in PROPERTIES]
+        yield f"Module{module}/Models/Entity{i}.cs", [{
+            "kind": "class", "name": f"Entity{i}", "namespace": f"Bench.Module{module}.Models",
+            "modifiers": ["public"], "attributes": [], "bases": [], "properties": properties,
+        }]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000, help="Number of synthetic files (default 100000).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query to take the best of (default 5).")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="synapse-bench-")
+    db_path = os.path.join(workdir, "index.db")
+    try:
+        db = sqlite3.connect(db_path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        index = SearchIndex(db)
+        started = time.perf_counter()
+        with db:
+            for path, symbols in synthetic_symbols(args.files):
+                index.add_path(path, symbols)
+        print(f"build: {time.perf_counter() - started:.2f}s for {args.files:,} files, {len(index):,} distinct names")
+        db.close()
+
+        # A new process (e.g. 'agent.py find') opens the stored index and queries it as is
+        started = time.perf_counter()
+        db = sqlite3.connect(db_path)
+        db.execute("PRAGMA synchronous=NORMAL")
+        index = SearchIndex(db)
+        print(f"open: {(time.perf_counter() - started) * 1000:.2f} ms")
+        for label, query, fuzzy in QUERIES:
+            best = None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                results = index.find(query, fuzzy=fuzzy)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{label:<10} {query!r:<20} {best * 1000:7.2f} ms  {len(results)} results")
+
+        path, symbols = next(synthetic_symbols(1))
+        started = time.perf_counter()
+        with db:
+            index.add_path(path, symbols)
+        print(f"re-index one file: {(time.perf_counter() - started) * 1000:.3f} ms")
+        db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compares the per-view prompts against the old combined prompt that carried
+the instructions for all five views in every call.
+
+    python benchmarks/view_prompts.py            # prompt sizes only
+    python benchmarks/view_prompts.py --live 3   # also time 3 view sets against the configured provider
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import operations
+from core.prompts import VIEW_INSTRUCTIONS, estimate_tokens
+
+PROJECT_PATH = os.path.join("bench", "Shop")
+MODEL_NAME = "Product"
+PROPERTIES = "Name, Description, Price, Stock, CreatedDate"
+
+
+def combined_prompt(view_name):
+    """Rebuilds the old prompt shape: every view's instructions in every call."""
+    prompt = operations.build_view_prompt(PROJECT_PATH, MODEL_NAME, PROPERTIES, view_name)
+    all_views = "\n".join(f"- {name} View: {text}" for name, text in VIEW_INSTRUCTIONS.items())
+    return prompt.replace(f"Instructions: {VIEW_INSTRUCTIONS[view_name]}", f"Specific Instructions:\n{all_views}")
+
+
+def time_view_set(ai_provider, build_prompt):
+    started = time.perf_counter()
+    for view_name in operations.VIEW_NAMES:
+        ai_provider.generate_text(build_prompt(view_name))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", type=int, default=0, metavar="N", help="Time N full view sets against the configured provider.")
+    args = parser.parse_args()
+
+    print(f"{'View':<10}{'combined':>10}{'per-view':>10}{'saved':>8}")
+    total_old = total_new = 0
+    for view_name in operations.VIEW_NAMES:
+        old = estimate_tokens(combined_prompt(view_name))
+        new = estimate_tokens(operations.build_view_prompt(PROJECT_PATH, MODEL_NAME, PROPERTIES, view_name))
+        total_old += old
+        total_new += new
+        print(f"{view_name:<10}{old:>10}{new:>10}{(old - new) / old:>8.0%}")
+    print(f"{'View set':<10}{total_old:>10}{total_new:>10}{(total_old - total_new) / total_old:>8.0%}  (estimated prompt tokens)")
+
+    if args.live:
+        from agent import load_config
+        from connectors.factory import get_provider
+        config = load_config()
+        # Bypass the response cache, otherwise every run after the first is a hit
+        config["response_cache"] = {"enabled": False}
+        ai_provider = get_provider(config)
+        if not ai_provider:
+            return
+        build_new = lambda view_name: operations.build_view_prompt(PROJECT_PATH, MODEL_NAME, PROPERTIES, view_name)
+        old_times = [time_view_set(ai_provider, combined_prompt) for _ in range(args.live)]
+        new_times = [time_view_set(ai_provider, build_new) for _ in range(args.live)]
+        old_avg = sum(old_times) / len(old_times)
+        new_avg = sum(new_times) / len(new_times)
+        print(f"\nView set latency: combined {old_avg:.2f}s, per-view {new_avg:.2f}s ({(old_avg - new_avg) / old_avg:.0%} faster)")
+
+
+if __name__ == "__main__":
+    main()
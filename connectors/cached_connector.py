@@ -0,0 +1,86 @@
+import threading
+from core.response_cache import ResponseCache
+
+
+class CachedConnector:
+    """
+    Wraps any connector and serves repeated prompts from a ResponseCache.
+    Error responses and streams that failed or were cut short are never cached.
+    """
+    def __init__(self, connector, cache):
+        self.connector = connector
+        self.cache = cache
+        self.model_name = getattr(connector, "model_name", None) or getattr(connector, "model", "")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def cache_key(self, prompt):
+        """
+        Returns the cache key a prompt would be stored under for this connector.
+        Prompts rendered from a template carry its name and version in 'cache_tag'.
+        """
+        cache_tag = getattr(prompt, "cache_tag", "")
+        return ResponseCache.key(type(self.connector).__name__, self.model_name, cache_tag, prompt)
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _store(self, key, text):
+        if text and not text.startswith("Error"):
+            self.cache.set(key, text)
+
+    def store(self, prompt, text):
+        """Caches a response the caller read itself, e.g. a stream it stopped early."""
+        self._store(self.cache_key(prompt), text)
+
+    def generate_text(self, prompt):
+        """
+        Returns the cached response for the prompt, calling the connector on a miss.
+        A miss holds the key's lock, so another process asking for the same prompt
+        waits and gets this answer instead of making the same call.
+        """
+        key = self.cache_key(prompt)
+        text = self.cache.get(key)
+        if text is None:
+            with self.cache.lock(key):
+                text = self.cache.get(key)
+                if text is None:
+                    self._count(hit=False)
+                    text = self.connector.generate_text(prompt)
+                    self._store(key, text)
+                    return text
+        self._count(hit=True)
+        return text
+
+    def stream_text(self, prompt):
+        """Streams the response; a cache hit is yielded as a single chunk."""
+        key = self.cache_key(prompt)
+        text = self.cache.get(key)
+        if text is None:
+            with self.cache.lock(key):
+                text = self.cache.get(key)
+                if text is None:
+                    self._count(hit=False)
+                    yield from self._stream_miss(key, prompt)
+                    return
+        self._count(hit=True)
+        yield text
+
+    def _stream_miss(self, key, prompt):
+        if not hasattr(self.connector, "stream_text"):
+            text = self.connector.generate_text(prompt)
+            self._store(key, text)
+            yield text
+            return
+        # Only a stream read to its end is stored. A provider failure raises out of the
+        # loop and a caller stopping early closes this generator, so neither caches a partial answer
+        chunks = []
+        for chunk in self.connector.stream_text(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self._store(key, "".join(chunks))
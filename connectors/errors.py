@@ -0,0 +1,6 @@
+class ProviderError(Exception):
+    """
+    Raised by a connector's stream_text() when the provider fails, before or part way
+    through an answer. A stream can't turn a half-sent answer into an error string the
+    way generate_text() does, so the caller gets an exception instead of a truncated reply.
+    """
@@ -1,11 +1,24 @@
+import os
 from .gemini_connector import GeminiConnector
 from .ollama_connector import OllamaConnector
+from .cached_connector import CachedConnector
+from core.paths import user_cache_dir
+from core.response_cache import ResponseCache
 # We will add imports for other connectors here later
 
 def get_provider(config):
     """
     Reads the config and returns an instance of the active AI provider.
+    When 'response_cache' is enabled the provider is wrapped in a CachedConnector.
     """
+    provider = _create_provider(config)
+    cache_config = config.get('response_cache', {})
+    if provider and cache_config.get('enabled'):
+        cache_dir = os.path.expanduser(cache_config.get('dir') or os.path.join(user_cache_dir(), "responses"))
+        provider = CachedConnector(provider, ResponseCache(cache_dir))
+    return provider
+
+def _create_provider(config):
     active_provider_name = config.get('active_provider')
     providers_config = config.get('providers', {})
 
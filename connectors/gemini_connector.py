@@ -1,4 +1,5 @@
 import google.generativeai as genai
+from .errors import ProviderError
 
 class GeminiConnector:
     """
@@ -29,4 +30,18 @@ class GeminiConnector:
             return response.text
         except Exception as e:
             print(f"Error communicating with Gemini API: {e}")
-            return f"Error: Could not get a response from the API. Details: {e}"
\ No newline at end of file
+            return f"Error: Could not get a response from the API. Details: {e}"
+
+    def stream_text(self, prompt):
+        """
+        Sends a prompt to the Gemini API and yields the response as it is generated.
+        Raises ProviderError if the call fails, even after part of the answer was yielded.
+        """
+        try:
+            print("🧠 Streaming prompt to Gemini API...")
+            for chunk in self.model.generate_content(prompt, stream=True):
+                if chunk.parts:
+                    yield chunk.text
+        except Exception as e:
+            print(f"Error communicating with Gemini API: {e}")
+            raise ProviderError(f"Could not get a response from the API. Details: {e}") from e
@@ -1,5 +1,7 @@
 import requests
 import json
+import threading
+from .errors import ProviderError
 
 class OllamaConnector:
     """
@@ -8,8 +10,18 @@ class OllamaConnector:
     def __init__(self, base_url="http://localhost:11434", model="llama3"):
         self.base_url = f"{base_url}/api/generate"
         self.model = model
+        # One session per thread keeps the HTTP connection to Ollama warm between calls;
+        # requests.Session isn't thread-safe and the server calls from a worker pool
+        self._local = threading.local()
         print("✅ Ollama Connector initialized.")
 
+    @property
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
     def generate_text(self, prompt):
         """
         Sends a prompt to the local Ollama API and returns the response.
@@ -21,7 +33,7 @@ class OllamaConnector:
                 "prompt": prompt,
                 "stream": False  # We want the full response at once
             }
-            response = requests.post(self.base_url, json=payload)
+            response = self.session.post(self.base_url, json=payload)
             response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
 
             # The response from Ollama is a JSON string, we need to parse it
@@ -31,4 +43,39 @@ class OllamaConnector:
         except requests.exceptions.ConnectionError:
             return "Error: Could not connect to the Ollama server. Is it running?"
         except Exception as e:
-            return f"Error communicating with Ollama API: {e}"
\ No newline at end of file
+            return f"Error communicating with Ollama API: {e}"
+
+    def stream_text(self, prompt):
+        """
+        Sends a prompt to the local Ollama API and yields the response as it is generated.
+        Raises ProviderError if the call fails, even after part of the answer was yielded.
+        """
+        try:
+            print(f"🧠 Streaming prompt to local model '{self.model}'...")
+            payload = {
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True
+            }
+            with self.session.post(self.base_url, json=payload, stream=True) as response:
+                response.raise_for_status()
+                # Ollama streams one JSON object per line
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        # Ollama reports failures mid-stream as an 'error' line
+                        raise ProviderError(f"Ollama reported an error: {chunk['error']}")
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        return
+            raise ProviderError("Ollama closed the stream before the answer was done.")
+
+        except ProviderError:
+            raise
+        except requests.exceptions.ConnectionError as e:
+            raise ProviderError("Could not connect to the Ollama server. Is it running?") from e
+        except Exception as e:
+            raise ProviderError(f"Communicating with the Ollama API failed: {e}") from e
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+from core.paths import project_state_dir
+from core.response_cache import ResponseCache
+
+# Report keys that make up the canonical report, in order
+REPORT_KEYS = ("projects", "models", "controllers", "done", "missing")
+# Summaries kept per project (the most recently used win)
+MAX_SUMMARIES = 16
+
+
+def canonical_report(status):
+    """The parts of an analysis that feed the summary, with every list sorted."""
+    report = {}
+    for key in REPORT_KEYS:
+        value = status.get(key)
+        report[key] = dict(sorted(value.items())) if isinstance(value, dict) else sorted(value or [])
+    return report
+
+
+def report_hash(report):
+    return ResponseCache.key(json.dumps(report, sort_keys=True, separators=(",", ":")))
+
+
+def diff_reports(old, new):
+    """Returns {key: {'added': [...], 'removed': [...]}} for the report keys that changed."""
+    changes = {}
+    for key in REPORT_KEYS:
+        before, after = old.get(key) or [], new.get(key) or []
+        if isinstance(after, dict) or isinstance(before, dict):
+            before = [f"{name} ({value})" for name, value in dict(before).items()]
+            after = [f"{name} ({value})" for name, value in dict(after).items()]
+        added = sorted(set(after) - set(before))
+        removed = sorted(set(before) - set(after))
+        if added or removed:
+            changes[key] = {"added": added, "removed": removed}
+    return changes
+
+
+class AnalysisHistory:
+    """
+    Remembers the last analysis report of a project and the AI summaries produced for
+    recent reports, keyed by the report hash plus the provider/model and prompt version,
+    so an unchanged project gets its summary back without a provider call.
+    Stored as .synapse/analysis.json.
+    """
+    def __init__(self, project_path):
+        self.path = os.path.join(project_state_dir(project_path), "analysis.json")
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.last_report = data.get("last_report")
+        self.summaries = data.get("summaries", {})
+
+    @staticmethod
+    def key(report, provider, prompt_tag):
+        return f"{report_hash(report)}:{provider}:{prompt_tag}"
+
+    def summary(self, key):
+        entry = self.summaries.get(key)
+        return entry["summary"] if entry else None
+
+    def record(self, report, key=None, summary=None):
+        """Stores the report as the latest one and, if given, its summary under 'key'."""
+        with self._lock:
+            self.last_report = report
+            if key is not None and summary is not None:
+                self.summaries[key] = {"summary": summary, "used_at": time.time()}
+            elif key in self.summaries:
+                self.summaries[key]["used_at"] = time.time()
+            if len(self.summaries) > MAX_SUMMARIES:
+                newest = sorted(self.summaries.items(), key=lambda item: item[1]["used_at"], reverse=True)
+                self.summaries = dict(newest[:MAX_SUMMARIES])
+            self._save()
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": 1, "last_report": self.last_report, "summaries": self.summaries}, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save the analysis history: {e}")
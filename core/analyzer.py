@@ -1,44 +1,54 @@
 import os
+from core.project_index import open_index
 
 class ContextAnalyzer:
     """
     Scans and analyzes a given project directory to identify key components like models and controllers.
     """
-    def __init__(self, project_path):
+    def __init__(self, project_path, index=None):
         self.project_path = project_path
         self.analysis_report = {}
+        self.index = index
+        self.files = None
+        self.symbol_table = None
+        self.entity_graph = None
+
+    def refresh(self):
+        """
+        Brings the persistent project index up to date; only files whose size or
+        mtime changed since the last run are re-parsed. While a ProjectWatcher keeps
+        the index live this is answered from memory without touching the disk. The
+        SymbolTable and the model/controller lists are the index's cached ones.
+        """
+        if self.index is None:
+            self.index = open_index(self.project_path)
+        if not self.index.live:
+            self.index.refresh()
+        self.files = self.index.files()
+        self.symbol_table = self.index.symbol_table()
+        self.entity_graph = self.index.entity_graph()
+        return self.files
 
     def analyze(self):
         """
-        Performs a deep analysis to find C# models and controllers by filename.
+        Performs a deep analysis to find C# models and controllers from the parsed symbols.
+        Models are entity-like classes and records wherever they live (Models folders, Areas,
+        feature folders); controllers are classes deriving from Controller/ControllerBase
+        or named '*Controller'.
         """
         if not os.path.isdir(self.project_path):
             self.analysis_report = {"error": "The provided path is not a valid directory."}
             return self.analysis_report
+        self.refresh()
 
-        models_path = os.path.join(self.project_path, "Models")
-        controllers_path = os.path.join(self.project_path, "Controllers")
-
-        found_models = self._find_classes_in_dir(models_path, ".cs")
+        roles = self.index.roles()
+        found_models = roles["models"]
         # For controllers, we strip the 'Controller' suffix to match them to models
-        found_controllers = [name.replace("Controller", "") for name in self._find_classes_in_dir(controllers_path, "Controller.cs")]
+        found_controllers = [name[:-len("Controller")] if name.endswith("Controller") else name
+                             for name in roles["controllers"]]
 
         self.analysis_report = {
             "models": found_models,
             "controllers": found_controllers
         }
         return self.analysis_report
-
-    def _find_classes_in_dir(self, directory, suffix):
-        """Helper function to find files with a specific suffix and extract a class name."""
-        if not os.path.isdir(directory):
-            return []
-        
-        class_names = []
-        for filename in os.listdir(directory):
-            if filename.endswith(suffix):
-                # 'Product.cs' -> 'Product'
-                # 'ProductsController.cs' -> 'Products'
-                class_name = filename.replace(suffix, "")
-                class_names.append(class_name)
-        return class_names
\ No newline at end of file
@@ -0,0 +1,290 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from connectors.cached_connector import CachedConnector
+from core import operations, stats
+from core.file_manager import FileManager
+from core.manifest import EDITED, Manifest
+from core.merge import merge3
+from core.prompts import estimate_tokens
+from core.response_cache import ResponseCache
+from core.writer import BackgroundWriter
+
+ARTIFACTS = ("model", "controller", "views")
+
+# What to do when a file to regenerate was edited by hand since Synapse wrote it:
+# keep the edited file, overwrite it with a warning, or three-way merge the edits in.
+ON_EDIT = ("skip", "warn", "merge")
+
+
+def load_spec(spec_path):
+    """
+    Loads a batch spec:
+      {"project_path": "...", "context_name": "AppDbContext", "artifacts": ["model", "controller", "views"],
+       "entities": [{"name": "Product", "properties": "string Name, decimal Price"}, ...]}
+    'context_name' and 'artifacts' can also be set per entity; without a 'context_name' the
+    DbContext is taken from the project's entity graph. Returns the spec, or a dict with 'error'.
+    """
+    try:
+        with open(spec_path, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+    except FileNotFoundError:
+        return {"error": f"Batch spec '{spec_path}' not found."}
+    except json.JSONDecodeError:
+        return {"error": f"Batch spec '{spec_path}' is not formatted correctly."}
+    if not spec.get("project_path") or not isinstance(spec.get("entities"), list):
+        return {"error": "Batch spec needs a 'project_path' and an 'entities' list."}
+    return spec
+
+
+def view_properties(properties):
+    """'string Name, decimal Price' -> 'Name, Price'. Names without a type are kept as they are."""
+    names = [item.split()[-1] for item in properties.split(",") if item.strip()]
+    return ", ".join(names)
+
+
+def build_plan(ai_provider, spec, force=False, on_edit="skip"):
+    """
+    Expands the spec into one job per generated file and classifies each job as
+    'up-to-date' (manifest says the file came from the same inputs), 'edited'
+    (changed by hand since it was generated, kept with on_edit='skip'), 'cached'
+    (response cache has the answer) or 'generate' (needs a provider call).
+    Only files whose size or mtime moved are read to detect edits.
+    Returns the plan, or a dict with 'error'.
+    """
+    project_path = spec["project_path"]
+    if not os.path.isdir(project_path):
+        return {"error": f"Project path '{project_path}' does not exist."}
+    if on_edit not in ON_EDIT:
+        return {"error": f"Unknown on_edit policy '{on_edit}'. Expected one of: {', '.join(ON_EDIT)}."}
+    manifest = Manifest(project_path)
+    # One index refresh serves every lookup of the plan; made on the first controller
+    analyzer = None
+    jobs = []
+    for entity in spec["entities"]:
+        if not entity.get("name"):
+            return {"error": f"Every entity needs a 'name': {entity}"}
+        model_name = entity["name"].strip().capitalize()
+        properties = entity.get("properties", "")
+        context_name = entity.get("context_name") or spec.get("context_name", "")
+        for artifact in entity.get("artifacts") or spec.get("artifacts") or ARTIFACTS:
+            if artifact == "model":
+                prompt = operations.build_model_prompt(project_path, model_name, properties)
+                jobs.append(_job("model", model_name, operations.artifact_path(project_path, "model", model_name), prompt))
+            elif artifact == "controller":
+                analyzer = operations.load_analyzer(project_path, analyzer)
+                model = operations.describe_model(project_path, model_name, analyzer)
+                context = context_name or (model and model["context"]) or operations.find_context(project_path, model_name, analyzer)
+                if not context:
+                    return {"error": f"Entity '{model_name}' needs a 'context_name' to generate a controller."}
+                prompt = operations.build_controller_prompt(project_path, model_name, context, model)
+                jobs.append(_job("controller", model_name, operations.artifact_path(project_path, "controller", model_name), prompt))
+            elif artifact == "views":
+                names = entity.get("view_properties") or view_properties(properties)
+                for view_name in operations.VIEW_NAMES:
+                    prompt = operations.build_view_prompt(project_path, model_name, names, view_name)
+                    jobs.append(_job("view", model_name, operations.artifact_path(project_path, "view", model_name, view_name), prompt))
+            else:
+                return {"error": f"Unknown artifact '{artifact}'. Expected one of: {', '.join(ARTIFACTS)}."}
+
+    for job in jobs:
+        if not force and manifest.is_current(job["file_path"], job["inputs_hash"]):
+            job["state"] = "up-to-date"
+            continue
+        job["edited"] = manifest.state(job["file_path"]) == EDITED
+        if job["edited"] and on_edit == "skip":
+            job["state"] = "edited"
+        elif isinstance(ai_provider, CachedConnector) and ai_provider.cache_key(job["prompt"]) in ai_provider.cache:
+            job["state"] = "cached"
+        else:
+            job["state"] = "generate"
+    return {"project_path": project_path, "manifest": manifest, "jobs": jobs, "on_edit": on_edit}
+
+
+def _job(kind, model_name, file_path, prompt):
+    return {
+        "kind": kind,
+        "entity": model_name,
+        "file_path": file_path,
+        "prompt": prompt,
+        "inputs_hash": ResponseCache.key(prompt.cache_tag, prompt),
+    }
+
+
+def estimate_plan(ai_provider, plan):
+    """Estimates tokens and duration for the jobs that would call the provider."""
+    counts = {"up-to-date": 0, "edited": 0, "cached": 0, "generate": 0}
+    prompt_tokens = output_tokens = 0
+    for job in plan["jobs"]:
+        counts[job["state"]] += 1
+        if job["state"] == "generate":
+            prompt_tokens += estimate_tokens(job["prompt"])
+            output_tokens += stats.expected_output_tokens(job["prompt"].cache_tag, job["kind"])
+    rate, history_calls = stats.tokens_per_second(ai_provider)
+    return {
+        "jobs": len(plan["jobs"]),
+        "counts": counts,
+        "edited": sum(1 for job in plan["jobs"] if job.get("edited")),
+        "on_edit": plan["on_edit"],
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "seconds": output_tokens / rate,
+        "tokens_per_second": rate,
+        "history_calls": history_calls,
+        "provider": stats.provider_id(ai_provider),
+    }
+
+
+def combine_estimates(estimates):
+    """Adds up the estimates of several plans run against the same provider."""
+    total = dict(estimates[0], counts=dict(estimates[0]["counts"]))
+    for estimate in estimates[1:]:
+        for key in ("jobs", "edited", "prompt_tokens", "output_tokens", "seconds"):
+            total[key] += estimate[key]
+        for state, count in estimate["counts"].items():
+            total["counts"][state] += count
+    return total
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
+
+def print_estimate(estimate, project_path):
+    counts = estimate["counts"]
+    print(f"\n--- 📋 Batch plan for {project_path} ---")
+    print(f"Files planned:          {estimate['jobs']}")
+    print(f"Up to date (manifest):  {counts['up-to-date']}")
+    if estimate.get("edited"):
+        print(f"Edited by hand:         {estimate['edited']} ({estimate['on_edit']})")
+    print(f"Response cache hits:    {counts['cached']}")
+    print(f"Provider calls:         {counts['generate']}")
+    print(f"Prompt tokens to send:  ~{estimate['prompt_tokens']:,}")
+    print(f"Tokens to generate:     ~{estimate['output_tokens']:,}")
+    if estimate["history_calls"]:
+        basis = f"{estimate['tokens_per_second']:.1f} tok/s over {estimate['history_calls']} past call(s) of {estimate['provider']}"
+    else:
+        basis = f"no history for {estimate['provider']} yet, assuming {estimate['tokens_per_second']:.0f} tok/s"
+    print(f"Estimated duration:     ~{format_duration(estimate['seconds'])} ({basis})")
+
+
+def run_plan(ai_provider, plan, workers=1, fsync="file", writers=2):
+    """Generates and saves every job that is not up to date. Returns per-state counts."""
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return run_plans(ai_provider, [plan], executor, fsync, writers)[0]
+
+
+def run_plans(ai_provider, plans, executor, fsync="file", writers=2):
+    """
+    Runs several plans on one shared executor. Jobs are interleaved across plans
+    so every project makes progress instead of waiting behind the first one.
+    Each entity's files are written in one transaction once all of them are generated,
+    so a failed call never leaves an entity half-scaffolded. The transactions run on a
+    BackgroundWriter with 'writers' threads, so waiting for the next entity overlaps with
+    writing the last one. 'fsync' is the FileManager policy; 'off' skips syncing.
+    Files edited by hand are handled per the plan's 'on_edit' policy (see ON_EDIT).
+    Returns one result dict per plan.
+    """
+    results = [{"saved": 0, "failed": 0, "skipped": 0, "unchanged": 0, "kept": 0, "merged": 0} for _ in plans]
+    queues = []
+    for index, plan in enumerate(plans):
+        pending = [(index, job) for job in plan["jobs"] if job["state"] not in ("up-to-date", "edited")]
+        results[index]["kept"] = sum(1 for job in plan["jobs"] if job["state"] == "edited")
+        results[index]["skipped"] = len(plan["jobs"]) - len(pending) - results[index]["kept"]
+        queues.append(pending)
+    ordered = [item for round_ in zip_longest(*queues) for item in round_ if item]
+
+    lock = threading.Lock()
+
+    def written(index, jobs):
+        def on_done(ok, unchanged):
+            with lock:
+                if not ok:
+                    results[index]["failed"] += len(jobs)
+                    return
+                results[index]["saved"] += len(jobs) - len(unchanged)
+                results[index]["unchanged"] += len(unchanged)
+        return on_done
+
+    # (plan index, entity) -> [(job, future), ...]; dicts keep the interleaved submission order
+    entities = {}
+    for index, job in ordered:
+        future = executor.submit(_generate_job, ai_provider, job)
+        entities.setdefault((index, job["entity"]), []).append((job, future))
+    file_manager = FileManager(fsync=fsync)
+    for plan in plans:
+        # The FileManager records every file it lands in the project's manifest
+        file_manager.track(plan["manifest"])
+    with BackgroundWriter(file_manager, workers=writers) as writer:
+        for (index, entity), jobs in entities.items():
+            codes = [(job, future.result()) for job, future in jobs]
+            failed = [job for job, code in codes if code is None]
+            if failed:
+                print(f"❌ '{entity}': {len(failed)} of {len(codes)} file(s) failed to generate, nothing was written.")
+                with lock:
+                    results[index]["failed"] += len(codes)
+                continue
+            files, generated, submitted = {}, {}, []
+            for job, code in codes:
+                content = code
+                if job.get("edited"):
+                    content = _resolve_edit(plans[index], job, code)
+                    with lock:
+                        if content is None:
+                            results[index]["kept"] += 1
+                            continue
+                        if content != code:
+                            results[index]["merged"] += 1
+                            generated[job["file_path"]] = code
+                files[job["file_path"]] = content
+                submitted.append(job)
+            if files:
+                writer.submit(files, written(index, submitted), inputs={job["file_path"]: job["inputs_hash"] for job in submitted},
+                              generated=generated)
+        failures = writer.close()
+    for paths, error in failures:
+        print(f"❌ Could not write {len(paths)} file(s) ({error}): {', '.join(paths)}")
+    return results
+
+
+def _resolve_edit(plan, job, code):
+    """
+    What to write over a file that was edited by hand: the new code ('warn'), the new
+    code merged with the hand edits ('merge'), or None to keep the file as it is.
+    """
+    file_path = job["file_path"]
+    if plan["on_edit"] == "warn":
+        print(f"⚠️ {file_path} was edited by hand; overwriting it with the regenerated code.")
+        return code
+    base = plan["manifest"].base(file_path)
+    try:
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            current = f.read()
+    except (OSError, UnicodeDecodeError):
+        current = None
+    if base is None or current is None:
+        print(f"⚠️ {file_path} was edited by hand and can't be merged (no base kept); leaving it as it is.")
+        return None
+    merged, conflicts = merge3(base, current, code)
+    if conflicts:
+        print(f"⚠️ {file_path}: merged the regenerated code with {conflicts} conflict(s) marked for review.")
+    else:
+        print(f"🔀 {file_path}: merged the regenerated code with the hand edits.")
+    return merged
+
+
+def _generate_job(ai_provider, job):
+    """Returns the generated code, or None if the provider call failed."""
+    code = operations.generate_code(ai_provider, job["prompt"])
+    if code.startswith("Error"):
+        print(f"❌ {job['kind'].capitalize()} for '{job['entity']}' failed: {code[:200]}")
+        return None
+    return code
@@ -0,0 +1,123 @@
+"""
+Turns a model's answer into the code to save, while it streams. Models often wrap
+the code in ```csharp fences, or put prose before and after it, even when asked for
+raw code. CodeExtractor drops the prose and fences, normalizes line endings and
+stray characters, and reports when the code block has closed, so the caller can stop
+reading (and stop the provider generating the chatter that follows).
+"""
+import re
+
+# Characters models emit that break or clutter source files
+_TRANSLATE = {
+    0xFEFF: None,   # byte order mark
+    0x200B: None,   # zero-width space
+    0x00A0: " ",    # no-break space
+}
+_FENCE = re.compile(r"^\s*(```|~~~)")
+# An opening fence naming a language; after raw code it starts the real block
+_LANGUAGE_FENCE = re.compile(r"^\s*(```|~~~)\s*[\w#+.-]+\s*$")
+# First lines that mean the answer is raw code rather than prose leading up to a fence.
+# Markdown starts lines with '#', '[' and '<' too, so only their C#/Razor forms count:
+# preprocessor directives, attributes, Razor directives and lines that are HTML tags.
+_CODE_START = re.compile(
+    r"^\s*(using\s|namespace\s|//|/\*|\{|public\s|internal\s|private\s|protected\s|sealed\s|"
+    r"partial\s|static\s|abstract\s|class\s|record\s|var\s|"
+    r"#(region|endregion|nullable|pragma|if|define|undef)\b|"
+    r"\[[A-Za-z_][\w.]*(\(|\]\s*$)|"
+    r"@(model|using|inject|page|inherits|layout|addTagHelper|section|functions|code|if|foreach|\{|\*)|"
+    r"<[!A-Za-z].*>\s*$)")
+
+
+def normalize(text):
+    """Unix line endings, no BOM/zero-width/no-break spaces."""
+    return text.replace("\r\n", "\n").replace("\r", "\n").translate(_TRANSLATE)
+
+
+class CodeExtractor:
+    """
+    Feed it the answer chunk by chunk; feed() returns the code that is ready (whole
+    lines) and 'done' turns True once a fenced block has closed. Raw answers are
+    passed through as they come, and text before the first fence is held back
+    until it is clear whether a fence follows. code() returns the whole result; a
+    '```csharp' fence after lines taken for raw code drops them from it, although
+    they were already returned by feed().
+    """
+    def __init__(self):
+        self.state = "start"  # start -> prose | code | fenced -> done
+        self.done = False
+        self._partial = ""
+        self._carry = ""      # a '\r' that may be the first half of a '\r\n' split across chunks
+        self._held = []       # lines of an answer that hasn't shown code or a fence yet
+        self._code = []
+
+    def feed(self, chunk):
+        if self.done:
+            return ""
+        chunk = self._carry + chunk
+        self._carry = "\r" if chunk.endswith("\r") else ""
+        if self._carry:
+            chunk = chunk[:-1]
+        lines = (self._partial + normalize(chunk)).split("\n")
+        self._partial = lines.pop()
+        emitted = []
+        for line in lines:
+            emitted.extend(self._line(line))
+            if self.done:
+                break
+        return "".join(emitted)
+
+    def _line(self, line):
+        text = line + "\n"
+        if self.state in ("start", "prose"):
+            if _FENCE.match(line):
+                # Whatever came before the fence was commentary
+                self._held = []
+                self.state = "fenced"
+                return []
+            if self.state == "start" and line.strip():
+                if _CODE_START.match(line):
+                    self.state = "code"
+                    return self._emit(self._held + [text])
+                self.state = "prose"
+            self._held.append(text)
+            return []
+        if self.state == "code" and _LANGUAGE_FENCE.match(line):
+            # What looked like raw code was a lead-in after all; the block starts here
+            self._code = []
+            self.state = "fenced"
+            return []
+        if _FENCE.match(line):
+            # A closing fence, or the fence after raw code that opens an explanation
+            self.done = True
+            return []
+        return self._emit([text])
+
+    def _emit(self, lines):
+        self._held = []
+        self._code.extend(lines)
+        return lines
+
+    def close(self):
+        """Ends the stream. Returns the code released by the end of it."""
+        emitted = []
+        if self._partial and not self.done:
+            emitted = self._line(self._partial)
+        self._partial = ""
+        if self.state == "prose" and not self.done:
+            # No fence ever came: drop the lead-in before the first line that looks like
+            # code, or keep the whole answer if none does (that is also how errors come back)
+            start = next((i for i, line in enumerate(self._held) if _CODE_START.match(line)), 0)
+            emitted += self._emit(self._held[start:])
+        self.done = True
+        return "".join(emitted)
+
+    def code(self):
+        return "".join(self._code).strip()
+
+
+def extract_code(text):
+    """The code in a complete answer (see CodeExtractor)."""
+    extractor = CodeExtractor()
+    extractor.feed(text)
+    extractor.close()
+    return extractor.code()
@@ -0,0 +1,277 @@
+import re
+
+# One pass over the raw bytes. Each match swallows any comments, strings, char
+# literals, preprocessor lines, numbers and whitespace in front of the next
+# token, so braces or keywords inside them never reach the parser. Only
+# identifiers and punctuation are returned.
+_TOKEN = re.compile(rb"""
+    (?:
+        //[^\n]*
+      | /\*[\s\S]*?\*/
+      | \#[^\n]*
+      | \$*\"{3,}[\s\S]*?\"{3,}
+      | (?:\$@|@\$|@)"(?:[^"]|"")*"
+      | \$?"(?:[^"\\\n]|\\.)*"
+      | '(?:[^'\\\n]|\\.)+'
+      | \d[\w.]*
+      | \s
+    )*
+    (@?[A-Za-z_\x80-\xff][\w\x80-\xff]* | => | [^\s])
+""", re.VERBOSE)
+
+MODIFIERS = {
+    b"public", b"private", b"protected", b"internal", b"static", b"abstract", b"sealed",
+    b"partial", b"virtual", b"override", b"new", b"required", b"readonly", b"unsafe",
+    b"extern", b"file", b"async", b"const", b"volatile",
+}
+TYPE_KEYWORDS = {b"class", b"record", b"struct", b"interface", b"enum"}
+ACCESSORS = {b"get", b"set", b"init"}
+PARAMETER_MODIFIERS = {b"in", b"out", b"ref", b"params", b"this", b"scoped"}
+# Tokens after which 'class'/'struct' is a generic constraint, not a declaration
+_CONSTRAINT_CONTEXT = {b":", b",", b"<", b"("}
+
+
+def tokenize(data):
+    """Returns the identifiers and punctuation of C# source bytes as a list of byte strings."""
+    return _TOKEN.findall(data)
+
+
+def tokenize_spans(data):
+    """
+    Like tokenize(), but returns (token, start, end) with byte offsets into 'data'.
+    Slower; meant for editing a single file, not for indexing. 'data' may be an mmap.
+    """
+    return [(match.group(1), match.start(1), match.end(1)) for match in _TOKEN.finditer(data)]
+
+
+def _is_ident(token):
+    return token[:1].isalpha() or token[:1] in (b"_", b"@") or token[:1] >= b"\x80"
+
+
+def _name(token):
+    return token.lstrip(b"@").decode("utf-8", "replace")
+
+
+def _join(tokens):
+    """Rebuilds a type expression such as 'ICollection<Order>' from its tokens."""
+    return b"".join(token if token != b"," else b", " for token in tokens).decode("utf-8", "replace")
+
+
+def _skip_balanced(tokens, i, open_token, close_token):
+    """Given tokens[i] == open_token, returns the index just past its matching close_token."""
+    depth = 0
+    n = len(tokens)
+    while i < n:
+        token = tokens[i]
+        if token == open_token:
+            depth += 1
+        elif token == close_token:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def _split_top_level(tokens):
+    """Splits a token list on commas that are not nested in <>, (), [] or {}."""
+    parts = [[]]
+    depth = 0
+    for token in tokens:
+        if token in (b"<", b"(", b"[", b"{"):
+            depth += 1
+        elif token in (b">", b")", b"]", b"}"):
+            depth -= 1
+        elif token == b"," and depth == 0:
+            parts.append([])
+            continue
+        parts[-1].append(token)
+    return [part for part in parts if part]
+
+
+def _read_attributes(tokens, i):
+    """Reads one '[...]' attribute section at tokens[i]. Returns (names, next_index)."""
+    end = _skip_balanced(tokens, i, b"[", b"]")
+    names = []
+    for part in _split_top_level(tokens[i + 1:end - 1]):
+        # Drop a target specifier such as 'assembly:' or 'return:'
+        if len(part) > 1 and part[1] == b":":
+            part = part[2:]
+        name = []
+        for token in part:
+            if token == b"(":
+                break
+            name.append(token)
+        if name:
+            names.append(_join(name))
+    return names, end
+
+
+def _parameters(tokens):
+    """Turns record primary-constructor parameter tokens into property dicts."""
+    properties = []
+    for part in _split_top_level(tokens):
+        attributes = []
+        while part and part[0] == b"[":
+            names, end = _read_attributes(part, 0)
+            attributes.extend(names)
+            part = part[end:]
+        if b"=" in part:
+            part = part[:part.index(b"=")]
+        part = [token for token in part if token not in PARAMETER_MODIFIERS]
+        if len(part) >= 2 and _is_ident(part[-1]):
+            properties.append({"name": _name(part[-1]), "type": _join(part[:-1]), "attributes": attributes})
+    return properties
+
+
+def _property(statement):
+    """Returns (type, name) if the member tokens seen so far declare a property, else None."""
+    tokens = [token for token in statement if token not in MODIFIERS]
+    if len(tokens) < 2 or b"(" in tokens or b"=" in tokens or not _is_ident(tokens[-1]):
+        return None
+    if tokens[0] in (b"event", b"delegate", b"operator", b"implicit", b"explicit"):
+        return None
+    return _join(tokens[:-1]), _name(tokens[-1])
+
+
+def _read_type(tokens, i, kind, modifiers, attributes, namespace):
+    """
+    Parses a type declaration whose keyword is tokens[i]. Returns (type_dict, next_index);
+    next_index points at the body '{' or just past a terminating ';'.
+    """
+    n = len(tokens)
+    i += 1
+    if kind == b"record" and i < n and tokens[i] in (b"class", b"struct"):
+        i += 1
+    if i >= n or not _is_ident(tokens[i]):
+        return None, i
+    declared = {
+        "kind": kind.decode(),
+        "name": _name(tokens[i]),
+        "namespace": namespace,
+        "modifiers": [m.decode() for m in modifiers],
+        "attributes": attributes,
+        "bases": [],
+        "properties": [],
+    }
+    i += 1
+    if i < n and tokens[i] == b"<":
+        i = _skip_balanced(tokens, i, b"<", b">")
+    if i < n and tokens[i] == b"(":
+        end = _skip_balanced(tokens, i, b"(", b")")
+        if kind == b"record":
+            declared["properties"] = _parameters(tokens[i + 1:end - 1])
+        i = end
+    if i < n and tokens[i] == b":":
+        i += 1
+        base_tokens = []
+        while i < n and tokens[i] not in (b"{", b";", b"where"):
+            if tokens[i] == b"(":
+                i = _skip_balanced(tokens, i, b"(", b")")
+                continue
+            base_tokens.append(tokens[i])
+            i += 1
+        declared["bases"] = [_join(part) for part in _split_top_level(base_tokens)]
+    while i < n and tokens[i] not in (b"{", b";"):
+        i += 1
+    if i < n and tokens[i] == b";":
+        i += 1
+    return declared, i
+
+
+def parse_csharp(data):
+    """
+    Extracts the declared types from C# source bytes without decoding the whole file.
+    Returns a list of dicts with 'kind', 'name', 'namespace', 'modifiers', 'attributes',
+    'bases' and 'properties' ([{'name', 'type', 'attributes'}]).
+    """
+    tokens = tokenize(data)
+    n = len(tokens)
+    types = []
+    # Each frame is [kind, payload]; kind is 'namespace', 'type' or 'block'
+    frames = []
+    namespaces = []
+    file_namespace = ""
+    statement = []
+    attributes = []
+    i = 0
+    while i < n:
+        token = tokens[i]
+        frame = frames[-1][0] if frames else "top"
+
+        if frame == "block":
+            # Method bodies, accessors and initializers: only braces matter
+            if token == b"{":
+                frames.append(["block", None])
+            elif token == b"}":
+                frames.pop()
+                if not frames or frames[-1][0] != "block":
+                    statement = []
+            i += 1
+            continue
+
+        if token == b"[" and not statement:
+            names, i = _read_attributes(tokens, i)
+            attributes.extend(names)
+            continue
+
+        if token == b"namespace" and not statement:
+            j = i + 1
+            name = []
+            while j < n and tokens[j] not in (b"{", b";"):
+                name.append(tokens[j])
+                j += 1
+            if j < n and tokens[j] == b"{":
+                frames.append(["namespace", _join(name)])
+                namespaces.append(_join(name))
+            else:
+                file_namespace = _join(name)
+            statement = []
+            attributes = []
+            i = j + 1
+            continue
+
+        if token in TYPE_KEYWORDS and all(t in MODIFIERS for t in statement) and (
+                i == 0 or tokens[i - 1] not in _CONSTRAINT_CONTEXT):
+            namespace = ".".join(filter(None, [file_namespace] + namespaces))
+            declared, i = _read_type(tokens, i, token, statement, attributes, namespace)
+            statement = []
+            attributes = []
+            if declared is None:
+                continue
+            types.append(declared)
+            if i < n and tokens[i] == b"{":
+                frames.append(["type", declared])
+                i += 1
+            continue
+
+        if token == b"{":
+            if frame == "type":
+                following = tokens[i + 1] if i + 1 < n else b""
+                if following in ACCESSORS or following in MODIFIERS or following == b"[":
+                    found = _property(statement)
+                    if found:
+                        frames[-1][1]["properties"].append({"name": found[1], "type": found[0], "attributes": attributes})
+            frames.append(["block", None])
+            statement = []
+            attributes = []
+        elif token == b"}":
+            if frames:
+                kind, payload = frames.pop()
+                if kind == "namespace":
+                    namespaces.pop()
+            statement = []
+            attributes = []
+        elif token == b";":
+            statement = []
+            attributes = []
+        elif token == b"=>" and frame == "type":
+            found = _property(statement)
+            if found:
+                frames[-1][1]["properties"].append({"name": found[1], "type": found[0], "attributes": attributes})
+            # The expression body runs to the next ';'; don't treat its tokens as a member
+            statement = [b"=>"]
+        else:
+            statement.append(token)
+        i += 1
+    return types
@@ -0,0 +1,199 @@
+"""
+Minimal, structure-aware edits to existing C# files. The functions here take the
+file's bytes (or an mmap), locate insertion points with the C# lexer, so braces in
+strings and comments are never miscounted, and return a list of (offset, bytes)
+insertions; FileManager.patch_file() applies them and writes the file atomically.
+An empty list means the file already has what was asked for.
+"""
+import re
+from core.csharp import tokenize_spans
+
+_WHITESPACE = re.compile(rb"\s+")
+# Tokens after which 'class'/'struct' is a generic constraint, not a declaration
+_CONSTRAINT_CONTEXT = {b":", b",", b"<", b"("}
+
+
+def _newline(data):
+    return b"\r\n" if b"\r\n" in data[:4096] else b"\n"
+
+
+def _line_start(data, offset):
+    return data.rfind(b"\n", 0, offset) + 1
+
+
+def _indent_at(data, offset):
+    """Leading whitespace of the line containing 'offset'."""
+    start = _line_start(data, offset)
+    end = start
+    while end < len(data) and data[end:end + 1] in (b" ", b"\t"):
+        end += 1
+    return data[start:end]
+
+
+def _matching_brace(tokens, i):
+    """Given tokens[i] is '{', returns the index of its closing '}', or None."""
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j][0] == b"{":
+            depth += 1
+        elif tokens[j][0] == b"}":
+            depth -= 1
+            if depth == 0:
+                return j
+    return None
+
+
+def find_type_body(tokens, type_name):
+    """Returns the token indexes (open_brace, close_brace) of a class/record/struct body, or None."""
+    name = type_name.encode("utf-8")
+    for i in range(len(tokens) - 1):
+        if tokens[i][0] in (b"class", b"record", b"struct") and tokens[i + 1][0] == name and (
+                i == 0 or tokens[i - 1][0] not in _CONSTRAINT_CONTEXT):
+            for j in range(i + 2, len(tokens)):
+                if tokens[j][0] == b";":
+                    return None
+                if tokens[j][0] == b"{":
+                    close = _matching_brace(tokens, j)
+                    return (j, close) if close is not None else None
+    return None
+
+
+def find_method_body(tokens, method_name):
+    """Returns the token indexes (open_brace, close_brace) of the first method with a block body, or None."""
+    name = method_name.encode("utf-8")
+    for i in range(len(tokens) - 1):
+        if tokens[i][0] == name and tokens[i + 1][0] == b"(":
+            depth = 0
+            for j in range(i + 1, len(tokens)):
+                token = tokens[j][0]
+                if token == b"(":
+                    depth += 1
+                elif token == b")":
+                    depth -= 1
+                elif depth == 0 and token in (b";", b"=>"):
+                    break
+                elif depth == 0 and token == b"{":
+                    close = _matching_brace(tokens, j)
+                    return (j, close) if close is not None else None
+    return None
+
+
+def insert_before_close(data, tokens, body, text):
+    """
+    Edit that adds 'text' (one line, no indentation) as the last member/statement of a
+    block, indented like the block's existing content.
+    """
+    open_index, close_index = body
+    close_offset = tokens[close_index][1]
+    newline = _newline(data)
+    brace_indent = _indent_at(data, close_offset)
+    if close_index - open_index > 1:
+        indent = _indent_at(data, tokens[close_index - 1][1])
+        if indent == brace_indent:
+            indent = brace_indent + b"    "
+    else:
+        indent = brace_indent + b"    "
+    line = indent + text.encode("utf-8") + newline
+    if not data[_line_start(data, close_offset):close_offset].strip():
+        # The closing brace sits on its own line: put the new line just above it
+        return [(_line_start(data, close_offset), line)]
+    return [(close_offset, newline + line + brace_indent)]
+
+
+def _contains_code(data, text):
+    """
+    True if 'text' already appears in the data, ignoring whitespace differences. Searches
+    'data' in place with a pattern allowing whitespace between any two characters, so an
+    mmap is never copied.
+    """
+    wanted = _WHITESPACE.sub(b"", text.encode("utf-8"))
+    if not wanted:
+        return True
+    pattern = rb"\s*".join(re.escape(wanted[i:i + 1]) for i in range(len(wanted)))
+    return re.search(pattern, data) is not None
+
+
+def add_using(data, tokens, namespace):
+    """Edit adding 'using <namespace>;' after the file's last using directive, unless it is there."""
+    if not namespace:
+        return []
+    wanted = namespace.encode("utf-8")
+    last_end = None
+    i = 0
+    while i < len(tokens) and tokens[i][0] in (b"using", b"global"):
+        if tokens[i][0] == b"global":
+            i += 1
+            continue
+        j = i + 1
+        parts = []
+        while j < len(tokens) and tokens[j][0] != b";":
+            parts.append(tokens[j][0])
+            j += 1
+        if b"".join(parts) == wanted:
+            return []
+        if j >= len(tokens):
+            break
+        last_end = tokens[j][2]
+        i = j + 1
+    # Inside a namespace of the same name (or a child of it) the using is implied
+    for k in range(len(tokens) - 1):
+        if tokens[k][0] == b"namespace":
+            declared = b""
+            j = k + 1
+            while j < len(tokens) and tokens[j][0] not in (b"{", b";"):
+                declared += tokens[j][0]
+                j += 1
+            if declared == wanted or declared.startswith(wanted + b"."):
+                return []
+            break
+    newline = _newline(data)
+    line = b"using " + wanted + b";"
+    if last_end is None:
+        return [(0, line + newline + newline)]
+    return [(last_end, newline + line)]
+
+
+def add_db_set(data, context_name, entity_name, set_name, entity_namespace=None):
+    """
+    Edits adding 'public DbSet<Entity> Sets { get; set; }' to the DbContext class (and a
+    using for the entity's namespace). Returns [] if a DbSet of the entity already exists,
+    or None if the class can't be found.
+    """
+    tokens = tokenize_spans(data)
+    body = find_type_body(tokens, context_name)
+    if body is None:
+        return None
+    entity = entity_name.encode("utf-8")
+    for k in range(body[0], body[1] - 3):
+        if tokens[k][0] == b"DbSet" and tokens[k + 1][0] == b"<" and tokens[k + 2][0].rsplit(b".", 1)[-1] == entity:
+            return []
+    edits = insert_before_close(data, tokens, body, f"public DbSet<{entity_name}> {set_name} {{ get; set; }}")
+    return add_using(data, tokens, entity_namespace) + edits
+
+
+def add_service_registration(data, statement):
+    """
+    Edits registering a service in Program.cs/Startup.cs, e.g. statement
+    'builder.Services.AddScoped<IFoo, Foo>();'. With top-level statements it goes right
+    before 'var app = builder.Build();'; in a Startup class, at the end of
+    ConfigureServices (with 'builder.Services' turned into 'services').
+    Returns [] if the statement is already there, or None if no insertion point was found.
+    """
+    tokens = tokenize_spans(data)
+    for i in range(len(tokens) - 3):
+        if tokens[i + 1][0] == b"." and tokens[i + 2][0] == b"Build" and tokens[i + 3][0] == b"(":
+            if _contains_code(data, statement):
+                return []
+            # Start of the statement holding '<builder>.Build(': just after the previous ';', '{' or '}'
+            j = i
+            while j > 0 and tokens[j - 1][0] not in (b";", b"{", b"}"):
+                j -= 1
+            start = _line_start(data, tokens[j][1])
+            return [(start, _indent_at(data, tokens[j][1]) + statement.encode("utf-8") + _newline(data))]
+    body = find_method_body(tokens, "ConfigureServices")
+    if body is None:
+        return None
+    statement = statement.replace("builder.Services.", "services.")
+    if _contains_code(data, statement):
+        return []
+    return insert_before_close(data, tokens, body, statement)
@@ -0,0 +1,208 @@
+"""
+Line diffs for previewing generated code against the file it would replace.
+Common leading and trailing lines are trimmed first, then Myers' O((N+M)D) algorithm
+runs with a cap on D: for the usual regeneration, which changes a few lines of a long
+file, that is close to linear. Past the cap the files are too different for Myers to
+stay fast, so patience diff takes over: it anchors on lines that occur once on each
+side and recurses between them, which also pairs up moved blocks more readably.
+Lines found on only one side are counted first; when that alone exceeds the cap,
+Myers is not tried at all.
+"""
+import os
+from bisect import bisect_left
+from collections import Counter
+
+# Edits Myers may spend on one region before patience diff takes over
+MAX_EDIT_DISTANCE = 512
+
+CONTEXT_LINES = 3
+
+
+def _myers(a, alo, ahi, b, blo, bhi, max_d):
+    """Matching (i, j) pairs of a[alo:ahi] and b[blo:bhi] on a shortest edit script, or None past max_d edits."""
+    n, m = ahi - alo, bhi - blo
+    v = {1: 0}
+    trace = []
+    for d in range(max_d + 1):
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m, alo, blo)
+    return None
+
+
+def _backtrack(trace, x, y, alo, blo):
+    matches = []
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        prev_k = k + 1 if k == -d or (k != d and v[k - 1] < v[k + 1]) else k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            matches.append((alo + x, blo + y))
+        x, y = prev_x, prev_y
+    matches.reverse()
+    return matches
+
+
+def _min_edits(a, alo, ahi, b, blo, bhi):
+    """Lower bound on the edit distance: lines that can't be matched on the other side."""
+    counts = Counter(a[alo:ahi])
+    counts.subtract(b[blo:bhi])
+    return sum(abs(count) for count in counts.values())
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """Lines occurring exactly once on both sides, kept in the longest run that is in order on both."""
+    counts = {}
+    for i in range(alo, ahi):
+        entry = counts.setdefault(a[i], [0, i, 0, None])
+        entry[0] += 1
+    for j in range(blo, bhi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[2] += 1
+            entry[3] = j
+    pairs = sorted((i, j) for count_a, i, count_b, j in counts.values() if count_a == 1 and count_b == 1)
+    # Longest increasing subsequence of the b indexes (patience sorting)
+    tails, tail_index, previous = [], [], [None] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        position = bisect_left(tails, j)
+        if position:
+            previous[index] = tail_index[position - 1]
+        if position == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[position] = j
+            tail_index[position] = index
+    anchors = []
+    index = tail_index[-1] if tail_index else None
+    while index is not None:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _match(a, alo, ahi, b, blo, bhi, matches):
+    # Common head and tail are matched without any search
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        matches.append((alo, blo))
+        alo += 1
+        blo += 1
+    tail = []
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+        tail.append((ahi, bhi))
+    if alo < ahi and blo < bhi:
+        found = None
+        bound = _min_edits(a, alo, ahi, b, blo, bhi)
+        if bound == (ahi - alo) + (bhi - blo):
+            # Not a single line in common: one replaced block, nothing to search
+            found = []
+        elif bound <= MAX_EDIT_DISTANCE:
+            found = _myers(a, alo, ahi, b, blo, bhi, MAX_EDIT_DISTANCE)
+        if found is not None:
+            matches.extend(found)
+        else:
+            anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+            # Without anchors the region is left as one replaced block
+            for i, j in anchors:
+                _match(a, alo, i, b, blo, j, matches)
+                matches.append((i, j))
+                alo, blo = i + 1, j + 1
+            if anchors:
+                _match(a, alo, ahi, b, blo, bhi, matches)
+    matches.extend(reversed(tail))
+
+
+def diff_lines(a, b):
+    """
+    Opcodes turning line list 'a' into 'b', in difflib's format:
+    [(tag, i1, i2, j1, j2), ...] with tag 'equal', 'replace', 'delete' or 'insert'.
+    """
+    # Compare small ints instead of strings
+    ids = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+    matches = []
+    _match(a_ids, 0, len(a_ids), b_ids, 0, len(b_ids), matches)
+    opcodes = []
+    i = j = 0
+    for mi, mj in matches + [(len(a), len(b))]:
+        if i < mi or j < mj:
+            tag = "replace" if i < mi and j < mj else "delete" if i < mi else "insert"
+            opcodes.append((tag, i, mi, j, mj))
+        if mi < len(a):
+            if opcodes and opcodes[-1][0] == "equal":
+                opcodes[-1] = ("equal", opcodes[-1][1], mi + 1, opcodes[-1][3], mj + 1)
+            else:
+                opcodes.append(("equal", mi, mi + 1, mj, mj + 1))
+        i, j = mi + 1, mj + 1
+    return opcodes
+
+
+def unified_diff(a, b, old_label, new_label, context=CONTEXT_LINES):
+    """Unified diff of two line lists (without line endings), as a list of lines."""
+    opcodes = diff_lines(a, b)
+    changes = [index for index, opcode in enumerate(opcodes) if opcode[0] != "equal"]
+    if not changes:
+        return []
+    lines = [f"--- {old_label}", f"+++ {new_label}"]
+    # Group changes whose context would overlap into one hunk
+    groups = [[changes[0]]]
+    for index in changes[1:]:
+        between = opcodes[index - 1]
+        if between[0] == "equal" and between[2] - between[1] > 2 * context:
+            groups.append([index])
+        else:
+            groups[-1].append(index)
+    for group in groups:
+        first, last = opcodes[group[0]], opcodes[group[-1]]
+        i1, j1 = max(0, first[1] - context), max(0, first[3] - context)
+        i2, j2 = min(len(a), last[2] + context), min(len(b), last[4] + context)
+        lines.append(f"@@ -{i1 + 1},{i2 - i1} +{j1 + 1},{j2 - j1} @@")
+        for tag, oi1, oi2, oj1, oj2 in opcodes[group[0] - (group[0] > 0):group[-1] + 2]:
+            if tag == "equal":
+                lo, hi = max(oi1, i1), min(oi2, i2)
+                lines.extend(" " + line for line in a[lo:hi])
+            else:
+                lines.extend("-" + line for line in a[oi1:oi2])
+                lines.extend("+" + line for line in b[oj1:oj2])
+    return lines
+
+
+def preview(file_path, new_text):
+    """
+    Compares generated code with the file it would be saved over. Returns a dict with
+    'exists', 'identical', 'added' and 'removed' line counts and the unified 'diff' lines.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            old_text = f.read()
+    except OSError:
+        return {"exists": False, "identical": False, "added": 0, "removed": 0, "diff": []}
+    old_lines, new_lines = old_text.splitlines(), new_text.splitlines()
+    diff = unified_diff(old_lines, new_lines, f"{os.path.basename(file_path)} (on disk)",
+                        f"{os.path.basename(file_path)} (generated)")
+    return {
+        "exists": True,
+        "identical": not diff,
+        "added": sum(1 for line in diff[2:] if line.startswith("+")),
+        "removed": sum(1 for line in diff[2:] if line.startswith("-")),
+        "diff": diff,
+    }
@@ -0,0 +1,122 @@
+import re
+
+# Generic wrappers whose single type argument is the entity on the other side of a to-many navigation
+COLLECTION_TYPES = {
+    "ICollection", "IList", "List", "IEnumerable", "HashSet", "ISet",
+    "Collection", "IReadOnlyCollection", "IReadOnlyList",
+}
+_GENERIC = re.compile(r"^(?:[\w.]+\.)?(\w+)<\s*([\w.]+)\s*>\??$")
+
+
+def _simple_type(type_name):
+    """'Shop.Models.Category?' -> 'Category'."""
+    return type_name.rstrip("?").rsplit(".", 1)[-1]
+
+
+class EntityGraph:
+    """
+    Entities with their navigation and foreign-key properties, and the DbSet<T>
+    registrations of every DbContext. All lookups are dictionary hits.
+
+      entities: {name: {'namespace', 'navigations': [{'name', 'target', 'many'}],
+                        'foreign_keys': [{'name', 'navigation', 'target'}]}}
+      contexts: {name: {'namespace', 'sets': {entity: property_name}}}
+    """
+    def __init__(self, entities=None, contexts=None):
+        self.entities = entities or {}
+        self.contexts = contexts or {}
+        self._contexts_by_entity = {}
+        for context_name in sorted(self.contexts):
+            for entity in self.contexts[context_name]["sets"]:
+                self._contexts_by_entity.setdefault(entity, []).append(context_name)
+
+    @classmethod
+    def from_symbols(cls, symbol_table):
+        """Builds the graph from a core.symbols.SymbolTable."""
+        contexts = {}
+        for name in symbol_table.contexts():
+            entry = symbol_table.get(name)
+            sets = {}
+            for prop in entry["properties"]:
+                match = _GENERIC.match(prop["type"])
+                if match and match.group(1) == "DbSet":
+                    sets[_simple_type(match.group(2))] = prop["name"]
+            contexts[name] = {"namespace": entry["namespace"], "sets": sets}
+
+        names = set(symbol_table.models())
+        for context in contexts.values():
+            names.update(entity for entity in context["sets"] if symbol_table.get(entity))
+        entities = {}
+        for name in sorted(names):
+            entry = symbol_table.get(name)
+            navigations = []
+            for prop in entry["properties"]:
+                match = _GENERIC.match(prop["type"])
+                if match and match.group(1) in COLLECTION_TYPES and _simple_type(match.group(2)) in names:
+                    navigations.append({"name": prop["name"], "target": _simple_type(match.group(2)), "many": True})
+                elif _simple_type(prop["type"]) in names:
+                    navigations.append({"name": prop["name"], "target": _simple_type(prop["type"]), "many": False})
+            references = {nav["name"]: nav["target"] for nav in navigations if not nav["many"]}
+            foreign_keys = []
+            for prop in entry["properties"]:
+                explicit = "ForeignKey" in prop["attributes"]
+                is_own_key = prop["name"] in ("Id", f"{name}Id")
+                if not explicit and (is_own_key or not prop["name"].endswith("Id")):
+                    continue
+                # Convention: 'CategoryId' belongs to the 'Category' navigation (or type)
+                stem = prop["name"][:-2] if prop["name"].endswith("Id") else prop["name"]
+                if stem in references:
+                    foreign_keys.append({"name": prop["name"], "navigation": stem, "target": references[stem]})
+                elif stem in names:
+                    foreign_keys.append({"name": prop["name"], "navigation": None, "target": stem})
+                elif explicit:
+                    foreign_keys.append({"name": prop["name"], "navigation": None, "target": None})
+            entities[name] = {"namespace": entry["namespace"], "navigations": navigations, "foreign_keys": foreign_keys}
+        return cls(entities, contexts)
+
+    def to_dict(self):
+        return {"entities": self.entities, "contexts": self.contexts}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("entities"), data.get("contexts"))
+
+    def entity(self, name):
+        return self.entities.get(name)
+
+    def contexts_for(self, entity_name):
+        """Names of the DbContexts that register a DbSet of the entity."""
+        return self._contexts_by_entity.get(entity_name, [])
+
+    def context_for(self, entity_name):
+        """
+        The DbContext to use for an entity: the one exposing its DbSet, else the
+        project's only DbContext. Returns None when that is ambiguous or unknown.
+        """
+        candidates = self.contexts_for(entity_name)
+        if len(candidates) == 1:
+            return candidates[0]
+        if not candidates and len(self.contexts) == 1:
+            return next(iter(self.contexts))
+        return None
+
+    def db_set(self, context_name, entity_name):
+        """The DbSet property name for an entity in a context (e.g. 'Products'), or None."""
+        context = self.contexts.get(context_name)
+        return context["sets"].get(entity_name) if context else None
+
+    def describe_relationships(self, entity_name):
+        """One-line summary for prompts, e.g. 'Category: one Category (foreign key CategoryId); Lines: many OrderLine'."""
+        entity = self.entities.get(entity_name)
+        if not entity:
+            return "None"
+        keys = {fk["navigation"]: fk["name"] for fk in entity["foreign_keys"] if fk["navigation"]}
+        parts = []
+        for nav in entity["navigations"]:
+            if nav["many"]:
+                parts.append(f"{nav['name']}: many {nav['target']}")
+            elif nav["name"] in keys:
+                parts.append(f"{nav['name']}: one {nav['target']} (foreign key {keys[nav['name']]})")
+            else:
+                parts.append(f"{nav['name']}: one {nav['target']}")
+        return "; ".join(parts) or "None"
@@ -1,27 +1,507 @@
+import hashlib
+import mmap
 import os
+import shutil
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
+from core.locks import project_lock_file
+from core.paths import project_root
+
+# 'file': every file and its directory entry are synced before create_file returns; a
+#         transaction syncs all its files, then each of their directories once.
+# 'off': atomic rename only, durability left to the OS.
+FSYNC_POLICIES = ("file", "off")
+
+# Existing files are hashed in chunks of this size, so large files are never read whole
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Files at least this large are memory-mapped for patching instead of read into memory
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+# mkstemp creates files as 0600; new files get the usual umask-based mode instead
+_umask = None
+_umask_lock = threading.Lock()
+
+
+def _current_umask():
+    """The process umask, read once. Linux reports it in /proc; elsewhere it is set and restored."""
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            try:
+                with open("/proc/self/status", 'r', encoding='ascii') as f:
+                    _umask = next(int(line.split()[1], 8) for line in f if line.startswith("Umask:"))
+            except (OSError, ValueError, IndexError, StopIteration):
+                # Briefly changes the umask for every thread; done once, on the first new file
+                _umask = os.umask(0o077)
+                os.umask(_umask)
+        return _umask
+
+
+def _sync_data(fd):
+    # fdatasync skips the metadata-only flush where the platform has it
+    getattr(os, "fdatasync", os.fsync)(fd)
+
+
+def _sync_directory(directory):
+    """Makes renames inside 'directory' durable. Directories can't be opened on Windows; skip there."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def file_digest(file_path):
+    """sha256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def same_content(file_path, data):
+    """True if the file exists and holds exactly 'data'. A size mismatch answers without reading it."""
+    try:
+        if os.stat(file_path).st_size != len(data):
+            return False
+        return file_digest(file_path) == hashlib.sha256(data).digest()
+    except OSError:
+        return False
+
+
+def _backup(file_path, backup_path):
+    # A hard link keeps the original without copying it; not every filesystem has them
+    try:
+        os.link(file_path, backup_path)
+    except OSError:
+        shutil.copy2(file_path, backup_path)
+
+
+def _remove_quietly(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class WriteTransaction:
+    """
+    Stages several files and writes them all or none. Content is held in memory until
+    commit(), which creates the missing directories once, writes and syncs every temp
+    file, then renames them into place and syncs each directory once. If anything
+    fails the originals are restored and new files and directories are removed.
+    Used as a context manager it commits on success and discards on an exception.
+    """
+    def __init__(self, file_manager):
+        self.file_manager = file_manager
+        self.files = {}  # file_path -> content, in staging order
+        self.records = {}  # file_path -> (inputs_hash, generated) for the manifest
+        # Paths the last commit() skipped because they already held the content
+        self.unchanged = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def write(self, file_path, content, inputs_hash=None, generated=None):
+        """
+        Stages a file. inputs_hash and generated (the provider's output, when 'content'
+        is a merge of it with hand edits) go into the project's manifest on commit.
+        """
+        self.files[file_path] = content
+        self.records[file_path] = (inputs_hash, generated)
+
+    def rollback(self):
+        """Discards the staged files. Nothing has touched the disk before commit()."""
+        self.files = {}
+        self.records = {}
+
+    def commit(self):
+        """
+        Writes every staged file whose content differs from what is on disk.
+        Returns True if all landed, False (with the project unchanged) otherwise.
+        Other Synapse processes can't write any of the files while it runs.
+        """
+        if not self.files:
+            self.unchanged = []
+            return True
+        with self.file_manager._hold(*self.files):
+            return self._commit()
+
+    def _commit(self):
+        files = {}
+        self.unchanged = []
+        staged, records = self.files, self.records
+        for file_path, content in staged.items():
+            if self.file_manager._unchanged(file_path, content):
+                self.unchanged.append(file_path)
+            else:
+                files[file_path] = content
+        self.files = {}
+        self.records = {}
+        if not files:
+            self._record(staged, records)
+            return True
+        sync = self.file_manager.fsync != "off"
+        created_dirs = []
+        temps = {}      # file_path -> tmp_path
+        backups = {}    # file_path -> backup_path of the file it replaces
+        landed = []
+        try:
+            self.file_manager.make_directories((os.path.dirname(path) for path in files), created_dirs)
+            for file_path, content in files.items():
+                fd, temps[file_path] = self.file_manager._write_temp(file_path, content)
+                try:
+                    if sync:
+                        _sync_data(fd)
+                finally:
+                    os.close(fd)
+            for file_path in files:
+                if os.path.exists(file_path):
+                    backup_path = temps[file_path] + ".bak"
+                    _backup(file_path, backup_path)
+                    backups[file_path] = backup_path
+                os.replace(temps[file_path], file_path)
+                del temps[file_path]
+                landed.append(file_path)
+        except OSError as e:
+            print(f"❌ Error saving {len(files)} file(s), rolling back: {e}")
+            for file_path in reversed(landed):
+                try:
+                    if file_path in backups:
+                        os.replace(backups.pop(file_path), file_path)
+                    else:
+                        os.unlink(file_path)
+                except OSError as restore_error:
+                    print(f"❌ Could not restore {file_path}: {restore_error}")
+            for path in list(temps.values()) + list(backups.values()):
+                _remove_quietly(path)
+            for directory in reversed(created_dirs):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    pass
+            self.file_manager._forget_directories(created_dirs)
+            return False
+
+        for backup_path in backups.values():
+            _remove_quietly(backup_path)
+        if sync:
+            for directory in {os.path.dirname(path) or "." for path in files}:
+                _sync_directory(directory)
+        self.file_manager._count_written(len(files))
+        for file_path in files:
+            print(f"✅ Successfully saved file: {file_path}")
+        self._record(staged, records)
+        return True
+
+    def _record(self, staged, records):
+        for file_path, content in staged.items():
+            inputs_hash, generated = records[file_path]
+            self.file_manager._record(file_path, content, inputs_hash, generated)
+
 
 class FileManager:
-    """Handles safe creation and modification of files."""
+    """
+    Handles safe creation and modification of files.
+    Files are written to a temp file in the target directory and renamed over the
+    target, so readers (or a crash) never see a half-written file. Writes under a
+    tracked project (see track()) are recorded in its Manifest. Each write holds a
+    per-file lock shared with other Synapse processes through the project's
+    .synapse/locks/files.lock, so concurrent runs on one project only wait on each
+    other for the files they both write.
+    """
+    def __init__(self, fsync="file"):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'. Expected one of: {', '.join(FSYNC_POLICIES)}.")
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._manifests = []
+        # Directories known to exist this session, so each is checked or created once
+        self._directories = set()
+        # Directory -> LockFile of the project it lies in, and project_root()'s scan cache
+        self._lock_files = {}
+        self._roots = {}
+        # 'unchanged' counts writes skipped because the file already had the content
+        self.stats = {"written": 0, "unchanged": 0, "bytes_avoided": 0}
+
+    def _unchanged(self, file_path, content):
+        """Counts and reports a write that can be skipped because the file already holds 'content'."""
+        data = content.encode("utf-8")
+        if not same_content(file_path, data):
+            return False
+        with self._lock:
+            self.stats["unchanged"] += 1
+            self.stats["bytes_avoided"] += len(data)
+        print(f"⏭️ Unchanged, not rewritten: {file_path}")
+        return True
+
+    def _count_written(self, count=1):
+        with self._lock:
+            self.stats["written"] += count
+
+    def make_directories(self, directories, created=None):
+        """
+        Creates every missing directory in 'directories' (de-duplicated; '' is the current
+        directory). Each is attempted deepest first with a single mkdir, and parents are only
+        looked at when that fails, so an existing parent costs nothing and directories seen
+        before this session cost no system call at all.
+        Returns the directories created, parents before children; they are also appended
+        to 'created' as they are made, so a caller can undo them after a failure.
+        """
+        with self._lock:
+            wanted = {os.path.normpath(directory or ".") for directory in directories} - self._directories
+        created = [] if created is None else created
+        start = len(created)
+        # Deepest first: creating a directory makes its ancestors known as well
+        for directory in sorted(wanted, key=lambda path: path.count(os.sep), reverse=True):
+            with self._lock:
+                if directory in self._directories:
+                    continue
+            self._make_directory(directory, created)
+        for directory in created[start:]:
+            print(f"📁 Created directory: {directory}")
+        return created[start:]
+
+    def _make_directory(self, directory, created):
+        try:
+            os.mkdir(directory)
+            created.append(directory)
+        except FileNotFoundError:
+            parent = os.path.dirname(directory)
+            if not parent or parent == directory:
+                raise
+            self._make_directory(parent, created)
+            try:
+                os.mkdir(directory)
+                created.append(directory)
+            except FileExistsError:
+                pass
+        except OSError:
+            # Exists already (or mkdir is refused on an existing directory, as on some NFS mounts)
+            if not os.path.isdir(directory):
+                raise
+        with self._lock:
+            while directory and directory not in self._directories:
+                self._directories.add(directory)
+                parent = os.path.dirname(directory)
+                directory = parent if parent != directory else None
+
+    def _forget_directories(self, directories):
+        with self._lock:
+            self._directories.difference_update(directories)
+
+    def _lock_file(self, directory):
+        """The LockFile guarding writes in 'directory': '.synapse/locks/files.lock' of its project."""
+        with self._lock:
+            lock = self._lock_files.get(directory)
+            if lock is None:
+                lock = self._lock_files[directory] = project_lock_file(project_root(directory, self._roots), "files")
+            return lock
+
+    @contextmanager
+    def _hold(self, *file_paths):
+        groups = {}
+        for path in file_paths:
+            path = os.path.normcase(os.path.abspath(path))
+            groups.setdefault(self._lock_file(os.path.dirname(path)), []).append(path)
+        what = file_paths[0] if len(file_paths) == 1 else f"{len(file_paths)} files"
+        # Lock files are taken in path order and the names in each in one sorted pass,
+        # so holders of overlapping sets can't deadlock; never nest _hold() calls
+        with ExitStack() as stack:
+            for lock in sorted(groups, key=lambda lock: lock.path):
+                stack.enter_context(lock.hold(*groups[lock], waiting=f"Waiting for another Synapse process writing {what}..."))
+            yield
+
+    def track(self, manifest):
+        """Records every later write inside manifest's project in it. Saved by flush()."""
+        with self._lock:
+            if manifest not in self._manifests:
+                self._manifests.append(manifest)
+        return manifest
+
+    def manifest_for(self, file_path):
+        """The tracked Manifest covering file_path, or None."""
+        for manifest in self._manifests:
+            if manifest.covers(file_path):
+                return manifest
+        return None
+
+    def _record(self, file_path, content, inputs_hash=None, generated=None):
+        manifest = self.manifest_for(file_path)
+        if manifest is not None:
+            if generated is None:
+                generated = content
+            manifest.record(file_path, inputs_hash, generated, clean=generated == content)
+
+    def __enter__(self):
+        return self
 
-    def create_file(self, file_path, content):
+    def __exit__(self, *exc):
+        self.flush()
+
+    def _write_temp(self, file_path, content):
+        """
+        Writes content (str, or bytes/a list of byte chunks) to a new temp file next to
+        file_path. Returns (fd, tmp_path); the fd stays open.
+        """
+        directory = os.path.dirname(file_path) or "."
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+        except FileNotFoundError:
+            # Removed since it was cached as existing: create it again
+            self._forget_directories([os.path.normpath(directory)])
+            self.make_directories([directory])
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+        try:
+            if hasattr(os, "fchmod"):
+                try:
+                    mode = os.stat(file_path).st_mode & 0o7777
+                except OSError:
+                    mode = 0o666 & ~_current_umask()
+                os.fchmod(fd, mode)
+            chunks = [content.encode("utf-8")] if isinstance(content, str) else content
+            if isinstance(chunks, (bytes, bytearray)):
+                chunks = [chunks]
+            for chunk in chunks:
+                # Released on the way out, even on error, so a chunk taken from an mmap never keeps it open
+                with memoryview(chunk) as view:
+                    written = 0
+                    while written < view.nbytes:
+                        with view[written:] as rest:
+                            written += os.write(fd, rest)
+        except BaseException:
+            os.close(fd)
+            os.unlink(tmp_path)
+            raise
+        return fd, tmp_path
+
+    def create_file(self, file_path, content, inputs_hash=None):
         """
         Creates a new file with the given content.
         It will create parent directories if they don't exist.
+        A file that already holds exactly this content is left alone (and its mtime too).
         Returns True on success, False on failure.
         """
+        with self._hold(file_path):
+            return self._create_file(file_path, content, inputs_hash)
+
+    def _create_file(self, file_path, content, inputs_hash):
+        if self._unchanged(file_path, content):
+            self._record(file_path, content, inputs_hash)
+            return True
         try:
-            # Ensure the parent directory exists
             parent_dir = os.path.dirname(file_path)
-            if not os.path.exists(parent_dir):
-                os.makedirs(parent_dir)
-                print(f"📁 Created directory: {parent_dir}")
-
-            # Write the content to the file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            self.make_directories([parent_dir])
+            fd, tmp_path = self._write_temp(file_path, content)
+            try:
+                if self.fsync == "file":
+                    _sync_data(fd)
+            finally:
+                os.close(fd)
+            try:
+                os.replace(tmp_path, file_path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+            if self.fsync == "file":
+                _sync_directory(parent_dir or ".")
 
+            self._count_written()
             print(f"✅ Successfully saved file: {file_path}")
+            self._record(file_path, content, inputs_hash)
             return True
-        except IOError as e:
+        except (IOError, OSError) as e:
             print(f"❌ Error saving file {file_path}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def patch_file(self, file_path, make_edits):
+        """
+        Applies minimal edits to an existing file. make_edits(data) receives the file's
+        bytes (an mmap for large files) and returns a list of (offset, bytes) insertions,
+        [] if nothing needs to change, or None if the file can't be patched. The result is
+        written atomically under this manager's fsync policy. Returns the number of
+        insertions made (0 if the file was already up to date), or None on failure.
+        The file stays locked against other Synapse processes from read to rename.
+        """
+        with self._hold(file_path):
+            return self._patch_file(file_path, make_edits)
+
+    def _patch_file(self, file_path, make_edits):
+        try:
+            with open(file_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                mapped = size >= MMAP_THRESHOLD
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if mapped else f.read()
+                original = memoryview(data)
+                chunks = []
+                try:
+                    edits = make_edits(data)
+                    if edits is None:
+                        print(f"❌ Could not find where to patch {file_path}.")
+                        return None
+                    if not edits:
+                        return 0
+                    # Untouched stretches are memoryview slices of the original, so they go from the
+                    # mapping (or the bytes read) to the temp file without being copied in between
+                    position = 0
+                    for offset, text in sorted(edits, key=lambda edit: edit[0]):
+                        chunks.append(original[position:offset])
+                        chunks.append(text)
+                        position = offset
+                    chunks.append(original[position:])
+                    fd, tmp_path = self._write_temp(file_path, chunks)
+                finally:
+                    # An mmap can't be closed while views of it are alive
+                    for chunk in chunks:
+                        if isinstance(chunk, memoryview):
+                            chunk.release()
+                    original.release()
+                    if mapped:
+                        data.close()
+            try:
+                if self.fsync != "off":
+                    _sync_data(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, file_path)
+            if self.fsync != "off":
+                _sync_directory(os.path.dirname(file_path) or ".")
+            self._count_written()
+            print(f"🩹 Patched file: {file_path}")
+            return len(edits)
+        except (IOError, OSError) as e:
+            print(f"❌ Error patching file {file_path}: {e}")
+            return None
+
+    def transaction(self):
+        """Returns a WriteTransaction that writes its staged files all together or not at all."""
+        return WriteTransaction(self)
+
+    def write_files(self, files):
+        """Writes {file_path: content} as one transaction. Returns True if every file was written."""
+        transaction = self.transaction()
+        for file_path, content in files.items():
+            transaction.write(file_path, content)
+        return transaction.commit()
+
+    def flush(self):
+        """Saves the tracked manifests."""
+        for manifest in list(self._manifests):
+            try:
+                manifest.save()
+            except OSError as e:
+                print(f"❌ Could not save the manifest {manifest.path}: {e}")
@@ -0,0 +1,38 @@
+import os
+from collections import namedtuple
+
+# Build output, dependencies and tool state never contain project sources
+PRUNED_DIRS = {"bin", "obj", "node_modules", ".git", ".vs", ".vscode", ".idea", ".synapse"}
+SOURCE_EXTENSIONS = (".cs", ".cshtml")
+
+FileEntry = namedtuple("FileEntry", ["path", "size", "mtime_ns"])
+
+
+def scan_project(project_path, extensions=SOURCE_EXTENSIONS, pruned_dirs=PRUNED_DIRS):
+    """
+    Walks the project once with os.scandir and returns {relative_path: FileEntry}
+    for every source file. Relative paths always use '/' so they are stable across platforms.
+    Pruned directories are skipped entirely and symlinked directories are not followed.
+    """
+    entries = {}
+    pending = [(project_path, "")]
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            scanner = os.scandir(directory)
+        except OSError:
+            continue
+        with scanner:
+            for entry in scanner:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in pruned_dirs:
+                            pending.append((entry.path, f"{prefix}{entry.name}/"))
+                    elif entry.name.endswith(extensions):
+                        stat = entry.stat(follow_symlinks=False)
+                        rel_path = prefix + entry.name
+                        entries[rel_path] = FileEntry(rel_path, stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    # The file vanished or is unreadable between listing and stat
+                    continue
+    return entries
@@ -0,0 +1,162 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class Job:
+    """
+    A unit of work run by the WorkerPool. Progress is recorded as a list of
+    (event, data) pairs so any number of listeners can replay and follow it.
+    """
+    def __init__(self, kind, params):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def emit(self, event, data):
+        """Records an event and wakes up anyone following the job."""
+        with self._cond:
+            self.events.append((event, data))
+            self._cond.notify_all()
+
+    def _set_status(self, status):
+        with self._cond:
+            self.status = status
+            self.events.append(("status", status))
+            self._cond.notify_all()
+
+    def wait_events(self, start, timeout=None):
+        """
+        Blocks until there are events after index 'start' or the job finishes.
+        Returns (new_events, finished).
+        """
+        with self._cond:
+            if len(self.events) <= start and not self.finished:
+                self._cond.wait(timeout)
+            return self.events[start:], self.finished
+
+    def wait(self, timeout=None):
+        """Blocks until the job finishes. Returns True if it did."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self.finished:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class WorkerPool:
+    """
+    Runs jobs from a bounded queue on a fixed set of worker threads.
+    'handlers' maps a job kind to a callable taking (params, on_token) and
+    returning a result dict; a result containing 'error' marks the job failed.
+    """
+    def __init__(self, handlers, workers=2, queue_size=32, keep_finished=1000):
+        self.handlers = handlers
+        self.workers = workers
+        self.keep_finished = keep_finished
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"synapse-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, kind, params):
+        """
+        Queues a job and returns it. Raises KeyError for an unknown kind and
+        queue.Full when the queue is at capacity, so callers can push back.
+        """
+        if kind not in self.handlers:
+            raise KeyError(kind)
+        job = Job(kind, params)
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._jobs_lock:
+                del self._jobs[job.id]
+            raise
+        return job
+
+    def get(self, job_id):
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._jobs_lock:
+            return list(self._jobs.values())
+
+    def queued(self):
+        return self._queue.qsize()
+
+    def shutdown(self, wait=True):
+        """Lets queued jobs drain, then stops the workers."""
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._run(job)
+
+    def _run(self, job):
+        job.started_at = time.time()
+        job._set_status("running")
+        try:
+            result = self.handlers[job.kind](job.params, lambda chunk: job.emit("token", chunk))
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        job.finished_at = time.time()
+        if isinstance(result, dict) and "error" in result:
+            job.error = result["error"]
+            job._set_status("failed")
+        else:
+            job.result = result
+            job._set_status("done")
+        self._forget_old_jobs()
+
+    def _forget_old_jobs(self):
+        with self._jobs_lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+            for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self._jobs[job_id]
@@ -0,0 +1,149 @@
+"""
+Advisory locks shared between Synapse processes (a developer's session and a CI run
+on the same repository, say). A LockFile hands out one exclusive lock per name by
+locking a single byte of the file, picked by hashing the name, with fcntl on POSIX or
+msvcrt on Windows. Unrelated names almost never share a byte, so two processes
+scaffolding different entities don't wait on each other. The OS drops the locks when
+a process dies, so a crash never leaves a stale lock behind.
+"""
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from core.paths import project_state_dir, user_cache_dir
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# Bytes a LockFile spreads its names over
+LOCK_SLOTS = 1 << 16
+
+# msvcrt has no blocking lock without a 10 second give-up; poll at this interval instead
+_POLL_INTERVAL = 0.05
+
+
+class LockFile:
+    """
+    Named cross-process locks backed by byte ranges of one file. POSIX locks belong to
+    the process, not the thread, so each byte also has a thread lock and the OS lock is
+    only taken by the first thread holding it. Use lock_file() to get the shared
+    instance for a path: closing any descriptor of the file would drop its locks.
+    """
+    def __init__(self, path, slots=LOCK_SLOTS):
+        self.path = path
+        self.slots = slots
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        self._lock = threading.Lock()
+        self._slot_locks = {}
+
+    def slot(self, name):
+        digest = hashlib.sha1(str(name).encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % self.slots
+
+    def _slot_lock(self, slot):
+        with self._lock:
+            return self._slot_locks.setdefault(slot, threading.Lock())
+
+    def _try_os_lock(self, slot):
+        if fcntl is not None:
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, slot)
+                return True
+            except OSError:
+                return False
+        if msvcrt is not None:
+            with self._lock:
+                os.lseek(self._fd, slot, os.SEEK_SET)
+                try:
+                    msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+                    return True
+                except OSError:
+                    return False
+        return True
+
+    def _os_lock(self, slot):
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, slot)
+            return
+        while not self._try_os_lock(slot):
+            time.sleep(_POLL_INTERVAL)
+
+    def _os_unlock(self, slot):
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, slot)
+        elif msvcrt is not None:
+            with self._lock:
+                os.lseek(self._fd, slot, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def hold(self, *names, waiting=None):
+        """
+        Holds the locks for all the names (in a fixed order, so two holders of
+        overlapping sets can't deadlock). If another process has one of them and
+        'waiting' is given, it is printed once before blocking.
+        """
+        slots = sorted({self.slot(name) for name in names})
+        held = []
+        try:
+            for slot in slots:
+                self._slot_lock(slot).acquire()
+                held.append(slot)
+                if not self._try_os_lock(slot):
+                    if waiting:
+                        print(f"⏳ {waiting}")
+                        waiting = None
+                    self._os_lock(slot)
+        except BaseException:
+            # The slot whose OS lock failed is released like the others; unlocking it is harmless
+            self._release(held)
+            raise
+        try:
+            yield
+        finally:
+            self._release(held)
+
+    def _release(self, slots):
+        for slot in reversed(slots):
+            try:
+                self._os_unlock(slot)
+            except OSError:
+                pass
+            self._slot_lock(slot).release()
+
+
+_lock_files = {}
+_lock_files_lock = threading.Lock()
+
+
+def lock_file(path):
+    """Returns the process-wide LockFile for a path."""
+    key = os.path.abspath(path)
+    with _lock_files_lock:
+        if key not in _lock_files:
+            _lock_files[key] = LockFile(key)
+        return _lock_files[key]
+
+
+def project_lock_file(project_path, name):
+    """
+    Returns the LockFile '<project>/.synapse/locks/<name>.lock'. Kept in the project, it
+    is shared by every process working there, whichever user, HOME or XDG_CACHE_HOME it
+    runs with. Without a project, or in one that can't be written to, the lock falls back
+    to the user cache directory.
+    """
+    fallback = os.path.join(user_cache_dir(), "locks", f"{name}.lock")
+    if project_path is None or not os.path.isdir(project_path):
+        return lock_file(fallback)
+    try:
+        return lock_file(os.path.join(project_state_dir(project_path), "locks", f"{name}.lock"))
+    except OSError:
+        return lock_file(fallback)
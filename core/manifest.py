@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from core.file_manager import file_digest
+from core.locks import project_lock_file
+from core.paths import project_state_dir
+
+# Entry states returned by Manifest.state()
+UNTRACKED, MISSING, CLEAN, EDITED = "untracked", "missing", "clean", "edited"
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """
+    Records every file Synapse generated in a project: the inputs that produced it,
+    the hash of the generated content, the size/mtime it had when written and when.
+    A batch run skips artifacts whose inputs have not changed, and state() tells a
+    file edited by hand apart from an untouched one with a stat() call; the file is
+    only hashed when its size or mtime moved. The last generated content of each file
+    is kept under .synapse/generated/ as the base for three-way merges.
+    Stored as .synapse/manifest.json with paths relative to the project root; save()
+    merges in what other processes recorded meanwhile, so concurrent runs don't drop
+    each other's entries.
+    """
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.path = os.path.join(project_state_dir(project_path), "manifest.json")
+        self.bases_dir = os.path.join(project_state_dir(project_path), "generated")
+        self._lock = threading.Lock()
+        self._changed = set()  # keys recorded or refreshed since the last save()
+        self.entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _key(self, file_path):
+        return os.path.relpath(file_path, self.project_path).replace(os.sep, "/")
+
+    def covers(self, file_path):
+        """True if file_path lies inside this manifest's project."""
+        relative = os.path.relpath(os.path.abspath(file_path), os.path.abspath(self.project_path))
+        return not relative.startswith(os.pardir) and not os.path.isabs(relative)
+
+    def is_current(self, file_path, inputs_hash):
+        """True if the file exists and was last generated from the same inputs."""
+        entry = self.entries.get(self._key(file_path))
+        return bool(entry) and entry["inputs_hash"] == inputs_hash and os.path.exists(file_path)
+
+    def state(self, file_path):
+        """
+        'untracked' (Synapse never wrote it), 'missing' (deleted since), 'clean' (still
+        holds what Synapse generated) or 'edited' (changed by hand).
+        """
+        key = self._key(file_path)
+        entry = self.entries.get(key)
+        if not entry:
+            return UNTRACKED
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return MISSING
+        if "content_hash" not in entry:
+            # Recorded by an older version without a checksum: nothing to compare against
+            return CLEAN
+        if st.st_size == entry.get("size") and st.st_mtime_ns == entry.get("mtime_ns"):
+            return CLEAN
+        try:
+            same = file_digest(file_path).hex() == entry["content_hash"]
+        except OSError:
+            return MISSING
+        if same:
+            # Touched but not changed (checkout, copy): remember the new stat so the next check is cheap again
+            with self._lock:
+                entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+                self._changed.add(key)
+        return CLEAN if same else EDITED
+
+    def record(self, file_path, inputs_hash=None, generated=None, clean=True):
+        """
+        Records that Synapse just wrote file_path from 'generated' content. With
+        clean=False what landed differs from 'generated' (a merge kept hand edits), so
+        the file keeps reporting 'edited' and the next run merges again. Without an
+        inputs_hash (an interactive save) the content's inputs are unknown, so a batch
+        run regenerates the file instead of taking it as up to date.
+        """
+        key = self._key(file_path)
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return
+        entry = {"generated_at": time.time(), "size": None, "mtime_ns": None}
+        if clean:
+            entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+        with self._lock:
+            previous = self.entries.get(key, {})
+            entry["inputs_hash"] = inputs_hash
+            if generated is not None:
+                entry["content_hash"] = content_hash(generated)
+            elif "content_hash" in previous:
+                entry["content_hash"] = previous["content_hash"]
+            self.entries[key] = entry
+            self._changed.add(key)
+        if generated is not None and (previous.get("content_hash") != entry["content_hash"]
+                                      or not os.path.exists(self._base_path(key))):
+            self._save_base(key, generated)
+
+    def _base_path(self, key):
+        return os.path.join(self.bases_dir, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def _save_base(self, key, generated):
+        # Not synced: a lost base only means the next edited file is kept instead of merged
+        try:
+            os.makedirs(self.bases_dir, exist_ok=True)
+            tmp_path = f"{self._base_path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(generated)
+            os.replace(tmp_path, self._base_path(key))
+        except OSError:
+            pass
+
+    def base(self, file_path):
+        """The content Synapse last generated for file_path, or None if it wasn't kept."""
+        key = self._key(file_path)
+        entry = self.entries.get(key)
+        try:
+            with open(self._base_path(key), 'r', encoding='utf-8', newline='') as f:
+                generated = f.read()
+        except OSError:
+            return None
+        if not entry or entry.get("content_hash") not in (None, content_hash(generated)):
+            return None
+        return generated
+
+    def save(self):
+        with self._lock:
+            if not self._changed:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with project_lock_file(self.project_path, "manifest").hold("manifest"):
+                # Entries this process didn't touch may have been updated by another one
+                entries = self._read()
+                entries.update((key, self.entries[key]) for key in self._changed)
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"version": 2, "files": entries}, f, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            self.entries = entries
+            self._changed = set()
@@ -0,0 +1,105 @@
+import re
+from functools import lru_cache
+
+# singular -> plural for words the suffix rules get wrong
+IRREGULAR = {
+    "person": "people", "child": "children", "man": "men", "woman": "women",
+    "mouse": "mice", "goose": "geese", "tooth": "teeth", "foot": "feet", "ox": "oxen",
+    "datum": "data", "medium": "media", "criterion": "criteria", "phenomenon": "phenomena",
+    "analysis": "analyses", "basis": "bases", "crisis": "crises", "thesis": "theses",
+    "diagnosis": "diagnoses", "axis": "axes", "index": "indices", "matrix": "matrices",
+    "vertex": "vertices", "appendix": "appendices", "cactus": "cacti", "alumnus": "alumni",
+    "leaf": "leaves", "knife": "knives", "life": "lives", "wife": "wives", "half": "halves",
+    "shelf": "shelves", "wolf": "wolves", "thief": "thieves", "loaf": "loaves",
+    "quiz": "quizzes", "move": "moves", "movie": "movies", "cookie": "cookies",
+}
+IRREGULAR_SINGULAR = {plural: singular for singular, plural in IRREGULAR.items()}
+UNCOUNTABLE = {
+    "equipment", "information", "money", "species", "series", "fish", "sheep", "deer",
+    "news", "rice", "software", "hardware", "feedback", "metadata", "inventory", "staff",
+}
+
+# 'OrderItem' -> ('Order', 'Item'): inflection only ever touches the last word
+_LAST_WORD = re.compile(r"^(.*?)([A-Z]?[^A-Z]*)$")
+
+
+def _split(name):
+    head, last = _LAST_WORD.match(name).groups()
+    return head, last
+
+
+def _with_case(word, template):
+    return word.capitalize() if template[:1].isupper() else word
+
+
+def singularize(name):
+    """'Categories' -> 'Category', 'People' -> 'Person', 'OrderItems' -> 'OrderItem'."""
+    head, last = _split(name)
+    word = last.lower()
+    if word in UNCOUNTABLE or word in IRREGULAR:
+        return name
+    if word in IRREGULAR_SINGULAR:
+        return head + _with_case(IRREGULAR_SINGULAR[word], last)
+    if word.endswith("ies") and len(word) > 4:
+        return head + last[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes", "zzes")):
+        return head + last[:-2]
+    if word.endswith("uses"):
+        return head + last[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return head + last[:-1]
+    return name
+
+
+def pluralize(name):
+    """'Category' -> 'Categories', 'Person' -> 'People', 'Status' -> 'Statuses'."""
+    head, last = _split(name)
+    word = last.lower()
+    if word in UNCOUNTABLE or word in IRREGULAR_SINGULAR:
+        return name
+    if word in IRREGULAR:
+        return head + _with_case(IRREGULAR[word], last)
+    if word.endswith("y") and len(word) > 1 and word[-2] not in "aeiou":
+        return head + last[:-1] + "ies"
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        return head + last + "es"
+    return name + "s"
+
+
+@lru_cache(maxsize=65536)
+def normalize(name):
+    """Canonical key shared by a name's singular and plural forms: 'Products' and 'Product' -> 'product'."""
+    return singularize(name).lower()
+
+
+class ControllerIndex:
+    """
+    Hashed lookup from model names to the controllers that serve them. Both sides are
+    normalized through the singular/plural table, so 'Category' finds 'CategoriesController'
+    (reported as 'Categories') as well as a legacy 'CategorysController'. A controller named
+    exactly pluralize(model), as generated, is always found.
+    """
+    def __init__(self, controllers):
+        # Exact names first: singularize() can't tell 'Aliases' (Alias) from 'Cases' (Case),
+        # but the controller this tool generates is always named pluralize(model)
+        self._by_name = {controller.lower(): controller for controller in controllers}
+        self._by_key = {}
+        for controller in controllers:
+            self._by_key.setdefault(normalize(controller), controller)
+            # Controllers generated before pluralization was fixed are named '<Model>s'
+            if controller.endswith("s"):
+                self._by_key.setdefault(normalize(controller[:-1]), controller)
+
+    def find(self, model_name):
+        """Returns the controller name for a model, or None."""
+        return self._by_name.get(pluralize(model_name).lower()) or self._by_key.get(normalize(model_name))
+
+
+def match_models(models, controllers):
+    """Splits models into (done, missing) in O(models + controllers)."""
+    index = ControllerIndex(controllers)
+    done = []
+    missing = []
+    for model in models:
+        (done if index.find(model) else missing).append(model)
+    return done, missing
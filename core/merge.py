@@ -0,0 +1,69 @@
+from difflib import SequenceMatcher
+
+
+def _changes(base, other):
+    """Regions of 'base' that 'other' replaced, as (start, end, replacement_lines)."""
+    matcher = SequenceMatcher(None, base, other, autojunk=False)
+    return [(i1, i2, other[j1:j2]) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def _apply(base, start, end, changes):
+    """base[start:end] with the given changes (all inside that range) applied."""
+    lines = []
+    position = start
+    for i1, i2, replacement in changes:
+        lines.extend(base[position:i1])
+        lines.extend(replacement)
+        position = i2
+    lines.extend(base[position:end])
+    return lines
+
+
+def merge3(base, mine, theirs, labels=("edited", "generated")):
+    """
+    Three-way line merge: applies the changes from base to 'mine' and from base to
+    'theirs' together. Where both touched the same lines differently, both versions are
+    kept between conflict markers. Returns (merged_text, conflict_count).
+    """
+    base_lines = base.splitlines(keepends=True)
+    mine_lines = mine.splitlines(keepends=True)
+    theirs_lines = theirs.splitlines(keepends=True)
+    tagged = sorted([(i1, i2, lines, 0) for i1, i2, lines in _changes(base_lines, mine_lines)] +
+                    [(i1, i2, lines, 1) for i1, i2, lines in _changes(base_lines, theirs_lines)],
+                    key=lambda change: (change[0], change[1]))
+
+    # Group changes whose base ranges overlap (or both insert at the same point)
+    groups = []
+    for change in tagged:
+        if groups and (change[0] < groups[-1]["end"] or change[0] == groups[-1]["start"] == groups[-1]["end"]
+                       or (change[0] == groups[-1]["end"] and change[0] == change[1])):
+            group = groups[-1]
+            group["end"] = max(group["end"], change[1])
+            group["changes"].append(change)
+        else:
+            groups.append({"start": change[0], "end": change[1], "changes": [change]})
+
+    merged = []
+    conflicts = 0
+    position = 0
+    for group in groups:
+        merged.extend(base_lines[position:group["start"]])
+        sides = [[(i1, i2, lines) for i1, i2, lines, side in group["changes"] if side == s] for s in (0, 1)]
+        versions = [_apply(base_lines, group["start"], group["end"], changes) for changes in sides]
+        if not sides[1] or versions[0] == versions[1]:
+            merged.extend(versions[0])
+        elif not sides[0]:
+            merged.extend(versions[1])
+        else:
+            conflicts += 1
+            ending = "" if not versions[0] or versions[0][-1].endswith("\n") else "\n"
+            merged.append(f"<<<<<<< {labels[0]}\n")
+            merged.extend(versions[0])
+            merged.append(ending + "=======\n")
+            merged.extend(versions[1])
+            if versions[1] and not versions[1][-1].endswith("\n"):
+                merged.append("\n")
+            merged.append(f">>>>>>> {labels[1]}\n")
+        position = group["end"]
+    merged.extend(base_lines[position:])
+    return "".join(merged), conflicts
@@ -0,0 +1,412 @@
+import os
+import time
+from connectors.cached_connector import CachedConnector
+from connectors.errors import ProviderError
+from core import stats
+from core.analysis_history import AnalysisHistory, canonical_report, diff_reports
+from core.analyzer import ContextAnalyzer
+from core.code_stream import CodeExtractor
+from core.csharp import tokenize_spans
+from core.csharp_patch import add_db_set, add_service_registration, find_type_body
+from core.file_manager import FileManager
+from core.matching import match_models, pluralize
+from core.project_index import open_index
+from core.prompts import VIEW_INSTRUCTIONS, render
+from core.solution import load_graph, namespace_for
+
+VIEW_NAMES = list(VIEW_INSTRUCTIONS)
+
+# Lookups within this many seconds of the last re-scan use the index as it is
+SEARCH_MAX_AGE = 2.0
+
+
+def generate(ai_provider, prompt, on_token=None):
+    """
+    Sends a prompt to the provider and returns the full response.
+    When on_token is given, chunks are passed to it as they arrive (if the provider can stream).
+    Calls that actually reach the provider are recorded in the throughput history.
+    A stream that fails part way returns the error ('Error: ...') instead of the partial answer.
+    """
+    cached = isinstance(ai_provider, CachedConnector) and ai_provider.cache_key(prompt) in ai_provider.cache
+    started = time.perf_counter()
+    if on_token is None:
+        text = ai_provider.generate_text(prompt)
+    elif not hasattr(ai_provider, "stream_text"):
+        text = ai_provider.generate_text(prompt)
+        on_token(text)
+    else:
+        chunks = []
+        try:
+            for chunk in ai_provider.stream_text(prompt):
+                chunks.append(chunk)
+                on_token(chunk)
+        except ProviderError as e:
+            return f"Error: {e}"
+        text = "".join(chunks)
+    if not cached and not text.startswith("Error"):
+        stats.record(ai_provider, prompt, text, time.perf_counter() - started)
+    return text
+
+
+def generate_code(ai_provider, prompt, on_token=None):
+    """
+    Like generate(), for prompts answered with code. The answer is streamed through a
+    CodeExtractor, so fences and surrounding prose never reach the file, and reading
+    stops as soon as the code block closes instead of waiting out the explanation the
+    model adds after it. on_token receives the extracted code. Returns the code, or the
+    error ('Error: ...') if the provider failed, even when part of the code had arrived:
+    a truncated file must never be saved as if it were complete.
+    """
+    cached = isinstance(ai_provider, CachedConnector) and ai_provider.cache_key(prompt) in ai_provider.cache
+    started = time.perf_counter()
+    extractor = CodeExtractor()
+    chunks = []
+    stream = ai_provider.stream_text(prompt) if hasattr(ai_provider, "stream_text") else iter([ai_provider.generate_text(prompt)])
+    try:
+        for chunk in stream:
+            chunks.append(chunk)
+            code = extractor.feed(chunk)
+            if code and on_token:
+                on_token(code)
+            if extractor.done:
+                if isinstance(ai_provider, CachedConnector) and not cached:
+                    # The cache only stores streams read to the end; keep the answer as far as it was needed
+                    ai_provider.store(prompt, "".join(chunks))
+                break
+    except ProviderError as e:
+        return f"Error: {e}"
+    finally:
+        if hasattr(stream, "close"):
+            # Closing the provider's stream drops the connection, which stops generation
+            stream.close()
+    code = extractor.close()
+    if code and on_token:
+        on_token(code)
+    text = "".join(chunks)
+    if not cached and not text.startswith("Error"):
+        stats.record(ai_provider, prompt, text, time.perf_counter() - started)
+    return extractor.code()
+
+
+def _check_project(project_path):
+    if not os.path.isdir(project_path):
+        return {"error": f"Project path '{project_path}' does not exist."}
+    return None
+
+
+def load_analyzer(project_path, analyzer=None):
+    """
+    Returns a ContextAnalyzer with the project's index brought up to date, or 'analyzer'
+    as it is. Lookups made together (a batch plan, one controller) pass the same analyzer
+    so the project is scanned once rather than once per lookup.
+    """
+    if analyzer is None:
+        analyzer = ContextAnalyzer(project_path)
+        analyzer.refresh()
+    return analyzer
+
+
+def describe_model(project_path, model_name, analyzer=None):
+    """
+    Looks the model up in the project's symbol table and entity graph. Returns
+    {'namespace', 'properties', 'context', 'db_set', 'relationships'} where properties is a
+    'Type Name, ...' string and context the DbContext exposing it (None if unknown),
+    or None if the model is not in the project. See load_analyzer() for 'analyzer'.
+    """
+    analyzer = load_analyzer(project_path, analyzer)
+    entry = analyzer.symbol_table.get(model_name)
+    if entry is None or entry["kind"] not in ("class", "record"):
+        return None
+    properties = ", ".join(f"{p['type']} {p['name']}" for p in entry["properties"])
+    graph = analyzer.entity_graph
+    context = graph.context_for(model_name)
+    return {
+        "namespace": entry["namespace"],
+        "properties": properties,
+        "context": context,
+        "db_set": context and graph.db_set(context, model_name),
+        "relationships": graph.describe_relationships(model_name),
+    }
+
+
+def find_context(project_path, model_name, analyzer=None):
+    """The DbContext for a model according to the entity graph, or None if it can't be told."""
+    return load_analyzer(project_path, analyzer).entity_graph.context_for(model_name)
+
+
+def controller_name(model_name):
+    """'Category' -> 'CategoriesController'. The Views folder uses the same plural."""
+    return f"{pluralize(model_name)}Controller"
+
+
+def artifact_path(project_path, kind, model_name, view_name=None):
+    """Returns where a generated 'model', 'controller' or 'view' is saved."""
+    if kind == "model":
+        return os.path.join(project_path, "Models", f"{model_name}.cs")
+    if kind == "controller":
+        return os.path.join(project_path, "Controllers", f"{controller_name(model_name)}.cs")
+    return os.path.join(project_path, "Views", pluralize(model_name), f"{view_name}.cshtml")
+
+
+def _save(result, save):
+    # A failed generation comes back as an "Error: ..." message, which is never saved as code
+    result["saved"] = bool(save) and not result["code"].startswith("Error") and FileManager().create_file(result["file_path"], result["code"])
+    return result
+
+
+# --- Model ---
+def build_model_prompt(project_path, model_name, properties):
+    return render("model", namespace=namespace_for(project_path, "Models"), model_name=model_name, properties=properties)
+
+
+def create_model(ai_provider, project_path, model_name, properties, save=False, on_token=None):
+    """Generates a model class. Returns a dict with 'file_path', 'code' and 'saved', or 'error'."""
+    error = _check_project(project_path)
+    if error:
+        return error
+    model_name = model_name.strip().capitalize()
+    prompt = build_model_prompt(project_path, model_name, properties)
+    code = generate_code(ai_provider, prompt, on_token)
+    result = {"file_path": artifact_path(project_path, "model", model_name), "code": code}
+    return _save(result, save)
+
+
+# --- Controller ---
+def build_controller_prompt(project_path, model_name, context_name, model=None):
+    """'model' is the result of describe_model(), if the model is already in the project."""
+    model = model or {}
+    return render("controller", project_name=namespace_for(project_path), model_name=model_name,
+                  model_namespace=model.get("namespace") or namespace_for(project_path, "Models"),
+                  context_name=context_name, db_set=model.get("db_set") or pluralize(model_name),
+                  relationships=model.get("relationships") or "None",
+                  controller_name=controller_name(model_name))
+
+
+def create_controller(ai_provider, project_path, model_name, context_name=None, save=False, on_token=None, analyzer=None):
+    """
+    Generates a CRUD controller. Without a context_name, the DbContext exposing the model
+    is taken from the entity graph. When saved, the context gets a DbSet of the model if it
+    lacks one ('db_set' holds the ensure_db_set() result).
+    Returns a dict with 'file_path', 'code' and 'saved', or 'error'.
+    """
+    error = _check_project(project_path)
+    if error:
+        return error
+    analyzer = load_analyzer(project_path, analyzer)
+    model_name = model_name.strip().capitalize()
+    model = describe_model(project_path, model_name, analyzer)
+    context_name = (context_name or "").strip() or (model and model["context"]) or find_context(project_path, model_name, analyzer)
+    if not context_name:
+        return {"error": f"Could not tell which DbContext serves '{model_name}'; please give a context name."}
+    prompt = build_controller_prompt(project_path, model_name, context_name, model)
+    code = generate_code(ai_provider, prompt, on_token)
+    result = _save({"file_path": artifact_path(project_path, "controller", model_name), "code": code}, save)
+    if result["saved"]:
+        result["db_set"] = ensure_db_set(project_path, model_name, context_name, analyzer)
+    return result
+
+
+def ensure_db_set(project_path, model_name, context_name=None, analyzer=None):
+    """
+    Makes sure the DbContext exposes a DbSet of the model, patching the context class in
+    place if it doesn't. Returns {'context', 'file_path', 'patched'} or 'error'.
+    """
+    analyzer = load_analyzer(project_path, analyzer)
+    context_name = context_name or analyzer.entity_graph.context_for(model_name)
+    context = context_name and analyzer.symbol_table.get(context_name)
+    if not context:
+        return {"error": f"DbContext '{context_name or '?'}' was not found in the project."}
+    if analyzer.entity_graph.db_set(context_name, model_name):
+        return {"context": context_name, "file_path": None, "patched": False}
+    model = analyzer.symbol_table.get(model_name)
+    namespace = model["namespace"] if model else namespace_for(project_path, "Models")
+    # A partial context may be spread over several files; patch the first one that has a body
+    for path in context["paths"]:
+        file_path = os.path.join(project_path, path)
+        applied = FileManager().patch_file(
+            file_path, lambda data: add_db_set(data, context_name, model_name, pluralize(model_name), namespace))
+        if applied is not None:
+            return {"context": context_name, "file_path": file_path, "patched": applied > 0}
+    return {"error": f"Could not add a DbSet<{model_name}> to '{context_name}'."}
+
+
+def register_service(project_path, statement):
+    """
+    Adds a service registration such as 'builder.Services.AddScoped<IFoo, Foo>();' to the
+    project's Program.cs (or Startup.cs). Returns {'file_path', 'patched'} or 'error'.
+    """
+    analyzer = load_analyzer(project_path)
+    candidates = sorted((path for path in analyzer.files if os.path.basename(path) in ("Program.cs", "Startup.cs")),
+                        key=lambda path: (path.count("/"), os.path.basename(path) != "Program.cs"))
+    for path in candidates:
+        file_path = os.path.join(project_path, path)
+        applied = FileManager().patch_file(file_path, lambda data: add_service_registration(data, statement))
+        if applied is not None:
+            return {"file_path": file_path, "patched": applied > 0}
+    return {"error": "No Program.cs or Startup.cs with a place to register services was found."}
+
+
+# --- Views ---
+def build_view_prompt(project_path, model_name, properties, view_name, model_namespace=None):
+    model_type = f"{model_namespace or namespace_for(project_path, 'Models')}.{model_name}"
+    return render(f"view_{view_name.lower()}", project_name=namespace_for(project_path), model_name=model_name,
+                  properties=properties, model_type=model_type)
+
+
+def generate_view(ai_provider, project_path, model_name, properties, view_name, save=False, on_token=None, model=None):
+    """
+    Generates a single Razor view. Returns a dict with 'file_path', 'code' and 'saved', or 'error'.
+    The model's namespace (and its properties, if none are given) come from the symbol table;
+    pass 'model' from describe_model() to avoid looking it up again.
+    """
+    error = _check_project(project_path)
+    if error:
+        return error
+    model_name = model_name.strip().capitalize()
+    model = model or describe_model(project_path, model_name)
+    if not properties.strip() and model:
+        properties = model["properties"]
+    prompt = build_view_prompt(project_path, model_name, properties, view_name, model and model["namespace"])
+    code = generate_code(ai_provider, prompt, on_token)
+    result = {"file_path": artifact_path(project_path, "view", model_name, view_name), "code": code}
+    return _save(result, save)
+
+
+def generate_views(ai_provider, project_path, model_name, properties, views=None, save=False, on_token=None):
+    """
+    Generates the standard CRUD views. With 'save', the view set is written in one
+    transaction only if every view was generated, so a failure never leaves half a set.
+    Returns a dict with a 'views' list, or 'error'.
+    """
+    error = _check_project(project_path)
+    if error:
+        return error
+    results = []
+    model = describe_model(project_path, model_name.strip().capitalize())
+    for view_name in views or VIEW_NAMES:
+        if view_name not in VIEW_NAMES:
+            return {"error": f"Unknown view '{view_name}'. Expected one of: {', '.join(VIEW_NAMES)}."}
+        results.append(generate_view(ai_provider, project_path, model_name, properties, view_name, False, on_token, model))
+    if save:
+        complete = not any(result["code"].startswith("Error") for result in results)
+        saved = complete and FileManager().write_files({result["file_path"]: result["code"] for result in results})
+        for result in results:
+            result["saved"] = saved
+    return {"views": results}
+
+
+# --- Analysis ---
+def analyze_project(project_path):
+    """
+    Runs the context analyzer and splits models into those with and without a controller.
+    'projects' maps each project of the solution to its root namespace.
+    """
+    report = ContextAnalyzer(project_path).analyze()
+    if "error" in report:
+        return report
+    done, missing = match_models(report["models"], report["controllers"])
+    graph = load_graph(project_path)
+    return {
+        "projects": {name: project["root_namespace"] for name, project in graph.projects.items()},
+        "models": report["models"],
+        "controllers": report["controllers"],
+        "done": done,
+        "missing": missing,
+    }
+
+
+def build_analysis_prompt(status):
+    done_items = [f"Model '{m}' has a Controller." for m in status["done"]]
+    remaining_items = [f"Model '{m}' is missing a Controller." for m in status["missing"]]
+    status_report = f"Completed: {', '.join(done_items) or 'None'}. Missing: {', '.join(remaining_items) or 'None'}."
+    return render("analysis", status=status_report)
+
+
+def general_analysis(ai_provider, project_path, on_token=None):
+    """
+    Analyzes the project and asks the AI for a summary. Returns the status plus 'summary',
+    'cached' (the summary was reused because the report and model are unchanged) and
+    'changes' (diff_reports() against the previous analysis, None on the first run), or 'error'.
+    """
+    status = analyze_project(project_path)
+    if "error" in status:
+        return status
+    history = AnalysisHistory(project_path)
+    report = canonical_report(status)
+    status["changes"] = diff_reports(history.last_report, report) if history.last_report is not None else None
+    status["cached"] = False
+    if not status["done"] and not status["missing"]:
+        status["summary"] = None
+        history.record(report)
+        return status
+    prompt = build_analysis_prompt(status)
+    key = history.key(report, stats.provider_id(ai_provider), prompt.cache_tag)
+    summary = history.summary(key)
+    if summary is not None:
+        status["cached"] = True
+        if on_token:
+            on_token(summary)
+        history.record(report, key)
+    else:
+        summary = generate(ai_provider, prompt, on_token)
+        history.record(report, key, None if summary.startswith("Error") else summary)
+    status["summary"] = summary
+    return status
+
+
+# --- Search ---
+def find_symbols(project_path, query, limit=20, fuzzy=False, kinds=None):
+    """
+    Finds types, properties and files whose name contains 'query' (or nearly matches it,
+    with 'fuzzy'). Returns a list of {'name', 'kind', 'path', 'container', 'score'}, or 'error'.
+    The project is re-scanned at most once every SEARCH_MAX_AGE seconds, and not at all
+    while a watcher keeps the index live.
+    """
+    error = _check_project(project_path)
+    if error:
+        return error
+    index = open_index(project_path)
+    index.refresh_if_older(SEARCH_MAX_AGE)
+    return index.search(query, limit=limit, fuzzy=fuzzy, kinds=kinds)
+
+
+def find_references(project_path, type_name):
+    """
+    Returns [{'controller', 'path'}] for the controllers whose declaration or body mentions
+    type_name (outside comments and strings), or 'error'. Other types sharing the file
+    don't count.
+    """
+    error = _check_project(project_path)
+    if error:
+        return error
+    index = open_index(project_path)
+    index.refresh_if_older(SEARCH_MAX_AGE)
+    symbol_table = index.symbol_table()
+    name = type_name.encode("utf-8")
+    tokens_by_path = {}
+    references = []
+    for controller in symbol_table.controllers():
+        for path in symbol_table.get(controller)["paths"]:
+            if path not in tokens_by_path:
+                try:
+                    with open(os.path.join(project_path, path), 'rb') as f:
+                        tokens_by_path[path] = tokenize_spans(f.read())
+                except OSError:
+                    tokens_by_path[path] = []
+            if _mentions(tokens_by_path[path], controller, name):
+                references.append({"controller": controller, "path": path})
+                break
+    return references
+
+
+def _mentions(tokens, type_name, name):
+    """True if the declaration of type_name in 'tokens' (from tokenize_spans) has the token 'name' in its bases or body."""
+    body = find_type_body(tokens, type_name)
+    if body is None:
+        return False
+    start, end = body
+    # Back to the declared name, so bases such as 'CrudController<Product>' count
+    own_name = type_name.encode("utf-8")
+    while start > 0 and tokens[start][0] != own_name:
+        start -= 1
+    return any(token == name for token, _, _ in tokens[start + 1:end])
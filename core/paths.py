@@ -0,0 +1,48 @@
+import os
+
+
+def user_cache_dir():
+    """
+    Returns the per-user cache directory Synapse shares across projects.
+    Honours XDG_CACHE_HOME and falls back to LOCALAPPDATA on Windows.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "synapse")
+
+
+def project_state_dir(project_path):
+    """Returns the directory inside a project where Synapse keeps its manifest and indexes."""
+    return os.path.join(project_path, ".synapse")
+
+
+def _marker_dirs(directory, cache):
+    """(nearest directory at or above 'directory' holding a .sln, same for a .csproj), each None if there is none."""
+    if directory in cache:
+        return cache[directory]
+    try:
+        with os.scandir(directory) as scanner:
+            names = [entry.name for entry in scanner]
+    except OSError:
+        names = []
+    parent = os.path.dirname(directory)
+    sln, csproj = _marker_dirs(parent, cache) if parent != directory else (None, None)
+    if any(name.endswith(".sln") for name in names):
+        sln = directory
+    if any(name.endswith(".csproj") for name in names):
+        csproj = directory
+    cache[directory] = (sln, csproj)
+    return sln, csproj
+
+
+def project_root(path, cache=None):
+    """
+    Returns the root of the project a path lies in: the nearest directory above it holding
+    a .sln, else the nearest holding a .csproj, or None outside any project. Every process
+    gets the same answer for the same file, so state keyed to it is shared by all of them.
+    'cache' is a dict a caller can keep to avoid scanning the same directories again.
+    """
+    directory = os.path.abspath(path if os.path.isdir(path) else os.path.dirname(path))
+    sln, csproj = _marker_dirs(directory, {} if cache is None else cache)
+    return sln or csproj
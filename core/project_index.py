@@ -0,0 +1,336 @@
+import hashlib
+import heapq
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from core.csharp import parse_csharp
+from core.entity_graph import EntityGraph
+from core.indexer import FileEntry, scan_project
+from core.locks import project_lock_file
+from core.paths import user_cache_dir
+from core.search import SearchIndex
+from core.solution import load_graph
+from core.symbols import SymbolTable
+
+# Bump when extract_symbols changes so existing indexes are re-parsed
+PARSER_VERSION = 2
+
+# Bump when the search tables change so they are rebuilt from the stored symbols
+SEARCH_VERSION = 1
+
+# Below this much changed source, process start-up costs more than parallel parsing saves
+PARALLEL_MIN_FILES = 256
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+# Fixed per-file cost (open/read/close) counted when balancing chunks, in bytes
+FILE_OVERHEAD_BYTES = 2048
+
+
+def extract_symbols(file_path):
+    """Returns the types declared in a C# file, as produced by core.csharp.parse_csharp."""
+    if not file_path.endswith(".cs"):
+        return []
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+    return parse_csharp(data)
+
+
+def parse_chunk(project_path, rel_paths):
+    """
+    Process-pool entry point: parses a chunk of files and returns [(rel_path, symbols_json), ...].
+    Symbols travel back as compact JSON strings, which pickle far cheaper than nested dicts
+    and go straight into the SQLite row.
+    """
+    return [(rel_path, json.dumps(extract_symbols(os.path.join(project_path, rel_path)), separators=(",", ":")))
+            for rel_path in rel_paths]
+
+
+def balanced_chunks(entries, count):
+    """Splits FileEntries into at most 'count' lists of paths with roughly equal total size."""
+    loads = [(0, i) for i in range(count)]
+    chunks = [[] for _ in range(count)]
+    # Largest first into the currently lightest chunk (greedy LPT scheduling)
+    for entry in sorted(entries, key=lambda entry: entry.size, reverse=True):
+        load, i = heapq.heappop(loads)
+        chunks[i].append(entry.path)
+        heapq.heappush(loads, (load + entry.size + FILE_OVERHEAD_BYTES, i))
+    return [chunk for chunk in chunks if chunk]
+
+
+def parser_context():
+    """
+    Start method for parser processes. Forking copies the locks other threads hold at that
+    moment (server workers, watchers, background writers) into the child, which can hang
+    it; a forkserver, or spawn where there is none, starts workers from a clean process.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def default_index_path(project_path):
+    """Indexes live in the user cache dir, one SQLite file per project root."""
+    digest = hashlib.sha1(os.path.abspath(project_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(user_cache_dir(), "indexes", f"{digest}.db")
+
+
+class ProjectIndex:
+    """
+    Persistent, incremental index of a project's source files backed by SQLite.
+    Every file is recorded with its size, mtime and extracted symbols; refresh()
+    only re-parses files whose (size, mtime) signature changed since the last run.
+    The trigram SearchIndex is stored in the same database and updated in the same
+    transactions, so a new process searches without building anything. Updates hold a lock shared with other Synapse processes using the same index, and
+    pick up what those processes committed (SQLite's data_version) before writing.
+    """
+    def __init__(self, project_path, db_path=None, workers=None):
+        self.project_path = project_path
+        # Parser processes for large refreshes; 1 always parses in-process
+        self.workers = workers or os.cpu_count() or 1
+        self.db_path = db_path or default_index_path(project_path)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, symbols TEXT)")
+        self._search = SearchIndex(self._db)
+        self._db.commit()
+        self._locks = project_lock_file(project_path, "index")
+        with self._hold():
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'parser_version'").fetchone()
+            if row is None or int(row[0]) != PARSER_VERSION:
+                with self._db:
+                    self._db.execute("DELETE FROM files")
+                    self._db.execute("DELETE FROM meta WHERE key = 'entity_graph'")
+                    self._search.clear()
+                    self._db.execute("INSERT OR REPLACE INTO meta VALUES ('parser_version', ?)", (str(PARSER_VERSION),))
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'search_version'").fetchone()
+            if row is None or int(row[0]) != SEARCH_VERSION:
+                with self._db:
+                    # Built from the stored symbols, nothing is parsed again
+                    self._search.clear()
+                    for path, symbols in self._db.execute("SELECT path, symbols FROM files").fetchall():
+                        self._search.add_path(path, json.loads(symbols))
+                    self._db.execute("INSERT OR REPLACE INTO meta VALUES ('search_version', ?)", (str(SEARCH_VERSION),))
+        self._files = None
+        self._symbols = None
+        self._graph = None
+        # SymbolTable over self._symbols and its {'models', 'controllers'}; dropped with _graph
+        self._table = None
+        self._roles = None
+        self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        # When this process last re-scanned the project (time.monotonic())
+        self._refreshed_at = None
+        # Set by a ProjectWatcher while it keeps the index current
+        self.live = False
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _hold(self):
+        """Cross-process lock for updating the index; take it while holding self._lock."""
+        return self._locks.hold("index", waiting="Waiting for another Synapse process updating the index...")
+
+    def _sync(self):
+        """Drops the in-memory copies if another process committed to the index since they were loaded."""
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._files = self._symbols = self._graph = self._table = self._roles = None
+            self._data_version = version
+
+    def _load(self):
+        if self._files is None:
+            self._files = {}
+            self._symbols = {}
+            for path, size, mtime_ns, symbols in self._db.execute("SELECT path, size, mtime_ns, symbols FROM files"):
+                self._files[path] = FileEntry(path, size, mtime_ns)
+                self._symbols[path] = json.loads(symbols)
+
+    @staticmethod
+    def _compiled(graph, rel_path):
+        """Views are always indexed; C# files only if their project compiles them (Compile Include/Remove)."""
+        return not rel_path.endswith(".cs") or graph.compiles(rel_path)
+
+    def refresh(self):
+        """
+        Re-scans the project and re-parses only new or changed files. C# files the project
+        doesn't compile (Compile Remove, or missing from an explicit Compile Include list)
+        are left out. Returns counts of 'added', 'changed', 'removed' and 'unchanged' files.
+        """
+        scanned = scan_project(self.project_path)
+        graph = load_graph(self.project_path)
+        scanned = {path: entry for path, entry in scanned.items() if self._compiled(graph, path)}
+        with self._lock, self._hold():
+            self._sync()
+            self._load()
+            added = [entry for path, entry in scanned.items() if path not in self._files]
+            changed = [entry for path, entry in scanned.items() if path in self._files and self._files[path] != entry]
+            removed = [path for path in self._files if path not in scanned]
+            self._apply(added + changed, removed)
+            self._refreshed_at = time.monotonic()
+        return {"added": len(added), "changed": len(changed), "removed": len(removed),
+                "unchanged": len(scanned) - len(added) - len(changed)}
+
+    def refresh_if_older(self, max_age):
+        """
+        Refreshes unless a ProjectWatcher keeps the index live or this process refreshed it
+        less than max_age seconds ago, so a burst of lookups (search-as-you-type) scans the
+        project once. Returns refresh()'s counts, or None if it was skipped.
+        """
+        with self._lock:
+            if self.live or (self._refreshed_at is not None and time.monotonic() - self._refreshed_at < max_age):
+                return None
+        return self.refresh()
+
+    def update_paths(self, rel_paths):
+        """
+        Re-indexes only the given relative paths, e.g. the ones a file watcher reported.
+        Paths that no longer exist are removed. Returns counts like refresh().
+        """
+        graph = load_graph(self.project_path)
+        with self._lock, self._hold():
+            self._sync()
+            self._load()
+            updated = []
+            removed = []
+            for rel_path in rel_paths:
+                try:
+                    if not self._compiled(graph, rel_path):
+                        # Excluded from the build: indexed as if it didn't exist
+                        raise FileNotFoundError(rel_path)
+                    stat = os.stat(os.path.join(self.project_path, rel_path))
+                except OSError:
+                    if rel_path in self._files:
+                        removed.append(rel_path)
+                    continue
+                entry = FileEntry(rel_path, stat.st_size, stat.st_mtime_ns)
+                if self._files.get(rel_path) != entry:
+                    updated.append(entry)
+            added = sum(1 for entry in updated if entry.path not in self._files)
+            self._apply(updated, removed)
+        return {"added": added, "changed": len(updated) - added, "removed": len(removed),
+                "unchanged": len(rel_paths) - len(updated) - len(removed)}
+
+    def _parse(self, entries):
+        """
+        Parses the given FileEntries and returns {rel_path: symbols_json}. Large batches are
+        split into size-balanced chunks and parsed in a ProcessPoolExecutor; small ones, or
+        any failure to start worker processes, fall back to parsing in this process.
+        """
+        total_bytes = sum(entry.size for entry in entries)
+        if self.workers > 1 and len(entries) >= PARALLEL_MIN_FILES and total_bytes >= PARALLEL_MIN_BYTES:
+            # Several chunks per worker so one slow chunk doesn't leave the others idle
+            chunks = balanced_chunks(entries, self.workers * 4)
+            try:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)), mp_context=parser_context()) as executor:
+                    futures = [executor.submit(parse_chunk, self.project_path, chunk) for chunk in chunks]
+                    return dict(row for future in futures for row in future.result())
+            except (OSError, RuntimeError) as e:
+                print(f"⚠️ Parallel parsing unavailable ({e}), parsing serially.")
+        return dict(parse_chunk(self.project_path, [entry.path for entry in entries]))
+
+    def _apply(self, updated, removed):
+        """Parses the updated entries and writes all changes in one transaction."""
+        parsed = self._parse(updated) if updated else {}
+        rows = []
+        for entry in updated:
+            symbols_json = parsed[entry.path]
+            rows.append((entry.path, entry.size, entry.mtime_ns, symbols_json))
+            self._files[entry.path] = entry
+            self._symbols[entry.path] = json.loads(symbols_json)
+        for path in removed:
+            del self._files[path]
+            del self._symbols[path]
+        if rows or removed:
+            self._graph = self._table = self._roles = None
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", rows)
+                self._db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+                # The search tables change in the same transaction, so they always match the files table
+                for entry in updated:
+                    self._search.add_path(entry.path, self._symbols[entry.path])
+                for path in removed:
+                    self._search.remove_path(path)
+                # Derived from the symbols; rebuilt on the next entity_graph() call
+                self._db.execute("DELETE FROM meta WHERE key = 'entity_graph'")
+
+    def files(self):
+        """Returns {relative_path: FileEntry} as of the last refresh."""
+        with self._lock:
+            self._load()
+            return dict(self._files)
+
+    def symbols(self):
+        """Returns {relative_path: [type, ...]} as of the last refresh."""
+        with self._lock:
+            self._load()
+            return dict(self._symbols)
+
+    def symbol_table(self):
+        """
+        Returns the SymbolTable as of the last refresh. It is built once and kept until
+        files change, so callers must not modify it.
+        """
+        with self._lock:
+            if self._table is None:
+                self._load()
+                self._table = SymbolTable(self._symbols)
+            return self._table
+
+    def roles(self):
+        """Returns {'models': [...], 'controllers': [...]} as classified by the SymbolTable, cached like it."""
+        with self._lock:
+            if self._roles is None:
+                table = self.symbol_table()
+                self._roles = {"models": table.models(), "controllers": table.controllers()}
+            return {role: list(names) for role, names in self._roles.items()}
+
+    def entity_graph(self):
+        """
+        Returns the EntityGraph (entities, relationships, DbSets per DbContext) as of the
+        last refresh. It is stored next to the symbols and only rebuilt after files change.
+        """
+        with self._lock:
+            if self._graph is None:
+                row = self._db.execute("SELECT value FROM meta WHERE key = 'entity_graph'").fetchone()
+                if row is not None:
+                    self._graph = EntityGraph.from_dict(json.loads(row[0]))
+                else:
+                    with self._hold():
+                        # Build from the symbols as committed, so the stored graph matches the files table
+                        self._sync()
+                        self._graph = EntityGraph.from_symbols(self.symbol_table())
+                        with self._db:
+                            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('entity_graph', ?)",
+                                             (json.dumps(self._graph.to_dict(), separators=(",", ":")),))
+            return self._graph
+
+    def search(self, query, limit=20, fuzzy=False, kinds=None):
+        """
+        Looks up types, properties and file names by substring (or fuzzily) through the
+        trigram index stored with the symbols, which every refresh or watcher update keeps
+        in step. See SearchIndex.find() for the result format.
+        """
+        with self._lock:
+            return self._search.find(query, limit=limit, fuzzy=fuzzy, kinds=kinds)
+
+
+_open_indexes = {}
+_open_lock = threading.Lock()
+
+
+def open_index(project_path):
+    """Returns the shared ProjectIndex for a project, so one process keeps each index warm in memory."""
+    key = os.path.abspath(project_path)
+    with _open_lock:
+        if key not in _open_indexes:
+            _open_indexes[key] = ProjectIndex(project_path)
+        return _open_indexes[key]
@@ -0,0 +1,141 @@
+from string import Formatter
+
+
+class Prompt(str):
+    """A rendered prompt. Behaves like a plain string but remembers which template produced it."""
+    cache_tag = ""
+
+
+class PromptTemplate:
+    """
+    A versioned prompt made of a static instruction block followed by a
+    per-entity data block. The static block always comes first so prompts from
+    the same template share a byte-identical prefix, which lets the model
+    server reuse its prompt/KV cache across calls.
+    Bump 'version' whenever the wording changes so cached responses are invalidated.
+    """
+    def __init__(self, name, version, instructions, data):
+        self.name = name
+        self.version = version
+        self.prefix = instructions.strip() + "\n\n"
+        # Precompile the data block into (literal, field) segments once
+        self._segments = []
+        self.fields = []
+        for literal, field, format_spec, conversion in Formatter().parse(data.strip()):
+            if field is not None and (format_spec or conversion or not field.isidentifier()):
+                raise ValueError(f"Template '{name}' only supports plain '{{field}}' placeholders.")
+            self._segments.append((literal, field))
+            if field is not None and field not in self.fields:
+                self.fields.append(field)
+
+    @property
+    def cache_tag(self):
+        return f"{self.name}@v{self.version}"
+
+    def render(self, **values):
+        """Fills in the data block. Raises KeyError if a field is missing."""
+        missing = [field for field in self.fields if field not in values]
+        if missing:
+            raise KeyError(f"Template '{self.name}' is missing value(s) for: {', '.join(missing)}")
+        parts = [self.prefix]
+        for literal, field in self._segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(str(values[field]))
+        prompt = Prompt("".join(parts))
+        prompt.cache_tag = self.cache_tag
+        return prompt
+
+
+TEMPLATES = {}
+
+
+def register(template):
+    """Adds a template to the registry, replacing an older version of the same name."""
+    existing = TEMPLATES.get(template.name)
+    if existing and existing.version > template.version:
+        raise ValueError(f"Template '{template.name}' v{template.version} is older than registered v{existing.version}.")
+    TEMPLATES[template.name] = template
+    return template
+
+
+def get_template(name):
+    return TEMPLATES[name]
+
+
+def render(name, **values):
+    return TEMPLATES[name].render(**values)
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token) for sizing prompts without a tokenizer."""
+    return max(1, (len(text) + 3) // 4)
+
+
+register(PromptTemplate(
+    "model", 1,
+    instructions="""
+Generate a C# model class file.
+Instructions: Create a public class in the given namespace with an 'Id' property. Add the specified properties with data annotations. Return only raw C# code.
+""",
+    data="""
+Namespace: {namespace}
+Model Name: {model_name}
+Properties: {properties}
+""",
+))
+
+register(PromptTemplate(
+    "controller", 3,
+    instructions="""
+Generate a complete C# controller with full async CRUD actions.
+Instructions: Inherit from Controller, use DI for the DbContext, generate Index, Details, Create (GET/POST), Edit (GET/POST), Delete (GET/POST) actions. Use [ValidateAntiForgeryToken]. Query through the given DbSet property, eager-load single navigations with Include() in Index and Details, and fill ViewData select lists for foreign keys in Create and Edit. Return only raw C# code.
+""",
+    data="""
+Project: {project_name}
+Model: {model_name}
+Model Namespace: {model_namespace}
+DbContext: {context_name}
+DbSet: {db_set}
+Relationships: {relationships}
+Controller: {controller_name}
+""",
+))
+
+# Each view gets its own template carrying only its own instructions, so a
+# call never pays prompt-eval time for the other four views.
+VIEW_INSTRUCTIONS = {
+    "Index": "Create a table listing all items. Include columns for properties. Add 'Edit', 'Details', 'Delete' links for each row and a 'Create New' link at the top.",
+    "Create": "Generate a form with input fields for all specified properties. Use 'asp-for' tag helpers. Include a 'Create' button and a 'Back to List' link.",
+    "Edit": "Generate a form with input fields for all specified properties and a hidden input for the 'Id'. Use 'asp-for' tag helpers. Include a 'Save' button and a 'Back to List' link.",
+    "Details": "Display all properties of a single item in a definition list (`<dl>`). Include 'Edit' and 'Back to List' links.",
+    "Delete": "Display the details of the item to be deleted and a confirmation form with a 'Delete' button.",
+}
+
+for _view_name, _instruction in VIEW_INSTRUCTIONS.items():
+    register(PromptTemplate(
+        f"view_{_view_name.lower()}", 2,
+        instructions=f"""
+You are an expert ASP.NET Core developer specializing in Razor views.
+Generate the C# Razor code for the '{_view_name}.cshtml' view of a model.
+Instructions: {_instruction}
+Declare the model with the '@model' directive given below.
+Only return the raw C# Razor code for the {_view_name}.cshtml file. Do not include any extra text or markdown.
+""",
+        data="""
+Project Namespace: {project_name}
+Model Name: {model_name}
+Model Properties: {properties}
+Model Directive: @model {model_type}
+""",
+    ))
+
+register(PromptTemplate(
+    "analysis", 1,
+    instructions="""
+You are an expert ASP.NET project manager. Based on the status below, give a brief, friendly summary and suggest the next logical step.
+""",
+    data="""
+Status: {status}
+""",
+))
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from core.locks import lock_file
+
+
+class ResponseCache:
+    """
+    Stores AI responses on disk, one JSON file per prompt hash, with a small
+    in-memory layer so a long-running process answers repeats without any I/O.
+    lock(key) lets processes sharing the cache generate each response only once.
+    """
+    def __init__(self, cache_dir, memory_size=256):
+        self.cache_dir = cache_dir
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts):
+        """Builds a stable cache key from the given parts."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def lock(self, key):
+        """
+        Cross-process lock for one key: hold it from a miss until set(), and whoever
+        waited finds the response in the cache instead of asking the provider again.
+        The lock file lives in cache_dir itself, so it is shared by exactly the
+        processes that share the cache, whatever their user cache directory.
+        """
+        return lock_file(os.path.join(self.cache_dir, ".lock")).hold(
+            key, waiting="Waiting for another Synapse process generating the same response...")
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._memory:
+                return True
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Returns the cached response text, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                text = json.load(f)["response"]
+        except (OSError, ValueError, KeyError):
+            return None
+        self._remember(key, text)
+        return text
+
+    def set(self, key, text):
+        """Stores a response. The file is written to a temp name and renamed into place."""
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"response": text, "created_at": time.time()}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write response cache entry: {e}")
+        self._remember(key, text)
+
+    def _remember(self, key, text):
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
@@ -0,0 +1,156 @@
+import math
+import os
+
+# Fuzzy matches need at least this share (Jaccard) of trigrams in common with the query
+FUZZY_THRESHOLD = 0.3
+
+# Posting lists are only counted up to this length when picking a query's rarest trigrams
+RAREST_CAP = 10000
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS search_names (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS search_grams (gram TEXT NOT NULL, name_id INTEGER NOT NULL, PRIMARY KEY (gram, name_id)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS search_entries (path TEXT NOT NULL, name_id INTEGER NOT NULL, kind TEXT NOT NULL, container TEXT)",
+    "CREATE INDEX IF NOT EXISTS search_entries_name ON search_entries (name_id, path)",
+    "CREATE INDEX IF NOT EXISTS search_entries_path ON search_entries (path)",
+)
+
+
+def trigrams(text, padded=False):
+    """Lowercase trigrams of 'text'. Padding adds the word-boundary trigrams fuzzy matching relies on."""
+    text = text.lower()
+    if padded:
+        text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+class SearchIndex:
+    """
+    Trigram index over the identifiers (types and their properties) and file names of a
+    project, kept in the project index's SQLite database next to the symbols it is built
+    from. Each distinct name is indexed once, whatever the number of files it occurs in,
+    and files are added and removed one at a time as the project index changes, inside
+    its transactions, so a new process queries it without building anything. Substring
+    queries check the names on the posting list of the query's rarest trigram; fuzzy
+    queries rank names by the share of trigrams they have in common with the query,
+    reading only the posting lists that can reach the threshold.
+    """
+    def __init__(self, db):
+        self._db = db
+        for statement in SCHEMA:
+            self._db.execute(statement)
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM search_names").fetchone()[0]
+
+    def clear(self):
+        for table in ("search_names", "search_grams", "search_entries"):
+            self._db.execute(f"DELETE FROM {table}")
+
+    def _intern(self, name):
+        row = self._db.execute("SELECT id FROM search_names WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            return row[0]
+        name_id = self._db.execute("INSERT INTO search_names (name) VALUES (?)", (name,)).lastrowid
+        self._db.executemany("INSERT INTO search_grams VALUES (?, ?)", [(gram, name_id) for gram in trigrams(name, padded=True)])
+        return name_id
+
+    def add_path(self, path, symbols):
+        """Indexes a file name and the types/properties parsed from it (replacing what was there)."""
+        self.remove_path(path)
+        entries = [(os.path.basename(path), "file", os.path.dirname(path))]
+        for declared in symbols:
+            entries.append((declared["name"], declared["kind"], declared["namespace"]))
+            entries.extend((prop["name"], "property", declared["name"]) for prop in declared["properties"])
+        self._db.executemany("INSERT INTO search_entries VALUES (?, ?, ?, ?)",
+                             [(path, self._intern(name), kind, container) for name, kind, container in entries])
+
+    def remove_path(self, path):
+        name_ids = [row[0] for row in self._db.execute("SELECT DISTINCT name_id FROM search_entries WHERE path = ?", (path,))]
+        if not name_ids:
+            return
+        self._db.execute("DELETE FROM search_entries WHERE path = ?", (path,))
+        for name_id in name_ids:
+            if self._db.execute("SELECT 1 FROM search_entries WHERE name_id = ? LIMIT 1", (name_id,)).fetchone():
+                continue
+            # No other file has the name any more; its postings are found by (gram, name_id)
+            name = self._db.execute("SELECT name FROM search_names WHERE id = ?", (name_id,)).fetchone()[0]
+            self._db.executemany("DELETE FROM search_grams WHERE gram = ? AND name_id = ?",
+                                 [(gram, name_id) for gram in trigrams(name, padded=True)])
+            self._db.execute("DELETE FROM search_names WHERE id = ?", (name_id,))
+
+    def _rarest(self, grams):
+        """The grams sorted by how many names have them, rarest first (counts are capped at RAREST_CAP)."""
+        counts = {gram: self._db.execute("SELECT COUNT(*) FROM (SELECT 1 FROM search_grams WHERE gram = ? LIMIT ?)",
+                                         (gram, RAREST_CAP)).fetchone()[0] for gram in grams}
+        return sorted(grams, key=lambda gram: (counts[gram], gram))
+
+    def _names_with(self, grams):
+        return self._db.execute(
+            "SELECT DISTINCT n.id, n.name FROM search_grams g JOIN search_names n ON n.id = g.name_id "
+            f"WHERE g.gram IN ({_placeholders(grams)})", grams).fetchall()
+
+    def _substring_ids(self, query):
+        grams = list(trigrams(query))
+        if not grams:
+            # One or two characters: too short for trigrams, scan the distinct names
+            # (SQLite's lower() only folds ASCII; the check below is the exact one)
+            rows = self._db.execute("SELECT id, name FROM search_names WHERE instr(lower(name), ?) > 0", (query,))
+        else:
+            # Every match has all of the query's trigrams: the rarest one's names are the candidates
+            rows = self._names_with(self._rarest(grams)[:1])
+        return [(name_id, name) for name_id, name in rows if query in name.lower()]
+
+    def _fuzzy_ids(self, query):
+        grams = trigrams(query, padded=True)
+        # A name reaching the threshold shares at least 'needed' trigrams with the query, so it
+        # has one of the len(grams) - needed + 1 rarest; only those names are scored
+        needed = max(1, math.ceil(FUZZY_THRESHOLD * len(grams)))
+        scored = []
+        for name_id, name in self._names_with(self._rarest(list(grams))[:len(grams) - needed + 1]):
+            name_grams = trigrams(name, padded=True)
+            count = len(grams & name_grams)
+            score = count / (len(grams) + len(name_grams) - count)
+            if score >= FUZZY_THRESHOLD:
+                scored.append((score, name_id, name))
+        return scored
+
+    def find(self, query, limit=20, fuzzy=False, kinds=None):
+        """
+        Returns up to 'limit' matches as dicts with 'name', 'kind', 'path', 'container' and 'score'.
+        Substring matches come first (exact, then prefix, then shorter names); with 'fuzzy',
+        near misses such as typos fill the remaining slots. A query containing '/' matches the
+        last segment against names and requires the other segments in the file path.
+        """
+        query = query.strip().replace("\\", "/")
+        segments = [segment.lower() for segment in query.split("/")]
+        folders, name_query = [segment for segment in segments[:-1] if segment], segments[-1]
+        if not name_query:
+            return []
+        ranked = []
+        for name_id, name in self._substring_ids(name_query):
+            lower = name.lower()
+            score = 3.0 if lower == name_query else 2.0 if lower.startswith(name_query) else 1.0
+            ranked.append((score + 1.0 / (1 + len(name)), name_id, name))
+        if fuzzy:
+            found = {name_id for _, name_id, _ in ranked}
+            ranked.extend(item for item in self._fuzzy_ids(name_query) if item[1] not in found)
+        ranked.sort(key=lambda item: (-item[0], item[2]))
+
+        results = []
+        for score, name_id, name in ranked:
+            # Sorted by path, and in indexing order within a file
+            for path, kind, container in self._db.execute(
+                    "SELECT path, kind, container FROM search_entries WHERE name_id = ? ORDER BY path, rowid", (name_id,)):
+                if folders and not all(folder in path.lower() for folder in folders):
+                    continue
+                if kinds and kind not in kinds:
+                    continue
+                results.append({"name": name, "kind": kind, "path": path, "container": container, "score": round(score, 3)})
+                if len(results) >= limit:
+                    return results
+        return results
@@ -0,0 +1,216 @@
+import json
+import os
+import queue
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from core import operations
+from core.jobs import WorkerPool
+from core.watcher import stop_all, watch_project
+
+# Required and optional JSON fields for each job kind
+JOB_FIELDS = {
+    "model": (("project_path", "model_name", "properties"), ("save",)),
+    "controller": (("project_path", "model_name"), ("context_name", "save")),
+    "views": (("project_path", "model_name", "properties"), ("views", "save")),
+    "analysis": (("project_path",), ()),
+}
+
+# URL path -> job kind
+ROUTES = {
+    "/models": "model",
+    "/controllers": "controller",
+    "/views": "views",
+    "/analysis": "analysis",
+}
+
+
+def build_handlers(ai_provider, watch=False):
+    """
+    Binds the shared, already-initialised provider to every job kind.
+    With 'watch', the first analysis of a project starts a file watcher that keeps its index hot
+    (/search does the same for the projects it searches).
+    """
+    def analysis(params, on_token):
+        if watch and os.path.isdir(params["project_path"]):
+            watch_project(params["project_path"])
+        return operations.general_analysis(ai_provider, on_token=on_token, **params)
+
+    return {
+        "model": lambda params, on_token: operations.create_model(ai_provider, on_token=on_token, **params),
+        "controller": lambda params, on_token: operations.create_controller(ai_provider, on_token=on_token, **params),
+        "views": lambda params, on_token: operations.generate_views(ai_provider, on_token=on_token, **params),
+        "analysis": analysis,
+    }
+
+
+def validate_params(kind, body):
+    """Returns an error message if the request body does not fit the job kind, else None."""
+    if not isinstance(body, dict):
+        return "Request body must be a JSON object."
+    required, optional = JOB_FIELDS[kind]
+    missing = [field for field in required if field not in body]
+    if missing:
+        return f"Missing field(s): {', '.join(missing)}."
+    unknown = [field for field in body if field not in required and field not in optional]
+    if unknown:
+        return f"Unknown field(s): {', '.join(unknown)}."
+    return None
+
+
+class SynapseRequestHandler(BaseHTTPRequestHandler):
+    """
+    Local HTTP API:
+      POST /models, /controllers, /views, /analysis  -> 202 {"job_id": ...}
+      GET  /jobs, /jobs/<id>                         -> job status
+      GET  /jobs/<id>/events                         -> Server-Sent Events (token, status, result)
+      GET  /search?project_path=...&q=...[&fuzzy=1&limit=20&references=1]
+                                                     -> matching symbols (answered directly, not queued)
+      GET  /health
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        return json.loads(raw.decode("utf-8"))
+
+    def do_POST(self):
+        kind = ROUTES.get(urlparse(self.path).path.rstrip("/"))
+        if kind is None:
+            self._send_json(404, {"error": "Not found."})
+            return
+        try:
+            body = self._read_json()
+        except ValueError:
+            self._send_json(400, {"error": "Request body is not valid JSON."})
+            return
+        error = validate_params(kind, body)
+        if error:
+            self._send_json(400, {"error": error})
+            return
+        try:
+            job = self.server.pool.submit(kind, body)
+        except queue.Full:
+            self._send_json(503, {"error": "Job queue is full, try again later."}, {"Retry-After": "1"})
+            return
+        self._send_json(202, {"job_id": job.id, "status": job.status}, {"Location": f"/jobs/{job.id}"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["search"]:
+            self._search(parse_qs(url.query))
+        elif parts == ["health"]:
+            self._send_json(200, {"status": "ok", "workers": self.server.pool.workers, "queued": self.server.pool.queued()})
+        elif parts == ["jobs"]:
+            self._send_json(200, {"jobs": [job.to_dict() for job in self.server.pool.jobs()]})
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.server.pool.get(parts[1])
+            if job is None:
+                self._send_json(404, {"error": f"Unknown job '{parts[1]}'."})
+            elif len(parts) == 2:
+                self._send_json(200, job.to_dict())
+            elif parts[2] == "events":
+                self._stream_events(job)
+            else:
+                self._send_json(404, {"error": "Not found."})
+        else:
+            self._send_json(404, {"error": "Not found."})
+
+    def _search(self, query):
+        project_path = query.get("project_path", [""])[0]
+        text = query.get("q", [""])[0]
+        if not project_path or not text:
+            self._send_json(400, {"error": "Missing query parameter(s): project_path and q."})
+            return
+        try:
+            limit = int(query.get("limit", ["20"])[0])
+        except ValueError:
+            self._send_json(400, {"error": "'limit' must be an integer."})
+            return
+        fuzzy = query.get("fuzzy", ["0"])[0] in ("1", "true")
+        if self.server.watch and os.path.isdir(project_path):
+            # A watched index is kept current by the watcher and never re-scanned per query
+            watch_project(project_path)
+        results = operations.find_symbols(project_path, text, limit=limit, fuzzy=fuzzy)
+        if isinstance(results, dict):
+            self._send_json(400, results)
+            return
+        payload = {"results": results}
+        if query.get("references", ["0"])[0] in ("1", "true"):
+            payload["references"] = operations.find_references(project_path, text)
+        self._send_json(200, payload)
+
+    def _stream_events(self, job):
+        """Replays the job's events and follows it until it finishes."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        sent = 0
+        try:
+            while True:
+                events, finished = job.wait_events(sent, timeout=15)
+                if not events and not finished:
+                    # Keep-alive comment so proxies don't drop an idle stream
+                    self.wfile.write(b": ping\n\n")
+                for event, data in events:
+                    self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+                sent += len(events)
+                self.wfile.flush()
+                if finished and sent >= len(job.events):
+                    final = job.to_dict()
+                    self.wfile.write(f"event: end\ndata: {json.dumps(final)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+class SynapseServer(ThreadingHTTPServer):
+    """HTTP server whose request threads share a single WorkerPool and provider."""
+    daemon_threads = True
+
+    def __init__(self, address, pool, verbose=False, watch=False):
+        super().__init__(address, SynapseRequestHandler)
+        self.pool = pool
+        self.verbose = verbose
+        self.watch = watch
+
+
+def create_server(ai_provider, host="127.0.0.1", port=8765, workers=2, queue_size=32, verbose=False, watch=False):
+    """Builds a server and starts its worker pool. Call serve_forever() to begin handling requests."""
+    pool = WorkerPool(build_handlers(ai_provider, watch), workers=workers, queue_size=queue_size)
+    pool.start()
+    return SynapseServer((host, port), pool, verbose=verbose, watch=watch)
+
+
+def serve(ai_provider, host="127.0.0.1", port=8765, workers=2, queue_size=32, verbose=False, watch=False):
+    """Runs the HTTP API until interrupted, then drains the job queue."""
+    server = create_server(ai_provider, host, port, workers, queue_size, verbose, watch)
+    print(f"🌐 Synapse server listening on http://{server.server_address[0]}:{server.server_address[1]} ({workers} workers, queue size {queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down, waiting for running jobs...")
+    finally:
+        server.server_close()
+        server.pool.shutdown()
+        stop_all()
+    print("👋 Server stopped.")
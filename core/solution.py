@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from core.paths import user_cache_dir
+
+# Bump when the graph layout changes so cached graphs are rebuilt
+GRAPH_VERSION = 1
+
+_SLN_PROJECT = re.compile(r'^Project\("\{[^}]+\}"\)\s*=\s*"([^"]+)",\s*"([^"]+\.csproj)"', re.MULTILINE)
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _root_files(root):
+    """The .sln and .csproj files directly inside 'root' (one scandir, no recursion)."""
+    try:
+        with os.scandir(root) as scanner:
+            return sorted(entry.name for entry in scanner
+                          if entry.is_file() and entry.name.endswith((".sln", ".csproj")))
+    except OSError:
+        return []
+
+
+def glob_pattern(globs):
+    """
+    Compiles MSBuild item globs ('Legacy/**;Old/*.cs', relative to the project directory)
+    into one regex over '/'-separated relative paths. '**' spans directories, '*' and '?'
+    stay within one. Globs using MSBuild properties ('$(...)') can't be evaluated here and
+    are left out. Returns None if no glob is left.
+    """
+    parts = []
+    for item in globs:
+        for glob in item.split(";"):
+            glob = glob.strip().replace("\\", "/")
+            while glob.startswith("./"):
+                glob = glob[2:]
+            if not glob or "$(" in glob:
+                continue
+            regex = re.escape(glob).replace(r"\*\*/", "(?:.*/)?").replace(r"\*\*", ".*")
+            parts.append(regex.replace(r"\*", "[^/]*").replace(r"\?", "[^/]"))
+    if not parts:
+        return None
+    return re.compile("(?:" + "|".join(parts) + r")\Z", re.IGNORECASE if os.name == "nt" else 0)
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _sanitize_namespace(name):
+    """MSBuild turns '-' and spaces in the project name into '_' for the default RootNamespace."""
+    return re.sub(r"[^\w.]", "_", name)
+
+
+def parse_csproj(csproj_path):
+    """Reads the parts of a .csproj that matter for scaffolding. Returns a dict, or None if unreadable."""
+    try:
+        tree = ET.parse(csproj_path)
+    except (OSError, ET.ParseError):
+        return None
+    root = tree.getroot()
+    stem = os.path.splitext(os.path.basename(csproj_path))[0]
+    info = {
+        "sdk": root.get("Sdk", ""),
+        "assembly_name": None,
+        "root_namespace": None,
+        "references": [],
+        "packages": [],
+        "compile_include": [],
+        "compile_remove": [],
+        "default_compile_items": True,
+    }
+    for element in root.iter():
+        tag = _local_name(element.tag)
+        text = (element.text or "").strip()
+        if tag == "RootNamespace" and text:
+            info["root_namespace"] = text
+        elif tag == "AssemblyName" and text:
+            info["assembly_name"] = text
+        elif tag == "EnableDefaultCompileItems" and text.lower() == "false":
+            info["default_compile_items"] = False
+        elif tag == "ProjectReference" and element.get("Include"):
+            info["references"].append(element.get("Include").replace("\\", "/"))
+        elif tag == "PackageReference" and element.get("Include"):
+            info["packages"].append(element.get("Include"))
+        elif tag == "Compile":
+            if element.get("Include"):
+                info["compile_include"].append(element.get("Include").replace("\\", "/"))
+            if element.get("Remove"):
+                info["compile_remove"].append(element.get("Remove").replace("\\", "/"))
+    if not info["root_namespace"]:
+        info["root_namespace"] = _sanitize_namespace(info["assembly_name"] or stem)
+    # Old-style (non-SDK) projects list their sources explicitly
+    if not info["sdk"] and info["compile_include"]:
+        info["default_compile_items"] = False
+    return info
+
+
+class SolutionGraph:
+    """
+    Projects found under a root (via a .sln, or .csproj files in the root itself),
+    with their RootNamespace, project references and source globs.
+    Paths are relative to the root and use '/'.
+    """
+    def __init__(self, root, data):
+        self.root = root
+        self.solution = data["solution"]
+        self.projects = data["projects"]
+        self._patterns = {}  # project name -> (include regex, remove regex)
+
+    def owning_project(self, rel_path):
+        """Returns the name of the project whose directory contains rel_path (longest match), or None."""
+        best = None
+        best_len = -1
+        rel_path = rel_path.replace(os.sep, "/").strip("/")
+        for name, project in self.projects.items():
+            directory = project["dir"]
+            if (not directory or rel_path == directory or rel_path.startswith(directory + "/")) and len(directory) > best_len:
+                best, best_len = name, len(directory)
+        return best
+
+    def web_project(self):
+        """The single ASP.NET (Microsoft.NET.Sdk.Web) project, if there is exactly one."""
+        web = [name for name, project in self.projects.items() if project["sdk"].endswith(".Web")]
+        if len(web) == 1:
+            return web[0]
+        return next(iter(self.projects)) if len(self.projects) == 1 else None
+
+    def namespace_for(self, rel_dir=""):
+        """
+        Namespace for code placed in rel_dir, following the MSBuild convention of
+        RootNamespace + folder path. Returns None if no project owns the folder.
+        """
+        rel_dir = rel_dir.replace(os.sep, "/").strip("/")
+        name = self.owning_project(rel_dir)
+        if name is not None:
+            inner = rel_dir[len(self.projects[name]["dir"]):]
+        else:
+            # Folder outside every project (e.g. 'Models' at a solution root): use the web project's namespace
+            name = self.web_project()
+            if name is None:
+                return None
+            inner = rel_dir
+        project = self.projects[name]
+        parts = [project["root_namespace"]] + [_sanitize_namespace(part) for part in inner.split("/") if part]
+        return ".".join(parts)
+
+    def compiles(self, rel_path):
+        """
+        True if the .cs file at rel_path is compiled by the project owning it: it is among the
+        default compile items or matches a Compile Include, and matches no Compile Remove.
+        Files outside every project are taken as compiled.
+        """
+        name = self.owning_project(rel_path)
+        if name is None:
+            return True
+        project = self.projects[name]
+        rel_path = rel_path.replace(os.sep, "/").strip("/")
+        inner = rel_path[len(project["dir"]):].lstrip("/") if project["dir"] else rel_path
+        if name not in self._patterns:
+            self._patterns[name] = (glob_pattern(project["compile_include"]), glob_pattern(project["compile_remove"]))
+        include, remove = self._patterns[name]
+        if not project["default_compile_items"] and not (include and include.match(inner)):
+            return False
+        return not (remove and remove.match(inner))
+
+    def references(self, name, transitive=False):
+        """Names of the projects 'name' references, optionally following references transitively."""
+        result = []
+        pending = list(self.projects.get(name, {}).get("references", []))
+        while pending:
+            reference = pending.pop(0)
+            if reference in result:
+                continue
+            result.append(reference)
+            if transitive:
+                pending.extend(self.projects.get(reference, {}).get("references", []))
+        return result
+
+
+def _build(root):
+    """Parses the .sln/.csproj files under root. Returns (graph_data, watched_paths)."""
+    root_files = _root_files(root)
+    solutions = [name for name in root_files if name.endswith(".sln")]
+    csproj_paths = []
+    solution = None
+    if solutions:
+        solution = solutions[0]
+        try:
+            with open(os.path.join(root, solution), 'r', encoding='utf-8-sig', errors='replace') as f:
+                text = f.read()
+            csproj_paths = [path.replace("\\", "/") for _, path in _SLN_PROJECT.findall(text)]
+        except OSError:
+            csproj_paths = []
+    if not csproj_paths:
+        csproj_paths = [name for name in root_files if name.endswith(".csproj")]
+
+    projects = {}
+    by_path = {}
+    for rel_csproj in csproj_paths:
+        info = parse_csproj(os.path.join(root, rel_csproj))
+        if info is None:
+            continue
+        name = os.path.splitext(os.path.basename(rel_csproj))[0]
+        info["path"] = rel_csproj
+        info["dir"] = os.path.dirname(rel_csproj)
+        projects[name] = info
+        by_path[os.path.normpath(rel_csproj)] = name
+    # Turn reference paths (relative to each csproj) into project names
+    for info in projects.values():
+        names = []
+        for reference in info["references"]:
+            rel = os.path.normpath(os.path.join(info["dir"], reference))
+            names.append(by_path.get(rel, os.path.splitext(os.path.basename(reference))[0]))
+        info["references"] = names
+
+    watched = [os.path.join(root, name) for name in root_files] + [os.path.join(root, p["path"]) for p in projects.values()]
+    return {"solution": solution, "projects": projects}, sorted(set(watched))
+
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def _cache_path(root):
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(user_cache_dir(), "solutions", f"{digest}.json")
+
+
+def _is_fresh(cached, root):
+    if cached.get("version") != GRAPH_VERSION or cached.get("root_files") != _root_files(root):
+        return False
+    return all(_signature(path) == signature for path, signature in cached["signatures"].items())
+
+
+def load_graph(root):
+    """
+    Returns the SolutionGraph for a root. The graph is cached in memory and on disk and
+    rebuilt only when a .sln/.csproj file changes or one is added to or removed from the root.
+    """
+    key = os.path.abspath(root)
+    with _graphs_lock:
+        cached = _graphs.get(key)
+        if cached is None:
+            try:
+                with open(_cache_path(root), 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+            except (OSError, ValueError):
+                cached = None
+        if cached is None or not _is_fresh(cached, root):
+            data, watched = _build(root)
+            cached = {
+                "version": GRAPH_VERSION,
+                "root_files": _root_files(root),
+                "signatures": {path: _signature(path) for path in watched},
+                "graph": data,
+            }
+            try:
+                os.makedirs(os.path.dirname(_cache_path(root)), exist_ok=True)
+                tmp_path = _cache_path(root) + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(cached, f)
+                os.replace(tmp_path, _cache_path(root))
+            except OSError as e:
+                print(f"⚠️ Could not cache the solution graph: {e}")
+        _graphs[key] = cached
+        return SolutionGraph(root, cached["graph"])
+
+
+def namespace_for(project_path, rel_dir=""):
+    """Namespace for code in project_path/rel_dir, falling back to the folder name when there is no .csproj."""
+    namespace = load_graph(project_path).namespace_for(rel_dir)
+    if namespace is None:
+        parts = [os.path.basename(os.path.normpath(project_path))] + [p for p in rel_dir.replace(os.sep, "/").split("/") if p]
+        namespace = ".".join(_sanitize_namespace(part) for part in parts)
+    return namespace
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+from core.paths import user_cache_dir
+from core.prompts import estimate_tokens
+
+# Used by estimates until a model has some history of its own
+DEFAULT_TOKENS_PER_SECOND = 20.0
+DEFAULT_OUTPUT_TOKENS = {"model": 250, "controller": 900, "view": 450, "analysis": 150}
+
+_lock = threading.Lock()
+_history = None
+
+
+def provider_id(ai_provider):
+    """Identifies the connector and model behind a provider, looking through a CachedConnector."""
+    connector = getattr(ai_provider, "connector", ai_provider)
+    model = getattr(connector, "model_name", None) or getattr(connector, "model", "")
+    return f"{type(connector).__name__}:{model}"
+
+
+def _history_path():
+    return os.path.join(user_cache_dir(), "throughput.json")
+
+
+def _load():
+    global _history
+    if _history is None:
+        try:
+            with open(_history_path(), 'r', encoding='utf-8') as f:
+                _history = json.load(f)
+        except (OSError, ValueError):
+            _history = {}
+        _history.setdefault("models", {})
+        _history.setdefault("templates", {})
+    return _history
+
+
+def record(ai_provider, prompt, response, seconds):
+    """Adds one provider call to the per-model and per-template throughput history."""
+    prompt_tokens = estimate_tokens(prompt)
+    output_tokens = estimate_tokens(response)
+    with _lock:
+        history = _load()
+        model = history["models"].setdefault(provider_id(ai_provider), {"calls": 0, "prompt_tokens": 0, "output_tokens": 0, "seconds": 0.0})
+        model["calls"] += 1
+        model["prompt_tokens"] += prompt_tokens
+        model["output_tokens"] += output_tokens
+        model["seconds"] += seconds
+        cache_tag = getattr(prompt, "cache_tag", "")
+        if cache_tag:
+            template = history["templates"].setdefault(cache_tag, {"calls": 0, "output_tokens": 0})
+            template["calls"] += 1
+            template["output_tokens"] += output_tokens
+        try:
+            os.makedirs(os.path.dirname(_history_path()), exist_ok=True)
+            tmp_path = _history_path() + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(history, f)
+            os.replace(tmp_path, _history_path())
+        except OSError as e:
+            print(f"⚠️ Could not save throughput history: {e}")
+
+
+def tokens_per_second(ai_provider):
+    """
+    Returns (output tokens per second, number of calls it is based on) for the provider's model.
+    Prompt evaluation time is folded into the rate, so it can be applied to output tokens alone.
+    """
+    with _lock:
+        model = _load()["models"].get(provider_id(ai_provider))
+    if not model or model["seconds"] <= 0 or model["output_tokens"] <= 0:
+        return DEFAULT_TOKENS_PER_SECOND, 0
+    return model["output_tokens"] / model["seconds"], model["calls"]
+
+
+def expected_output_tokens(cache_tag, kind):
+    """Returns the average response size seen for a template, or a default for its kind."""
+    with _lock:
+        template = _load()["templates"].get(cache_tag)
+    if not template or not template["calls"]:
+        return DEFAULT_OUTPUT_TOKENS.get(kind, 300)
+    return template["output_tokens"] // template["calls"]
@@ -0,0 +1,83 @@
+CONTROLLER_BASES = {"Controller", "ControllerBase", "ApiController"}
+CONTEXT_BASES = {"DbContext", "IdentityDbContext"}
+MODEL_FOLDERS = {"Models", "Entities", "Domain"}
+
+
+def _base_name(base):
+    """'Microsoft.EntityFrameworkCore.DbContext' -> 'DbContext', 'IdentityDbContext<User>' -> 'IdentityDbContext'."""
+    return base.split("<", 1)[0].rsplit(".", 1)[-1]
+
+
+class SymbolTable:
+    """
+    Project-wide view of the types found by the C# parser, keyed by type name.
+    Partial declarations spread over several files are merged into one entry.
+    """
+    def __init__(self, symbols_by_path):
+        self.types = {}
+        for path, declared_types in symbols_by_path.items():
+            for declared in declared_types:
+                entry = self.types.get(declared["name"])
+                if entry is None:
+                    entry = dict(declared, paths=[path], bases=list(declared["bases"]),
+                                 attributes=list(declared["attributes"]), properties=list(declared["properties"]))
+                    self.types[declared["name"]] = entry
+                    continue
+                # Another partial part (or a same-named type elsewhere): merge what it adds
+                entry["paths"].append(path)
+                entry["bases"] += [base for base in declared["bases"] if base not in entry["bases"]]
+                entry["attributes"] += [a for a in declared["attributes"] if a not in entry["attributes"]]
+                known = {p["name"] for p in entry["properties"]}
+                entry["properties"] += [p for p in declared["properties"] if p["name"] not in known]
+
+    def get(self, name):
+        return self.types.get(name)
+
+    def _derives_from(self, entry, names, seen=None):
+        """Follows base types through the table, so 'AdminController : BaseController : Controller' counts."""
+        seen = seen or set()
+        for base in entry["bases"]:
+            base_name = _base_name(base)
+            if base_name in names:
+                return True
+            parent = self.types.get(base_name)
+            if parent and base_name not in seen:
+                seen.add(base_name)
+                if self._derives_from(parent, names, seen):
+                    return True
+        return False
+
+    def is_controller(self, entry):
+        if entry["kind"] != "class" or "abstract" in entry["modifiers"]:
+            return False
+        return entry["name"].endswith("Controller") or self._derives_from(entry, CONTROLLER_BASES)
+
+    def is_context(self, entry):
+        return entry["kind"] == "class" and self._derives_from(entry, CONTEXT_BASES)
+
+    def is_model(self, entry):
+        """
+        Entity-like classes and records: declared in a Models/Entities/Domain folder or
+        namespace, or carrying an 'Id' / '<Name>Id' / [Key] property wherever they live.
+        """
+        if entry["kind"] not in ("class", "record") or "static" in entry["modifiers"]:
+            return False
+        if entry["name"].endswith("Controller") or self._derives_from(entry, CONTROLLER_BASES) or self.is_context(entry):
+            return False
+        if MODEL_FOLDERS & set(entry["namespace"].split(".")):
+            return True
+        if any(MODEL_FOLDERS & set(path.split("/")[:-1]) for path in entry["paths"]):
+            return True
+        for prop in entry["properties"]:
+            if prop["name"] in ("Id", f"{entry['name']}Id") or "Key" in prop["attributes"]:
+                return True
+        return False
+
+    def models(self):
+        return sorted(name for name, entry in self.types.items() if self.is_model(entry))
+
+    def controllers(self):
+        return sorted(name for name, entry in self.types.items() if self.is_controller(entry))
+
+    def contexts(self):
+        return sorted(name for name, entry in self.types.items() if self.is_context(entry))
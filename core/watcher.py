@@ -0,0 +1,239 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from core.indexer import PRUNED_DIRS, SOURCE_EXTENSIONS
+from core.project_index import open_index
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Consecutive failed index updates after which a watcher stops and callers refresh() again
+MAX_FAILURES = 3
+
+
+class _Inotify:
+    """Minimal ctypes binding to Linux inotify, watching a directory tree."""
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.wd_paths = {}
+
+    def add_tree(self, root, rel_dir=""):
+        """Watches 'root/rel_dir' and every non-pruned directory below it."""
+        pending = [rel_dir]
+        while pending:
+            current = pending.pop()
+            path = os.path.join(root, current) if current else root
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                if not os.path.isdir(path):
+                    # Removed again before we could watch it
+                    continue
+                raise OSError(errno, f"inotify_add_watch failed for {path}")
+            self.wd_paths[wd] = current
+            try:
+                with os.scandir(path) as scanner:
+                    for entry in scanner:
+                        if entry.is_dir(follow_symlinks=False) and entry.name not in PRUNED_DIRS:
+                            pending.append(f"{current}/{entry.name}" if current else entry.name)
+            except OSError:
+                continue
+
+    def read(self, timeout):
+        """Waits up to 'timeout' seconds and returns a list of (rel_dir, name, mask)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_IGNORED:
+                self.wd_paths.pop(wd, None)
+                continue
+            events.append((self.wd_paths.get(wd), name, mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ProjectWatcher:
+    """
+    Keeps a ProjectIndex current while the process runs, so analysis can be
+    answered from memory without re-scanning. Uses inotify on Linux and falls
+    back to periodic polling elsewhere (or if inotify is unavailable).
+    Bursts of events (git checkout, branch switches) are debounced: changes are
+    applied once the tree has been quiet for 'debounce' seconds, or at the
+    latest after 'max_delay' seconds of continuous activity.
+    A failed update is logged and retried as a full re-scan; after MAX_FAILURES in a
+    row the watcher stops and clears index.live, so the index is refreshed on demand.
+    """
+    def __init__(self, project_path, index=None, debounce=0.3, max_delay=2.0, poll_interval=2.0):
+        self.project_path = project_path
+        self.index = index or open_index(project_path)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._failures = 0
+
+    def start(self):
+        """Brings the index up to date and starts watching. Returns the backend name."""
+        inotify = None
+        if sys.platform.startswith("linux"):
+            try:
+                inotify = _Inotify()
+                inotify.add_tree(self.project_path)
+            except OSError as e:
+                print(f"⚠️ inotify unavailable ({e}), falling back to polling.")
+                if inotify:
+                    inotify.close()
+                inotify = None
+        # Refresh after the watches exist so no change slips in between
+        self.index.refresh()
+        self.index.live = True
+        self.backend = "inotify" if inotify else "polling"
+        target = (lambda: self._watch(inotify)) if inotify else self._poll
+        self._thread = threading.Thread(target=self._run, args=(target,), name="synapse-watcher", daemon=True)
+        self._thread.start()
+        return self.backend
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.index.live = False
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self, target):
+        try:
+            target()
+        except Exception as e:
+            print(f"❌ Stopped watching {self.project_path} ({type(e).__name__}: {e}); "
+                  f"the index is re-scanned on demand again.")
+        finally:
+            self.index.live = False
+
+    def _update(self, update):
+        """Runs one index update. Returns False if it failed; raises once MAX_FAILURES failed in a row."""
+        try:
+            update()
+        except Exception as e:
+            self._failures += 1
+            if self._failures >= MAX_FAILURES:
+                raise
+            print(f"⚠️ Could not update the index of {self.project_path} ({type(e).__name__}: {e}), retrying.")
+            return False
+        self._failures = 0
+        return True
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            self._update(self.index.refresh)
+
+    def _watch(self, inotify):
+        pending = set()
+        full_refresh = False
+        first_event = last_event = None
+        try:
+            while not self._stop.is_set():
+                timeout = self.debounce if (pending or full_refresh) else 0.5
+                for rel_dir, name, mask in inotify.read(timeout):
+                    now = time.monotonic()
+                    first_event = first_event or now
+                    last_event = now
+                    if mask & IN_Q_OVERFLOW or rel_dir is None:
+                        full_refresh = True
+                        continue
+                    rel_path = f"{rel_dir}/{name}" if rel_dir else name
+                    if mask & IN_ISDIR:
+                        if name in PRUNED_DIRS:
+                            continue
+                        if mask & (IN_CREATE | IN_MOVED_TO):
+                            try:
+                                inotify.add_tree(self.project_path, rel_path)
+                            except OSError:
+                                pass
+                        # A directory appeared or vanished with its contents, re-scan once
+                        full_refresh = True
+                    elif name.endswith(SOURCE_EXTENSIONS):
+                        pending.add(rel_path)
+                    elif name.endswith((".csproj", ".sln")):
+                        # Compile Include/Remove may have changed which sources belong to the build
+                        full_refresh = True
+                    elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                        full_refresh = True
+
+                if not (pending or full_refresh):
+                    continue
+                now = time.monotonic()
+                if now - last_event >= self.debounce or now - first_event >= self.max_delay:
+                    paths = sorted(pending)
+                    ok = self._update(self.index.refresh if full_refresh else lambda: self.index.update_paths(paths))
+                    pending.clear()
+                    # A failed update is retried as a full re-scan once the debounce has passed again
+                    full_refresh = not ok
+                    first_event = last_event = None if ok else now
+        finally:
+            inotify.close()
+
+
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+
+def watch_project(project_path, **options):
+    """Starts (or returns the already running) watcher for a project."""
+    key = os.path.abspath(project_path)
+    with _watchers_lock:
+        if key not in _watchers or not _watchers[key].is_alive():
+            watcher = ProjectWatcher(project_path, **options)
+            watcher.start()
+            _watchers[key] = watcher
+        return _watchers[key]
+
+
+def stop_all():
+    with _watchers_lock:
+        for watcher in _watchers.values():
+            watcher.stop()
+        _watchers.clear()
@@ -0,0 +1,76 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from core import batch, operations
+
+
+def load_workspace(workspace_path):
+    """
+    Loads a workspace definition listing several project roots:
+      {"context_name": "AppDbContext", "artifacts": [...],
+       "projects": ["../Shop", {"project_path": "../Billing", "entities": [...]}, ...]}
+    Each project entry is a path or a batch spec; top-level 'context_name' and
+    'artifacts' are inherited. Relative paths resolve against the workspace file.
+    Returns {"projects": [spec, ...]}, or a dict with 'error'.
+    """
+    try:
+        with open(workspace_path, 'r', encoding='utf-8') as f:
+            workspace = json.load(f)
+    except FileNotFoundError:
+        return {"error": f"Workspace '{workspace_path}' not found."}
+    except json.JSONDecodeError:
+        return {"error": f"Workspace '{workspace_path}' is not formatted correctly."}
+    if not isinstance(workspace.get("projects"), list) or not workspace["projects"]:
+        return {"error": "Workspace needs a non-empty 'projects' list."}
+
+    base_dir = os.path.dirname(os.path.abspath(workspace_path))
+    projects = []
+    for entry in workspace["projects"]:
+        spec = {"project_path": entry} if isinstance(entry, str) else dict(entry)
+        if not spec.get("project_path"):
+            return {"error": f"Every workspace project needs a 'project_path': {entry}"}
+        spec["project_path"] = os.path.normpath(os.path.join(base_dir, os.path.expanduser(spec["project_path"])))
+        spec.setdefault("entities", [])
+        for key in ("context_name", "artifacts"):
+            if key in workspace:
+                spec.setdefault(key, workspace[key])
+        projects.append(spec)
+    return {"projects": projects}
+
+
+class Workspace:
+    """
+    Runs scaffolding and analysis across several projects in one session.
+    All projects share one provider (and its response cache) and one worker pool.
+    """
+    def __init__(self, ai_provider, projects, workers=1, fsync="file"):
+        self.ai_provider = ai_provider
+        self.projects = projects
+        self.fsync = fsync
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="synapse-workspace")
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def plan(self, force=False, on_edit="skip"):
+        """Builds a batch plan per project with entities. Returns a list of plans (or error dicts)."""
+        return [batch.build_plan(self.ai_provider, spec, force=force, on_edit=on_edit)
+                for spec in self.projects if spec["entities"]]
+
+    def run(self, plans):
+        """Runs the plans on the shared pool. Returns one result dict per plan."""
+        return batch.run_plans(self.ai_provider, plans, self.executor, self.fsync)
+
+    def analyze(self):
+        """Runs the general analysis for every project concurrently. Returns {project_path: result}."""
+        futures = {
+            spec["project_path"]: self.executor.submit(operations.general_analysis, self.ai_provider, spec["project_path"])
+            for spec in self.projects
+        }
+        return {project_path: future.result() for project_path, future in futures.items()}
@@ -0,0 +1,96 @@
+import queue
+import threading
+from concurrent.futures import Future
+from core.file_manager import FileManager
+
+
+class BackgroundWriter:
+    """
+    Writes files on its own threads so generation never waits on the disk.
+    Each submit() is one WriteTransaction (all of its files land or none do). The
+    queue is bounded: submit() blocks while it is full, so a slow disk or network
+    share slows generation down instead of piling up content in memory.
+    """
+    def __init__(self, file_manager=None, workers=2, queue_size=64):
+        self.file_manager = file_manager or FileManager()
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self.failures = []  # [(file_paths, error), ...]
+        self.written = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"synapse-writer-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, files, on_done=None, inputs=None, generated=None):
+        """
+        Queues {file_path: content} to be written together. Blocks while the queue is full.
+        Returns a Future resolving to True once every file landed, or False; on_done, if
+        given, is called on the writer thread with (ok, unchanged_paths) first.
+        inputs/generated ({file_path: ...}) are passed on to WriteTransaction.write().
+        """
+        if not self._threads:
+            raise RuntimeError("BackgroundWriter is not running.")
+        future = Future()
+        records = {file_path: ((inputs or {}).get(file_path), (generated or {}).get(file_path)) for file_path in files}
+        self._queue.put((dict(files), records, on_done, future))
+        return future
+
+    def write(self, file_path, content, on_done=None):
+        return self.submit({file_path: content}, on_done)
+
+    def queued(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            files, records, on_done, future = item
+            transaction = self.file_manager.transaction()
+            for file_path, content in files.items():
+                transaction.write(file_path, content, *records[file_path])
+            try:
+                ok = transaction.commit()
+                error = None if ok else "write failed and was rolled back"
+            except Exception as e:
+                ok, error = False, f"{type(e).__name__}: {e}"
+            with self._lock:
+                if ok:
+                    self.written += len(files) - len(transaction.unchanged)
+                else:
+                    self.failures.append((list(files), error))
+            if on_done:
+                # A failing callback must not kill the thread: submit() would block once all are gone
+                try:
+                    on_done(ok, transaction.unchanged)
+                except Exception as e:
+                    print(f"❌ Callback for {len(files)} written file(s) failed: {type(e).__name__}: {e}")
+                    with self._lock:
+                        self.failures.append((list(files), f"on_done failed: {type(e).__name__}: {e}"))
+            future.set_result(ok)
+
+    def close(self):
+        """
+        Drains the queue, stops the writer threads and returns the failures as
+        [(file_paths, error), ...]. The FileManager's manifests are saved too.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.file_manager.flush()
+        return list(self.failures)
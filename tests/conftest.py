@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Keeps project indexes and other per-user state out of the real cache directory."""
+    path = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(path))
+    return path
+
+
+@pytest.fixture
+def project(tmp_path):
+    """A minimal ASP.NET project with one model."""
+    root = tmp_path / "Shop"
+    (root / "Models").mkdir(parents=True)
+    (root / "Shop.csproj").write_text('<Project Sdk="Microsoft.NET.Sdk.Web"></Project>\n')
+    (root / "Models" / "Product.cs").write_text(
+        "namespace Shop.Models\n{\n    public class Product\n    {\n"
+        "        public int Id { get; set; }\n        public string Name { get; set; }\n    }\n}\n")
+    return root
+
+
+class StubConnector:
+    """Answers every prompt with a fixed reply, streamed in a few chunks, and counts the calls."""
+    model_name = "stub"
+
+    def __init__(self, reply="```csharp\npublic class Product { }\n```\nThis class is a model."):
+        self.reply = reply
+        self.calls = 0
+
+    def generate_text(self, prompt):
+        self.calls += 1
+        return self.reply
+
+    def stream_text(self, prompt):
+        self.calls += 1
+        for start in range(0, len(self.reply), 8):
+            yield self.reply[start:start + 8]
+
+
+@pytest.fixture
+def stub():
+    return StubConnector()
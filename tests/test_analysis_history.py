@@ -0,0 +1,68 @@
+import pytest
+
+from core import analysis_history, operations
+from core.analysis_history import AnalysisHistory, canonical_report, diff_reports
+
+
+@pytest.fixture
+def summarizer(stub):
+    stub.reply = "One model still needs a controller."
+    return stub
+
+
+def test_unchanged_project_reuses_the_summary(summarizer, project):
+    first = operations.general_analysis(summarizer, str(project))
+    assert (first["summary"], first["cached"], first["changes"]) == ("One model still needs a controller.", False, None)
+    again = operations.general_analysis(summarizer, str(project))
+    assert (again["summary"], again["cached"], again["changes"]) == (first["summary"], True, {})
+    assert summarizer.calls == 1
+
+
+def test_changed_project_asks_again(summarizer, project):
+    operations.general_analysis(summarizer, str(project))
+    (project / "Models" / "Order.cs").write_text("namespace Shop.Models { public class Order { public int Id { get; set; } } }")
+    result = operations.general_analysis(summarizer, str(project))
+    assert result["cached"] is False
+    assert result["changes"]["models"] == {"added": ["Order"], "removed": []}
+    assert summarizer.calls == 2
+    # Back to the earlier report: its summary is still stored
+    (project / "Models" / "Order.cs").unlink()
+    assert operations.general_analysis(summarizer, str(project))["cached"] is True
+    assert summarizer.calls == 2
+
+
+def test_failed_summary_is_not_stored(project, stub):
+    stub.reply = "Error: Could not connect to the Ollama server. Is it running?"
+    operations.general_analysis(stub, str(project))
+    assert operations.general_analysis(stub, str(project))["cached"] is False
+    assert stub.calls == 2
+
+
+def test_summaries_are_keyed_by_provider_and_prompt(project):
+    history = AnalysisHistory(str(project))
+    report = canonical_report({"models": ["Product"], "missing": ["Product"]})
+    keys = {history.key(report, "Ollama:llama3", "analysis@v1"), history.key(report, "Gemini:flash", "analysis@v1"),
+            history.key(report, "Ollama:llama3", "analysis@v2")}
+    assert len(keys) == 3
+
+
+def test_history_keeps_the_newest_summaries(project, monkeypatch):
+    monkeypatch.setattr(analysis_history, "MAX_SUMMARIES", 2)
+    clock = iter(range(100))
+    monkeypatch.setattr(analysis_history.time, "time", lambda: next(clock))
+    history = AnalysisHistory(str(project))
+    for i in range(3):
+        history.record({"models": [str(i)]}, f"key{i}", f"summary {i}")
+    history.record({"models": ["0"]}, "key1")
+    stored = AnalysisHistory(str(project))
+    assert sorted(stored.summaries) == ["key1", "key2"]
+    assert stored.last_report == {"models": ["0"]}
+
+
+def test_diff_reports():
+    old = canonical_report({"models": ["Product", "Order"], "projects": {"Shop": "Shop"}})
+    new = canonical_report({"models": ["Product", "Customer"], "projects": {"Shop": "Shop.Web"}})
+    assert diff_reports(old, new) == {
+        "projects": {"added": ["Shop (Shop.Web)"], "removed": ["Shop (Shop)"]},
+        "models": {"added": ["Customer"], "removed": ["Order"]},
+    }
@@ -0,0 +1,111 @@
+import pytest
+
+from connectors.cached_connector import CachedConnector
+from core import batch, operations, stats
+from core.analyzer import ContextAnalyzer
+from core.prompts import estimate_tokens
+from core.response_cache import ResponseCache
+
+CONTEXT = """using Microsoft.EntityFrameworkCore;
+using Shop.Models;
+
+namespace Shop.Data
+{
+    public class ShopContext : DbContext
+    {
+        public DbSet<Product> Products { get; set; }
+    }
+}
+"""
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    calls = []
+    refresh = ContextAnalyzer.refresh
+
+    def counting(self):
+        calls.append(self.project_path)
+        return refresh(self)
+
+    monkeypatch.setattr(ContextAnalyzer, "refresh", counting)
+    return calls
+
+
+@pytest.fixture
+def shop(project):
+    (project / "Data").mkdir()
+    (project / "Data" / "ShopContext.cs").write_text(CONTEXT)
+    return project
+
+
+def test_plan_refreshes_the_index_once(stub, shop, refreshes):
+    spec = {"project_path": str(shop), "artifacts": ["controller"],
+            "entities": [{"name": name} for name in ("Product", "Order", "Customer")],
+            "context_name": ""}
+    spec["entities"][1]["context_name"] = spec["entities"][2]["context_name"] = "ShopContext"
+    plan = batch.build_plan(stub, spec)
+    assert "error" not in plan
+    assert [job["state"] for job in plan["jobs"]] == ["generate"] * 3
+    assert len(refreshes) == 1
+
+
+def test_plan_without_controllers_does_not_refresh(stub, shop, refreshes):
+    plan = batch.build_plan(stub, {"project_path": str(shop), "artifacts": ["model"], "entities": [{"name": "Order"}]})
+    assert len(plan["jobs"]) == 1
+    assert refreshes == []
+
+
+def test_create_controller_refreshes_the_index_once(stub, shop, refreshes):
+    stub.reply = "```csharp\npublic class ProductsController { }\n```"
+    result = operations.create_controller(stub, str(shop), "product", save=True)
+    assert result["saved"] and result["db_set"]["context"] == "ShopContext"
+    assert len(refreshes) == 1
+
+
+@pytest.fixture
+def history(monkeypatch):
+    """Throughput history starting empty, kept in the test's cache dir."""
+    monkeypatch.setattr(stats, "_history", None)
+
+
+def test_dry_run_estimate_without_history(stub, project, history):
+    plan = batch.build_plan(stub, {"project_path": str(project), "artifacts": ["model", "views"],
+                                   "entities": [{"name": "Order", "properties": "decimal Total"}]})
+    estimate = batch.estimate_plan(stub, plan)
+    assert estimate["counts"] == {"up-to-date": 0, "edited": 0, "cached": 0, "generate": 6}
+    assert estimate["output_tokens"] == stats.DEFAULT_OUTPUT_TOKENS["model"] + 5 * stats.DEFAULT_OUTPUT_TOKENS["view"]
+    assert estimate["prompt_tokens"] == sum(estimate_tokens(job["prompt"]) for job in plan["jobs"])
+    assert estimate["history_calls"] == 0
+    assert estimate["seconds"] == estimate["output_tokens"] / stats.DEFAULT_TOKENS_PER_SECOND
+    assert stub.calls == 0
+
+
+def test_dry_run_estimate_learns_from_history(stub, project, history):
+    plan = batch.build_plan(stub, {"project_path": str(project), "artifacts": ["model"], "entities": [{"name": "Order"}]})
+    prompt = plan["jobs"][0]["prompt"]
+    # Two past calls of 400 output tokens (1600 characters) in 10 s each: 40 tok/s
+    stats.record(stub, prompt, "x" * 1600, 10.0)
+    stats.record(stub, prompt, "x" * 1600, 10.0)
+    estimate = batch.estimate_plan(stub, plan)
+    assert (estimate["output_tokens"], estimate["tokens_per_second"], estimate["history_calls"]) == (400, 40.0, 2)
+    assert estimate["seconds"] == 10.0
+    # Stored in the user cache dir for the next process
+    stats._history = None
+    assert stats.tokens_per_second(stub) == (40.0, 2)
+
+
+def test_dry_run_counts_cached_and_up_to_date(stub, project, history, tmp_path):
+    connector = CachedConnector(stub, ResponseCache(str(tmp_path / "responses")))
+    spec = {"project_path": str(project), "artifacts": ["model"], "entities": [{"name": "Order"}, {"name": "Customer"}]}
+    plan = batch.build_plan(connector, spec)
+    connector.generate_text(plan["jobs"][0]["prompt"])
+    counts = batch.estimate_plan(connector, batch.build_plan(connector, spec))["counts"]
+    assert (counts["cached"], counts["generate"]) == (1, 1)
+    assert batch.run_plan(connector, batch.build_plan(connector, spec))["saved"] == 2
+    counts = batch.estimate_plan(connector, batch.build_plan(connector, spec))["counts"]
+    assert (counts["up-to-date"], counts["generate"]) == (2, 0)
+
+
+def test_format_duration():
+    assert [batch.format_duration(s) for s in (4.4, 75, 3725)] == ["4s", "1m 15s", "1h 02m"]
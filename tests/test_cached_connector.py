@@ -0,0 +1,48 @@
+import pytest
+
+from connectors.cached_connector import CachedConnector
+from connectors.errors import ProviderError
+from core.response_cache import ResponseCache
+
+
+class BrokenConnector:
+    model_name = "broken"
+
+    def stream_text(self, prompt):
+        yield "public class Product"
+        raise ProviderError("connection reset")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "responses"))
+
+
+def test_complete_stream_is_cached(stub, cache):
+    connector = CachedConnector(stub, cache)
+    assert "".join(connector.stream_text("prompt")) == stub.reply
+    assert list(connector.stream_text("prompt")) == [stub.reply]
+    assert stub.calls == 1 and connector.hits == 1
+
+
+def test_failed_stream_is_not_cached(cache):
+    connector = CachedConnector(BrokenConnector(), cache)
+    with pytest.raises(ProviderError):
+        list(connector.stream_text("prompt"))
+    assert connector.cache_key("prompt") not in cache
+
+
+def test_stream_closed_early_is_not_cached(stub, cache):
+    connector = CachedConnector(stub, cache)
+    stream = connector.stream_text("prompt")
+    next(stream)
+    stream.close()
+    assert connector.cache_key("prompt") not in cache
+
+
+def test_error_answer_is_not_cached(stub, cache):
+    stub.reply = "Error: Could not connect to the Ollama server. Is it running?"
+    connector = CachedConnector(stub, cache)
+    connector.generate_text("prompt")
+    connector.generate_text("prompt")
+    assert stub.calls == 2
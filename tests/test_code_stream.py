@@ -0,0 +1,76 @@
+import pytest
+
+from core.code_stream import CodeExtractor, extract_code
+
+CODE = "using Shop.Models;\n\nnamespace Shop.Controllers\n{\n    public class ProductsController { }\n}"
+
+
+def stream(answer, size=7):
+    """Feeds the answer in small chunks, like a provider stream. Returns (code, done before close)."""
+    extractor = CodeExtractor()
+    emitted = "".join(extractor.feed(answer[i:i + size]) for i in range(0, len(answer), size))
+    done = extractor.done
+    emitted += extractor.close()
+    return extractor.code(), emitted, done
+
+
+@pytest.mark.parametrize("lead_in", [
+    "### ProductsController\n\n",
+    "## `ProductsController.cs`\n",
+    "**ProductsController.cs**\n\n",
+    "- Uses the injected DbContext\n- All actions are async\n\n",
+    "1. Scaffolded CRUD actions\n2. Validation\n\n",
+    "[See the docs](https://learn.microsoft.com/aspnet/core)\n\n",
+    "<b>Note</b>: the controller below is async.\n\n",
+    "Here is the controller:\n",
+])
+def test_markdown_lead_in_is_dropped(lead_in):
+    code, emitted, done = stream(f"{lead_in}```csharp\n{CODE}\n```\n\nThis controller handles CRUD.")
+    assert code == CODE
+    assert emitted == CODE + "\n"
+    assert done
+
+
+@pytest.mark.parametrize("first_line", [
+    "#nullable enable",
+    "#region Usings",
+    "[ApiController]",
+    '[Route("api/[controller]")]',
+    "@model Shop.Models.Product",
+    '<div class="container">',
+    "// Generated by Synapse",
+])
+def test_raw_code_is_passed_through(first_line):
+    answer = f"{first_line}\n{CODE}\n"
+    code, emitted, _ = stream(answer)
+    assert code == answer.strip()
+    assert emitted == answer
+
+
+def test_stops_at_closing_fence():
+    extractor = CodeExtractor()
+    extractor.feed(f"```csharp\n{CODE}\n```\n")
+    assert extractor.done
+    assert extractor.feed("Explanation that is never read") == ""
+    assert extractor.code() == CODE
+
+
+def test_raw_code_followed_by_fence_and_explanation():
+    code, _, done = stream(f"{CODE}\n```\nThe controller uses EF Core.")
+    assert code == CODE and done
+
+
+def test_language_fence_after_code_like_lead_in_opens_block():
+    code, _, done = stream(f"using the scaffolder, here it is:\n```csharp\n{CODE}\n```\n")
+    assert code == CODE and done
+
+
+def test_prose_without_fence():
+    assert extract_code(f"Sure! Here is the controller.\n{CODE}") == CODE
+    assert extract_code("Error: Could not connect to the Ollama server.") == "Error: Could not connect to the Ollama server."
+
+
+def test_line_endings_and_stray_characters():
+    answer = "\ufeff```csharp\r\npublic class Product { }\u200b\r\n```\r\n"
+    for size in (1, 2, 3, len(answer)):
+        assert stream(answer, size)[0] == "public class Product { }"
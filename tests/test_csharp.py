@@ -0,0 +1,98 @@
+from core.csharp import parse_csharp, tokenize
+
+SOURCE = b"""using System.ComponentModel.DataAnnotations;
+
+namespace Shop.Models;
+
+// public class Commented { }
+[Table("products")]
+public sealed partial class Product : Entity, IAuditable
+{
+    /* class Hidden { } */
+    [Key]
+    public int Id { get; set; }
+    [Required, StringLength(100)]
+    public string Name { get; init; } = "class Fake { }";
+    public ICollection<Order> Orders { get; set; } = new List<Order>();
+    public decimal Total => Orders.Sum(o => o.Amount);
+    private readonly int _count;
+
+    public void Save() where T : class
+    {
+        var braces = "{ } }";
+        if (true) { }
+    }
+}
+
+public record Money(decimal Amount, [property: Required] string Currency = "EUR");
+
+public enum Status { Active, Deleted }
+"""
+
+
+def by_name(types):
+    return {declared["name"]: declared for declared in types}
+
+
+def test_tokenize_skips_comments_and_strings():
+    tokens = tokenize(b'var s = "a { b"; // }\n/* { */ x = @"c ""}"" d"; y = \'}\';')
+    assert b"{" not in tokens and b"}" not in tokens
+    assert tokens[:3] == [b"var", b"s", b"="]
+
+
+def test_types_and_namespace():
+    types = by_name(parse_csharp(SOURCE))
+    assert sorted(types) == ["Money", "Product", "Status"]
+    product = types["Product"]
+    assert product["kind"] == "class"
+    assert product["namespace"] == "Shop.Models"
+    assert product["modifiers"] == ["public", "sealed", "partial"]
+    assert product["attributes"] == ["Table"]
+    assert product["bases"] == ["Entity", "IAuditable"]
+    assert types["Status"]["kind"] == "enum"
+
+
+def test_properties():
+    properties = by_name(parse_csharp(SOURCE))["Product"]["properties"]
+    assert [(p["name"], p["type"]) for p in properties] == [
+        ("Id", "int"), ("Name", "string"), ("Orders", "ICollection<Order>"), ("Total", "decimal"),
+    ]
+    assert properties[0]["attributes"] == ["Key"]
+    assert properties[1]["attributes"] == ["Required", "StringLength"]
+
+
+def test_record_parameters():
+    money = by_name(parse_csharp(SOURCE))["Money"]
+    assert money["kind"] == "record"
+    assert [(p["name"], p["type"], p["attributes"]) for p in money["properties"]] == [
+        ("Amount", "decimal", []), ("Currency", "string", ["Required"]),
+    ]
+
+
+def test_block_scoped_and_nested_namespaces():
+    source = b"""
+    namespace Shop { namespace Data {
+        public class ShopContext : DbContext
+        {
+            public class Options { }
+        }
+    } }
+    internal struct Point { }
+    """
+    types = by_name(parse_csharp(source))
+    assert types["ShopContext"]["namespace"] == "Shop.Data"
+    assert types["Options"]["namespace"] == "Shop.Data"
+    assert types["Point"]["namespace"] == ""
+    assert types["Point"]["kind"] == "struct"
+
+
+def test_generic_constraint_is_not_a_declaration():
+    source = b"public class Repository<T> : IRepository<T> where T : class, new() { }"
+    (repository,) = parse_csharp(source)
+    assert repository["name"] == "Repository"
+    assert repository["bases"] == ["IRepository<T>"]
+
+
+def test_raw_string_literal():
+    source = b'public class A { string S = """\n class B { }\n """; }\npublic class C { }'
+    assert [declared["name"] for declared in parse_csharp(source)] == ["A", "C"]
@@ -0,0 +1,66 @@
+import mmap
+
+import pytest
+
+from core import file_manager
+from core.csharp_patch import _contains_code, add_db_set, add_service_registration
+from core.file_manager import FileManager
+
+PROGRAM = b"""var builder = WebApplication.CreateBuilder(args);
+builder.Services.AddControllersWithViews();
+var app = builder.Build();
+app.Run();
+"""
+
+CONTEXT = b"""using Microsoft.EntityFrameworkCore;
+
+namespace Shop.Data
+{
+    public class ShopContext : DbContext
+    {
+        public DbSet<Order> Orders { get; set; }
+    }
+}
+"""
+
+
+def apply(data, edits):
+    for offset, text in sorted(edits, reverse=True):
+        data = data[:offset] + text + data[offset:]
+    return data
+
+
+def test_contains_code_ignores_whitespace(tmp_path):
+    assert _contains_code(PROGRAM, "builder.Services.AddControllersWithViews ( ) ;")
+    assert not _contains_code(PROGRAM, "builder.Services.AddRazorPages();")
+    path = tmp_path / "Program.cs"
+    path.write_bytes(PROGRAM)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        assert _contains_code(data, "var app=builder.Build();")
+        assert not _contains_code(data, "app.UseRouting();")
+
+
+def test_add_service_registration():
+    statement = "builder.Services.AddScoped<IOrderService, OrderService>();"
+    patched = apply(PROGRAM, add_service_registration(PROGRAM, statement))
+    assert patched == PROGRAM.replace(b"var app", statement.encode() + b"\nvar app")
+    assert add_service_registration(patched.replace(b", ", b","), statement) == []
+
+
+def test_add_db_set():
+    patched = apply(CONTEXT, add_db_set(CONTEXT, "ShopContext", "Product", "Products", "Shop.Models"))
+    assert b"using Shop.Models;" in patched
+    assert b"        public DbSet<Product> Products { get; set; }\n    }" in patched
+    assert add_db_set(patched, "ShopContext", "Product", "Products", "Shop.Models") == []
+    assert add_db_set(CONTEXT, "OtherContext", "Product", "Products") is None
+
+
+@pytest.mark.parametrize("threshold", [1, file_manager.MMAP_THRESHOLD])
+def test_patch_program(tmp_path, monkeypatch, threshold):
+    monkeypatch.setattr(file_manager, "MMAP_THRESHOLD", threshold)
+    path = tmp_path / "Program.cs"
+    path.write_bytes(PROGRAM)
+    statement = "builder.Services.AddScoped<IOrderService, OrderService>();"
+    manager = FileManager(fsync="off")
+    assert manager.patch_file(str(path), lambda data: add_service_registration(data, statement)) == 1
+    assert manager.patch_file(str(path), lambda data: add_service_registration(data, statement)) == 0
@@ -0,0 +1,87 @@
+import difflib
+import random
+
+import pytest
+
+from core import diff
+from core.diff import diff_lines, preview, unified_diff
+
+
+def apply(opcodes, a, b):
+    """Rebuilds 'b' from 'a' with the opcodes, checking that they cover both sides in order."""
+    result = []
+    i = j = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+            result.extend(a[i1:i2])
+        else:
+            result.extend(b[j1:j2])
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+    return result
+
+
+def matched(opcodes):
+    return sum(i2 - i1 for tag, i1, i2, j1, j2 in opcodes if tag == "equal")
+
+
+def random_edit(rng, lines):
+    lines = list(lines)
+    for _ in range(rng.randint(0, 8)):
+        position = rng.randint(0, len(lines))
+        action = rng.random()
+        if action < 0.4:
+            lines.insert(position, f"line {rng.randint(0, 50)}")
+        elif action < 0.8 and position < len(lines):
+            del lines[position]
+        elif position < len(lines):
+            lines[position] = f"changed {rng.randint(0, 50)}"
+    return lines
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_difflib(seed):
+    rng = random.Random(seed)
+    a = [f"line {rng.randint(0, 30)}" for _ in range(rng.randint(0, 60))]
+    b = random_edit(rng, a)
+    opcodes = diff_lines(a, b)
+    assert apply(opcodes, a, b) == b
+    # Myers finds a longest common subsequence, so it never matches fewer lines than difflib
+    assert matched(opcodes) >= matched(difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes())
+
+
+def test_patience_fallback(monkeypatch):
+    monkeypatch.setattr(diff, "MAX_EDIT_DISTANCE", 2)
+    a = ["using System;", "class A", "{", "    int x;", "}", "class B", "{", "    int y;", "}"]
+    b = ["using System;", "class B", "{", "    int y;", "}", "class A", "{", "    int z;", "}"]
+    assert apply(diff_lines(a, b), a, b) == b
+
+
+def test_identical_and_empty():
+    assert diff_lines([], []) == []
+    assert diff_lines(["a"], ["a"]) == [("equal", 0, 1, 0, 1)]
+    assert diff_lines([], ["a"]) == [("insert", 0, 0, 0, 1)]
+    assert diff_lines(["a"], []) == [("delete", 0, 1, 0, 0)]
+
+
+def test_unified_diff_matches_difflib():
+    a = [f"line {i}" for i in range(30)]
+    b = list(a)
+    b[3] = "changed 3"
+    del b[20]
+    b.insert(25, "added")
+    expected = list(difflib.unified_diff(a, b, "old", "new", lineterm=""))
+    assert unified_diff(a, b, "old", "new") == expected
+    assert unified_diff(a, a, "old", "new") == []
+
+
+def test_preview(tmp_path):
+    path = tmp_path / "Product.cs"
+    assert preview(str(path), "class Product { }")["exists"] is False
+    path.write_text("class Product\n{\n}\n")
+    result = preview(str(path), "class Product\n{\n    public int Id { get; set; }\n}\n")
+    assert (result["exists"], result["identical"], result["added"], result["removed"]) == (True, False, 1, 0)
+    assert result["diff"][:2] == ["--- Product.cs (on disk)", "+++ Product.cs (generated)"]
+    assert preview(str(path), "class Product\n{\n}\n")["identical"] is True
@@ -0,0 +1,148 @@
+import os
+
+import pytest
+
+from core import file_manager
+from core.file_manager import FileManager
+
+
+@pytest.fixture
+def manager():
+    return FileManager(fsync="off")
+
+
+def insert_after(marker, text):
+    def make_edits(data):
+        position = data.find(marker)
+        return None if position < 0 else [(position + len(marker), text)]
+    return make_edits
+
+
+@pytest.mark.parametrize("threshold", [1, file_manager.MMAP_THRESHOLD])
+def test_patch_file(manager, tmp_path, monkeypatch, threshold):
+    monkeypatch.setattr(file_manager, "MMAP_THRESHOLD", threshold)
+    path = tmp_path / "ShopContext.cs"
+    path.write_bytes(b"class ShopContext\n{\n}\n")
+    assert manager.patch_file(str(path), insert_after(b"{\n", b"    public DbSet<Product> Products { get; set; }\n")) == 1
+    assert path.read_bytes() == b"class ShopContext\n{\n    public DbSet<Product> Products { get; set; }\n}\n"
+    assert manager.patch_file(str(path), lambda data: []) == 0
+    assert manager.patch_file(str(path), insert_after(b"namespace", b"")) is None
+
+
+def test_patch_file_write_failure_leaves_file(manager, tmp_path, monkeypatch):
+    monkeypatch.setattr(file_manager, "MMAP_THRESHOLD", 1)
+    (tmp_path / "Shop").mkdir()
+    path = tmp_path / "Shop" / "Program.cs"
+    path.write_bytes(b"var app = builder.Build();\n")
+
+    def failing_write(fd, data):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(file_manager.os, "write", failing_write)
+    assert manager.patch_file(str(path), insert_after(b"\n", b"app.Run();\n")) is None
+    monkeypatch.undo()
+    assert path.read_bytes() == b"var app = builder.Build();\n"
+    assert os.listdir(tmp_path / "Shop") == ["Program.cs"]
+
+
+def test_new_files_follow_umask(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_manager, "_umask", None)
+    previous = os.umask(0o027)
+    try:
+        assert FileManager(fsync="off").create_file(str(tmp_path / "Shop" / "Product.cs"), "class Product { }")
+    finally:
+        os.umask(previous)
+    assert (tmp_path / "Shop" / "Product.cs").stat().st_mode & 0o777 == 0o640
+    assert file_manager._umask == 0o027
+
+
+def test_transaction_writes_all(manager, tmp_path):
+    existing = tmp_path / "Shop" / "Models" / "Product.cs"
+    existing.parent.mkdir(parents=True)
+    existing.write_text("class Product { }")
+    created = tmp_path / "Shop" / "Views" / "Products" / "Index.cshtml"
+    with manager.transaction() as transaction:
+        transaction.write(str(existing), "class Product { }")
+        transaction.write(str(created), "<h1>Products</h1>")
+    assert created.read_text() == "<h1>Products</h1>"
+    assert transaction.unchanged == [str(existing)]
+    assert manager.stats["written"] == 1
+
+
+def test_transaction_syncs_each_directory_once(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(file_manager, "_sync_directory", synced.append)
+    files = {str(tmp_path / "Views" / f"Entity{i // 5}" / f"View{i % 5}.cshtml"): "<h1>View</h1>" for i in range(400)}
+    assert FileManager(fsync="file").write_files(files)
+    assert sorted(synced) == sorted({os.path.dirname(path) for path in files})
+
+
+def test_unknown_fsync_policy():
+    with pytest.raises(ValueError):
+        FileManager(fsync="directory")
+
+
+def test_transaction_discards_on_exception(manager, tmp_path):
+    with pytest.raises(RuntimeError):
+        with manager.transaction() as transaction:
+            transaction.write(str(tmp_path / "Product.cs"), "class Product { }")
+            raise RuntimeError("generation failed")
+    assert os.listdir(tmp_path) == []
+
+
+def test_transaction_rolls_back_on_failure(manager, tmp_path, monkeypatch):
+    shop = tmp_path / "Shop"
+    (shop / "Models").mkdir(parents=True)
+    (shop / "Models" / "Product.cs").write_text("class Product { }")
+    files = {
+        str(shop / "Models" / "Product.cs"): "class Product { public int Id { get; set; } }",
+        str(shop / "Controllers" / "ProductsController.cs"): "class ProductsController { }",
+        str(shop / "Views" / "Products" / "Index.cshtml"): "<h1>Products</h1>",
+    }
+    replace = os.replace
+
+    def failing_replace(source, destination):
+        if destination.endswith("Index.cshtml"):
+            raise OSError(28, "No space left on device")
+        return replace(source, destination)
+
+    monkeypatch.setattr(file_manager.os, "replace", failing_replace)
+    assert manager.write_files(files) is False
+    monkeypatch.undo()
+    # The replaced file is back, and the new files, directories, temps and backups are gone
+    assert sorted(os.listdir(shop)) == ["Models"]
+    assert os.listdir(shop / "Models") == ["Product.cs"]
+    assert (shop / "Models" / "Product.cs").read_text() == "class Product { }"
+    # Directories removed by the rollback are created again by the next write
+    assert manager.write_files(files) is True
+    assert (shop / "Views" / "Products" / "Index.cshtml").read_text() == "<h1>Products</h1>"
+
+
+def test_make_directories(manager, tmp_path, monkeypatch):
+    views = tmp_path / "Shop" / "Views"
+    wanted = [str(views / "Products"), str(views / "Orders"), str(views / "Products"), str(views)]
+    created = []
+    assert manager.make_directories(wanted, created) == created
+    # Parents before children, each directory once
+    assert created[:2] == [str(tmp_path / "Shop"), str(views)]
+    assert sorted(created[2:]) == [str(views / "Orders"), str(views / "Products")]
+
+    calls = []
+    mkdir = os.mkdir
+    monkeypatch.setattr(file_manager.os, "mkdir", lambda path, *args: calls.append(path) or mkdir(path, *args))
+    # Known directories and their ancestors cost no system call
+    assert manager.make_directories(wanted + [str(tmp_path)]) == []
+    assert calls == []
+    # An existing parent is never looked at: one mkdir for the new leaf
+    calls.clear()
+    assert manager.make_directories([str(views / "Customers")]) == [str(views / "Customers")]
+    assert calls == [str(views / "Customers")]
+
+
+def test_directory_removed_after_caching(manager, tmp_path):
+    views = tmp_path / "Shop" / "Views"
+    manager.make_directories([str(views)])
+    views.rmdir()
+    # The cache still lists it; the write notices and creates it again
+    assert manager.create_file(str(views / "Index.cshtml"), "<h1>Shop</h1>")
+    assert (views / "Index.cshtml").read_text() == "<h1>Shop</h1>"
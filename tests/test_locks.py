@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from core.file_manager import FileManager
+from core.paths import project_root, user_cache_dir
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_project_root_prefers_solution(tmp_path):
+    (tmp_path / "Shop.sln").write_text("")
+    web = tmp_path / "src" / "Shop.Web"
+    (web / "Views" / "Products").mkdir(parents=True)
+    (web / "Shop.Web.csproj").write_text("<Project />")
+    assert project_root(str(web / "Views" / "Products" / "Index.cshtml")) == str(tmp_path)
+    (tmp_path / "Shop.sln").unlink()
+    assert project_root(str(web / "Views" / "Products" / "Index.cshtml"), {}) == str(web)
+
+
+def test_project_root_outside_projects(tmp_path):
+    assert project_root(str(tmp_path / "notes.txt")) is None
+
+
+def test_write_lock_lives_in_project(project, monkeypatch, tmp_path):
+    first = FileManager()._lock_file(str(project / "Views" / "Products"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "other-cache"))
+    second = FileManager()._lock_file(str(project / "Models"))
+    assert first.path == second.path == str(project / ".synapse" / "locks" / "files.lock")
+
+
+def test_write_lock_outside_projects_uses_user_cache(tmp_path):
+    lock = FileManager()._lock_file(str(tmp_path / "scratch"))
+    assert lock.path == os.path.join(user_cache_dir(), "locks", "files.lock")
+
+
+def test_processes_with_different_caches_share_write_lock(project, tmp_path):
+    target = str(project / "Models" / "Product.cs")
+    holder = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {ROOT!r})
+        from core.file_manager import FileManager
+        with FileManager()._hold({target!r}):
+            print("held", flush=True)
+            sys.stdin.readline()
+    """)
+    env = dict(os.environ, XDG_CACHE_HOME=str(tmp_path / "other-cache"))
+    process = subprocess.Popen([sys.executable, "-c", holder], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, text=True)
+    try:
+        assert process.stdout.readline().strip() == "held"
+        manager = FileManager()
+        lock = manager._lock_file(str(project / "Models"))
+        slot = lock.slot(os.path.normcase(os.path.abspath(target)))
+        assert not lock._try_os_lock(slot)
+    finally:
+        process.communicate("\n", timeout=10)
+    assert lock._try_os_lock(slot)
+    lock._os_unlock(slot)
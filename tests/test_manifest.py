@@ -0,0 +1,42 @@
+import os
+
+from core.file_manager import FileManager
+from core.manifest import CLEAN, EDITED, MISSING, UNTRACKED, Manifest
+
+
+def test_states(project):
+    manifest = Manifest(str(project))
+    path = str(project / "Models" / "Order.cs")
+    assert manifest.state(path) == UNTRACKED
+    manager = FileManager(fsync="off")
+    manager.track(manifest)
+    assert manager.create_file(path, "class Order { }", inputs_hash="v1")
+    assert manifest.state(path) == CLEAN
+    assert manifest.is_current(path, "v1")
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("// hand edit\n")
+    assert manifest.state(path) == EDITED
+    os.unlink(path)
+    assert manifest.state(path) == MISSING
+
+
+def test_interactive_save_clears_inputs(project):
+    manifest = Manifest(str(project))
+    manager = FileManager(fsync="off")
+    manager.track(manifest)
+    path = str(project / "Models" / "Order.cs")
+    manager.create_file(path, "class Order { }", inputs_hash="batch-inputs")
+    # Saved again from an interactive session: other inputs, so not up to date for a batch run
+    manager.create_file(path, "class Order { public int Id { get; set; } }")
+    assert not manifest.is_current(path, "batch-inputs")
+    assert manifest.state(path) == CLEAN
+
+
+def test_saved_entries_survive_reload(project):
+    manifest = Manifest(str(project))
+    manager = FileManager(fsync="off")
+    manager.track(manifest)
+    path = str(project / "Models" / "Order.cs")
+    manager.create_file(path, "class Order { }", inputs_hash="v1")
+    manager.flush()
+    assert Manifest(str(project)).is_current(path, "v1")
@@ -0,0 +1,53 @@
+import pytest
+
+from core.matching import ControllerIndex, match_models, normalize, pluralize, singularize
+
+
+@pytest.mark.parametrize("singular, plural", [
+    ("Product", "Products"),
+    ("Category", "Categories"),
+    ("Status", "Statuses"),
+    ("Box", "Boxes"),
+    ("Branch", "Branches"),
+    ("Day", "Days"),
+    ("Person", "People"),
+    ("OrderItem", "OrderItems"),
+    ("SalesPerson", "SalesPeople"),
+    ("Equipment", "Equipment"),
+])
+def test_inflection(singular, plural):
+    assert pluralize(singular) == plural
+    assert singularize(plural) == singular
+    assert normalize(singular) == normalize(plural)
+
+
+def test_controller_index():
+    index = ControllerIndex(["Categories", "People", "Products"])
+    assert index.find("Category") == "Categories"
+    assert index.find("Person") == "People"
+    assert index.find("Order") is None
+
+
+def test_legacy_plural_controllers():
+    # Controllers generated before pluralization was fixed
+    assert ControllerIndex(["Categorys"]).find("Category") == "Categorys"
+
+
+def test_match_models():
+    done, missing = match_models(["Product", "Category", "Order"], ["Products", "Categories"])
+    assert done == ["Product", "Category"]
+    assert missing == ["Order"]
+
+
+@pytest.mark.parametrize("model", [
+    "Alias", "Lens", "Canvas", "Iris", "Basis", "Class", "Address", "Bus", "Status", "Campus",
+    "House", "Case", "Phase", "Gas",
+])
+def test_generated_controllers_match_s_stems(model):
+    # Whatever singularize() makes of it, the controller generated for a model is found
+    assert ControllerIndex([pluralize(model)]).find(model) == pluralize(model)
+    assert match_models([model], ["Products", pluralize(model)]) == ([model], [])
+
+
+def test_s_stems_do_not_match_other_controllers():
+    assert ControllerIndex(["Aliases"]).find("Alia") is None
@@ -0,0 +1,44 @@
+from core.merge import merge3
+
+BASE = "class Product\n{\n    public int Id { get; set; }\n    public string Name { get; set; }\n}\n"
+
+
+def test_clean_merge():
+    mine = BASE.replace("{\n", "{\n    // Hand-written note\n", 1)
+    theirs = BASE.replace("    public string Name", "    public decimal Price { get; set; }\n    public string Name")
+    merged, conflicts = merge3(BASE, mine, theirs)
+    assert conflicts == 0
+    assert merged == ("class Product\n{\n    // Hand-written note\n    public int Id { get; set; }\n"
+                      "    public decimal Price { get; set; }\n    public string Name { get; set; }\n}\n")
+
+
+def test_one_sided_and_identical_changes():
+    theirs = BASE.replace("int Id", "long Id")
+    assert merge3(BASE, BASE, theirs) == (theirs, 0)
+    assert merge3(BASE, theirs, BASE) == (theirs, 0)
+    assert merge3(BASE, theirs, theirs) == (theirs, 0)
+
+
+def test_conflict_markers():
+    mine = BASE.replace("string Name", "string Title")
+    theirs = BASE.replace("string Name", "string DisplayName")
+    merged, conflicts = merge3(BASE, mine, theirs)
+    assert conflicts == 1
+    assert merged == ("class Product\n{\n    public int Id { get; set; }\n"
+                      "<<<<<<< edited\n    public string Title { get; set; }\n"
+                      "=======\n    public string DisplayName { get; set; }\n"
+                      ">>>>>>> generated\n}\n")
+
+
+def test_conflict_without_final_newline():
+    merged, conflicts = merge3("a\nb", "a\nc", "a\nd", labels=("mine", "theirs"))
+    assert conflicts == 1
+    assert merged == "a\n<<<<<<< mine\nc\n=======\nd\n>>>>>>> theirs\n"
+
+
+def test_inserts_at_the_same_point_conflict():
+    mine = BASE[:-2] + "    public int Stock { get; set; }\n}\n"
+    theirs = BASE[:-2] + "    public bool Active { get; set; }\n}\n"
+    merged, conflicts = merge3(BASE, mine, theirs)
+    assert conflicts == 1
+    assert "public int Stock" in merged and "public bool Active" in merged
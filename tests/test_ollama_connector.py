@@ -0,0 +1,19 @@
+import threading
+
+import pytest
+
+pytest.importorskip("requests")
+
+from connectors.ollama_connector import OllamaConnector
+
+
+def test_one_session_per_thread():
+    connector = OllamaConnector()
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(connector.session)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert connector.session is connector.session
+    assert len({id(session) for session in sessions + [connector.session]}) == 5
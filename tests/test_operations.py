@@ -0,0 +1,44 @@
+from connectors.cached_connector import CachedConnector
+from connectors.errors import ProviderError
+from core import operations
+from core.response_cache import ResponseCache
+
+
+class FailingConnector:
+    """Streams the start of a code block, then fails the way a dropped connection does."""
+    model_name = "failing"
+
+    def stream_text(self, prompt):
+        yield "```csharp\npublic class Product\n{\n"
+        yield "    public int Id { get; set; }\n"
+        raise ProviderError("Communicating with the Ollama API failed: connection reset")
+
+
+def test_generate_code_stops_at_closing_fence(stub):
+    tokens = []
+    code = operations.generate_code(stub, "prompt", tokens.append)
+    assert code == "public class Product { }"
+    assert "".join(tokens) == "public class Product { }\n"
+
+
+def test_generate_code_reports_failure_after_partial_code():
+    tokens = []
+    code = operations.generate_code(FailingConnector(), "prompt", tokens.append)
+    assert code == "Error: Communicating with the Ollama API failed: connection reset"
+
+
+def test_generate_reports_failure_after_partial_text():
+    text = operations.generate(FailingConnector(), "prompt", on_token=lambda chunk: None)
+    assert text.startswith("Error: ")
+
+
+def test_failed_stream_is_not_cached(tmp_path):
+    connector = CachedConnector(FailingConnector(), ResponseCache(str(tmp_path)))
+    assert operations.generate_code(connector, "prompt").startswith("Error")
+    assert connector.cache_key("prompt") not in connector.cache
+
+
+def test_failed_generation_is_not_saved(project):
+    result = operations.create_model(FailingConnector(), str(project), "Order", "string Name", save=True)
+    assert result["code"].startswith("Error") and result["saved"] is False
+    assert not (project / "Models" / "Order.cs").exists()
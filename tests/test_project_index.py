@@ -0,0 +1,58 @@
+from core import project_index
+from core.project_index import ProjectIndex
+
+
+def write_models(project, count):
+    for i in range(count):
+        (project / "Models" / f"Entity{i}.cs").write_text(
+            f"namespace Shop.Models {{ public class Entity{i} {{ public int Id {{ get; set; }} }} }}")
+
+
+def test_parallel_parse_matches_serial(project, tmp_path, monkeypatch, capsys):
+    write_models(project, 40)
+    serial = ProjectIndex(str(project), db_path=str(tmp_path / "serial.db"), workers=1)
+    serial.refresh()
+    monkeypatch.setattr(project_index, "PARALLEL_MIN_FILES", 1)
+    monkeypatch.setattr(project_index, "PARALLEL_MIN_BYTES", 1)
+    parallel = ProjectIndex(str(project), db_path=str(tmp_path / "parallel.db"), workers=2)
+    assert parallel.refresh()["added"] == 41
+    assert parallel.symbols() == serial.symbols()
+    assert "parsing serially" not in capsys.readouterr().out
+
+
+def test_parser_processes_are_not_forked():
+    assert project_index.parser_context().get_start_method() in ("forkserver", "spawn")
+
+
+def test_refresh_counts(project, tmp_path):
+    index = ProjectIndex(str(project), db_path=str(tmp_path / "index.db"), workers=1)
+    assert index.refresh() == {"added": 1, "changed": 0, "removed": 0, "unchanged": 0}
+    write_models(project, 2)
+    (project / "Models" / "Product.cs").unlink()
+    assert index.refresh() == {"added": 2, "changed": 0, "removed": 1, "unchanged": 0}
+    assert index.refresh() == {"added": 0, "changed": 0, "removed": 0, "unchanged": 2}
+
+
+def test_symbol_table_is_cached_until_files_change(project, tmp_path):
+    index = ProjectIndex(str(project), db_path=str(tmp_path / "index.db"), workers=1)
+    index.refresh()
+    table = index.symbol_table()
+    assert index.roles() == {"models": ["Product"], "controllers": []}
+    index.refresh()
+    assert index.symbol_table() is table
+    write_models(project, 1)
+    index.refresh()
+    assert index.symbol_table() is not table
+    assert index.roles()["models"] == ["Entity0", "Product"]
+
+
+def test_symbol_table_follows_other_processes(project, tmp_path):
+    index = ProjectIndex(str(project), db_path=str(tmp_path / "index.db"), workers=1)
+    index.refresh()
+    table = index.symbol_table()
+    write_models(project, 1)
+    # Another process updating the same index file
+    ProjectIndex(str(project), db_path=str(tmp_path / "index.db"), workers=1).refresh()
+    assert index.refresh()["added"] == 0
+    assert index.symbol_table() is not table
+    assert "Entity0" in index.roles()["models"]
@@ -0,0 +1,77 @@
+import pytest
+
+from connectors.cached_connector import CachedConnector
+from core import operations, prompts
+from core.prompts import PromptTemplate, register, render
+from core.response_cache import ResponseCache
+
+
+@pytest.fixture
+def templates(monkeypatch):
+    """A private copy of the registry, so tests can register templates."""
+    monkeypatch.setattr(prompts, "TEMPLATES", dict(prompts.TEMPLATES))
+    return prompts.TEMPLATES
+
+
+def greeting(version, instructions="Say hello."):
+    return PromptTemplate("greeting", version, instructions=instructions, data="Person: {person}\nTitle: {title}")
+
+
+def test_render_puts_instructions_first(templates):
+    register(greeting(1))
+    prompt = render("greeting", person="Ada", title="Dr")
+    assert prompt == "Say hello.\n\nPerson: Ada\nTitle: Dr"
+    assert prompt.cache_tag == "greeting@v1"
+    # Prompts of one template share a byte-identical prefix
+    assert render("greeting", person="Bob", title="Mr").startswith(templates["greeting"].prefix)
+
+
+def test_render_needs_every_field(templates):
+    register(greeting(1))
+    with pytest.raises(KeyError):
+        render("greeting", person="Ada")
+
+
+def test_only_plain_placeholders():
+    with pytest.raises(ValueError):
+        PromptTemplate("bad", 1, instructions="", data="{name!r}")
+    with pytest.raises(ValueError):
+        PromptTemplate("bad", 1, instructions="", data="{user.name}")
+
+
+def test_register_rejects_older_versions(templates):
+    register(greeting(2))
+    with pytest.raises(ValueError):
+        register(greeting(1))
+    assert register(greeting(3)).version == 3
+
+
+def test_version_bump_invalidates_cached_responses(templates, stub, tmp_path):
+    connector = CachedConnector(stub, ResponseCache(str(tmp_path / "responses")))
+    register(greeting(1))
+    connector.generate_text(render("greeting", person="Ada", title="Dr"))
+    connector.generate_text(render("greeting", person="Ada", title="Dr"))
+    assert (stub.calls, connector.hits) == (1, 1)
+    register(greeting(2, instructions="Say hello politely."))
+    connector.generate_text(render("greeting", person="Ada", title="Dr"))
+    assert stub.calls == 2
+    # Same text, new version: still a different cache entry
+    register(greeting(3, instructions="Say hello politely."))
+    connector.generate_text(render("greeting", person="Ada", title="Dr"))
+    assert stub.calls == 3
+
+
+def test_registered_templates_render():
+    prompt = render("model", namespace="Shop.Models", model_name="Order", properties="decimal Total")
+    assert prompt.cache_tag == prompts.get_template("model").cache_tag
+    assert prompt.endswith("Namespace: Shop.Models\nModel Name: Order\nProperties: decimal Total")
+
+
+@pytest.mark.parametrize("view_name", list(prompts.VIEW_INSTRUCTIONS))
+def test_view_prompts_carry_only_their_own_instructions(project, view_name):
+    prompt = operations.build_view_prompt(str(project), "Product", "Name, Price", view_name)
+    assert prompt.cache_tag == f"view_{view_name.lower()}@v{prompts.get_template(f'view_{view_name.lower()}').version}"
+    assert prompts.VIEW_INSTRUCTIONS[view_name] in prompt
+    others = [instruction for name, instruction in prompts.VIEW_INSTRUCTIONS.items() if name != view_name]
+    assert not any(instruction in prompt for instruction in others)
+    assert "@model Shop.Models.Product" in prompt
@@ -0,0 +1,125 @@
+import sqlite3
+
+import pytest
+
+from core import operations, project_index
+from core.project_index import ProjectIndex
+from core.search import SearchIndex
+
+
+def symbols(name, *properties, namespace="Shop.Models"):
+    return [{"kind": "class", "name": name, "namespace": namespace,
+             "properties": [{"name": prop, "type": "int"} for prop in properties]}]
+
+
+@pytest.fixture
+def index(tmp_path):
+    db = sqlite3.connect(str(tmp_path / "search.db"))
+    index = SearchIndex(db)
+    with db:
+        index.add_path("Models/Product.cs", symbols("Product", "Id", "Price"))
+        index.add_path("Models/ProductImage.cs", symbols("ProductImage", "Id", "ProductId"))
+        index.add_path("Areas/Admin/Models/Order.cs", symbols("Order", "Id", "Total"))
+    return index
+
+
+def names(results):
+    return [(result["name"], result["kind"], result["path"]) for result in results]
+
+
+def test_substring_ranking(index):
+    assert names(index.find("product", kinds=["class"])) == [
+        ("Product", "class", "Models/Product.cs"),
+        ("ProductImage", "class", "Models/ProductImage.cs"),
+    ]
+    assert [result["name"] for result in index.find("roduc")][:2] == ["Product", "ProductId"]
+
+
+def test_short_query_and_folders(index):
+    assert names(index.find("id")) == [("Id", "property", path) for path in
+                                       ("Areas/Admin/Models/Order.cs", "Models/Product.cs", "Models/ProductImage.cs")] + [
+        ("ProductId", "property", "Models/ProductImage.cs")]
+    assert names(index.find("admin/id")) == [("Id", "property", "Areas/Admin/Models/Order.cs")]
+
+
+def test_fuzzy(index):
+    assert index.find("Prodcut") == []
+    assert [result["name"] for result in index.find("Prodcut", fuzzy=True)][:1] == ["Product"]
+
+
+def test_remove_and_replace_paths(index):
+    with index._db:
+        index.remove_path("Areas/Admin/Models/Order.cs")
+        index.add_path("Models/Product.cs", symbols("Article", "Id"))
+    assert index.find("order") == index.find("total") == index.find("price") == []
+    assert names(index.find("article")) == [("Article", "class", "Models/Product.cs")]
+    # 'Id' is still used by ProductImage.cs, the 'Product' class is gone
+    assert names(index.find("id", kinds=["property"])) == [
+        ("Id", "property", "Models/Product.cs"), ("Id", "property", "Models/ProductImage.cs"),
+        ("ProductId", "property", "Models/ProductImage.cs")]
+    assert names(index.find("product", kinds=["class"])) == [("ProductImage", "class", "Models/ProductImage.cs")]
+    assert len(index) == 6
+
+
+def test_index_is_stored_with_the_project_index(project, tmp_path, monkeypatch):
+    db_path = str(tmp_path / "index.db")
+    ProjectIndex(str(project), db_path=db_path, workers=1).refresh()
+    # A new process queries the stored trigrams; nothing is parsed or built
+    monkeypatch.setattr(project_index, "parse_chunk", None)
+    fresh = ProjectIndex(str(project), db_path=db_path, workers=1)
+    assert names(fresh.search("product", kinds=["class"])) == [("Product", "class", "Models/Product.cs")]
+
+
+def test_search_follows_changes(project, tmp_path):
+    index = ProjectIndex(str(project), db_path=str(tmp_path / "index.db"), workers=1)
+    index.refresh()
+    (project / "Models" / "Order.cs").write_text("namespace Shop.Models { public class Order { public int Total { get; set; } } }")
+    (project / "Models" / "Product.cs").unlink()
+    index.refresh()
+    assert names(index.search("order", kinds=["class"])) == [("Order", "class", "Models/Order.cs")]
+    assert index.search("product") == []
+
+
+def test_search_tables_are_built_for_an_existing_index(project, tmp_path):
+    db_path = str(tmp_path / "index.db")
+    ProjectIndex(str(project), db_path=db_path, workers=1).refresh()
+    db = sqlite3.connect(db_path)
+    with db:
+        db.execute("DELETE FROM search_entries")
+        db.execute("DELETE FROM meta WHERE key = 'search_version'")
+    db.close()
+    index = ProjectIndex(str(project), db_path=db_path, workers=1)
+    assert names(index.search("product", kinds=["class"])) == [("Product", "class", "Models/Product.cs")]
+
+
+def test_lookups_share_one_scan(project, monkeypatch):
+    scans = []
+    scan_project = project_index.scan_project
+    monkeypatch.setattr(project_index, "scan_project", lambda path: scans.append(path) or scan_project(path))
+    for query in ("p", "pr", "pro", "prod"):
+        assert operations.find_symbols(str(project), query)
+    operations.find_references(str(project), "Product")
+    assert len(scans) == 1
+
+
+def test_references_are_matched_per_controller(project):
+    (project / "Controllers").mkdir()
+    (project / "Controllers" / "Controllers.cs").write_text("""
+namespace Shop.Controllers
+{
+    public class ProductsController : Controller
+    {
+        public IActionResult Index() => View(new List<Product>());
+    }
+
+    // Mentions Product only in a comment
+    public class AliasesController : Controller
+    {
+        public string Name => "Product";
+    }
+}
+""")
+    (project / "Controllers" / "AdminController.cs").write_text(
+        "public class AdminController : CrudController<Product> { }")
+    references = operations.find_references(str(project), "Product")
+    assert sorted(reference["controller"] for reference in references) == ["AdminController", "ProductsController"]
@@ -0,0 +1,135 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from connectors.cached_connector import CachedConnector
+from core.response_cache import ResponseCache
+from core.server import create_server, validate_params
+
+
+@pytest.fixture
+def connector(stub, tmp_path):
+    return CachedConnector(stub, ResponseCache(str(tmp_path / "responses")))
+
+
+@pytest.fixture
+def server(connector):
+    server = create_server(connector, port=0, workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.pool.shutdown()
+
+
+def url(server, path):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{path}"
+
+
+def request(server, method, path, body=None):
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(url(server, path), data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def wait_for(server, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, job = request(server, "GET", f"/jobs/{job_id}")
+        assert status == 200
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def model_job(project):
+    return {"project_path": str(project), "model_name": "product", "properties": "string Name"}
+
+
+def test_health(server):
+    status, body = request(server, "GET", "/health")
+    assert status == 200
+    assert body["status"] == "ok" and body["workers"] == 2
+
+
+def test_submit_and_poll(server, project):
+    status, body = request(server, "POST", "/models", model_job(project))
+    assert status == 202 and body["job_id"]
+    job = wait_for(server, body["job_id"])
+    assert job["status"] == "done"
+    assert job["result"]["code"] == "public class Product { }"
+    assert job["result"]["file_path"].endswith("Product.cs")
+    assert job["result"]["saved"] is False
+
+
+def test_failed_job_reports_error(server, tmp_path):
+    status, body = request(server, "POST", "/models", model_job(tmp_path / "missing"))
+    assert status == 202
+    job = wait_for(server, body["job_id"])
+    assert job["status"] == "failed"
+    assert "does not exist" in job["error"]
+
+
+def test_events_stream(server, project):
+    _, body = request(server, "POST", "/models", model_job(project))
+    with urllib.request.urlopen(url(server, f"/jobs/{body['job_id']}/events"), timeout=10) as response:
+        assert response.headers["Content-Type"] == "text/event-stream"
+        stream = response.read().decode("utf-8")
+    events = []
+    for block in stream.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    names = [name for name, _ in events]
+    assert names[0] == "status" and names[-1] == "end"
+    assert "".join(data for name, data in events if name == "token") == "public class Product { }\n"
+    assert ("status", "done") in events
+    assert events[-1][1]["result"]["code"] == "public class Product { }"
+
+
+@pytest.mark.parametrize("path, body, message", [
+    ("/models", {"project_path": "x", "model_name": "Product"}, "Missing field(s): properties."),
+    ("/controllers", {"project_path": "x", "model_name": "Product", "color": "red"}, "Unknown field(s): color."),
+    ("/analysis", ["project_path"], "Request body must be a JSON object."),
+])
+def test_rejects_bad_requests(server, path, body, message):
+    status, response = request(server, "POST", path, body)
+    assert status == 400
+    assert response["error"] == message
+
+
+def test_rejects_invalid_json(server):
+    req = urllib.request.Request(url(server, "/models"), data=b"{not json", method="POST")
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(req, timeout=10)
+    assert error.value.code == 400
+
+
+def test_unknown_routes(server):
+    assert request(server, "POST", "/widgets", {})[0] == 404
+    assert request(server, "GET", "/jobs/nope")[0] == 404
+
+
+def test_validate_params():
+    assert validate_params("analysis", {"project_path": "x"}) is None
+    assert validate_params("views", {"project_path": "x", "model_name": "P", "properties": "", "views": ["Index"]}) is None
+    assert validate_params("model", {}) == "Missing field(s): project_path, model_name, properties."
+
+
+def test_repeated_job_is_served_from_cache(server, connector, stub, project):
+    first = wait_for(server, request(server, "POST", "/models", model_job(project))[1]["job_id"])
+    second = wait_for(server, request(server, "POST", "/models", model_job(project))[1]["job_id"])
+    assert first["result"]["code"] == second["result"]["code"] == "public class Product { }"
+    assert stub.calls == 1
+    assert connector.hits == 1 and connector.misses == 1
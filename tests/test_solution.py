@@ -0,0 +1,68 @@
+import pytest
+
+from core.project_index import ProjectIndex
+from core.solution import glob_pattern, load_graph
+
+CSPROJ = """<Project Sdk="Microsoft.NET.Sdk.Web">
+  <PropertyGroup><RootNamespace>Shop.Web</RootNamespace></PropertyGroup>
+  <ItemGroup>
+    <Compile Remove="Legacy\\**;Models\\*.Designer.cs" />
+    <Compile Remove="$(BaseIntermediateOutputPath)\\**" />
+  </ItemGroup>
+</Project>
+"""
+
+OLD_STYLE = """<Project ToolsVersion="15.0" xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+    <Compile Include="Models\\Product.cs" />
+    <Compile Include="Controllers\\**\\*.cs" />
+  </ItemGroup>
+</Project>
+"""
+
+
+@pytest.mark.parametrize("path, matched", [
+    ("Legacy/Product.cs", True),
+    ("Legacy/Deep/Order.cs", True),
+    ("Models/Form.Designer.cs", True),
+    ("Models/Sub/Form.Designer.cs", False),
+    ("Models/Product.cs", False),
+])
+def test_glob_pattern(path, matched):
+    assert bool(glob_pattern(["Legacy/**;Models/*.Designer.cs"]).match(path)) == matched
+
+
+def test_glob_pattern_skips_properties():
+    assert glob_pattern(["$(OutDir)/**", " "]) is None
+    assert glob_pattern(["**/*.cs"]).match("Product.cs")
+
+
+def test_compile_remove(project):
+    (project / "Shop.csproj").write_text(CSPROJ)
+    graph = load_graph(str(project))
+    assert graph.namespace_for("Models") == "Shop.Web.Models"
+    assert graph.compiles("Models/Product.cs")
+    assert not graph.compiles("Legacy/Old/Product.cs")
+    assert not graph.compiles("Models/Product.Designer.cs")
+
+
+def test_explicit_compile_include(project):
+    (project / "Shop.csproj").unlink()
+    (project / "Shop.csproj").write_text(OLD_STYLE)
+    graph = load_graph(str(project))
+    assert graph.compiles("Models/Product.cs")
+    assert graph.compiles("Controllers/Admin/ProductsController.cs")
+    assert not graph.compiles("Models/Order.cs")
+
+
+def test_index_leaves_out_removed_sources(project, tmp_path):
+    (project / "Shop.csproj").write_text(CSPROJ)
+    (project / "Legacy").mkdir()
+    (project / "Legacy" / "Product.cs").write_text("namespace Shop.Legacy { public class Product { } }")
+    (project / "Views").mkdir()
+    (project / "Views" / "Index.cshtml").write_text("<h1>Shop</h1>")
+    index = ProjectIndex(str(project), db_path=str(tmp_path / "index.db"), workers=1)
+    index.refresh()
+    assert sorted(index.files()) == ["Models/Product.cs", "Views/Index.cshtml"]
+    index.update_paths(["Legacy/Product.cs"])
+    assert "Legacy/Product.cs" not in index.files()
@@ -0,0 +1,88 @@
+import sqlite3
+import sys
+import time
+
+import pytest
+
+from core import watcher
+from core.project_index import ProjectIndex
+from core.watcher import ProjectWatcher
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def model_names(index):
+    return [declared["name"] for symbols in index.symbols().values() for declared in symbols]
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watched(request, project, tmp_path, monkeypatch):
+    if request.param == "inotify" and not sys.platform.startswith("linux"):
+        pytest.skip("inotify is Linux only")
+    if request.param == "polling":
+        monkeypatch.setattr(watcher.sys, "platform", "polling")
+    index = ProjectIndex(str(project), db_path=str(tmp_path / "index.db"), workers=1)
+    project_watcher = ProjectWatcher(str(project), index=index, debounce=0.05, poll_interval=0.05)
+    assert project_watcher.start() == request.param
+    yield project_watcher
+    project_watcher.stop()
+
+
+def test_create_modify_delete(watched, project):
+    index = watched.index
+    assert index.live
+    assert model_names(index) == ["Product"]
+
+    order = project / "Models" / "Order.cs"
+    order.write_text("namespace Shop.Models { public class Order { public int Id { get; set; } } }")
+    assert wait_for(lambda: "Models/Order.cs" in index.files())
+    assert "Order" in index.roles()["models"]
+
+    order.write_text("namespace Shop.Models { public class PurchaseOrder { public int Id { get; set; } } }")
+    assert wait_for(lambda: "PurchaseOrder" in model_names(index))
+
+    order.unlink()
+    assert wait_for(lambda: "Models/Order.cs" not in index.files())
+    assert model_names(index) == ["Product"]
+    assert index.live
+
+
+def test_failed_update_is_retried(watched, project, monkeypatch):
+    index = watched.index
+    calls = []
+    update_paths, refresh = index.update_paths, index.refresh
+
+    def fail_once(update):
+        def wrapper(*args):
+            calls.append(update.__name__)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return update(*args)
+        return wrapper
+
+    monkeypatch.setattr(index, "update_paths", fail_once(update_paths))
+    monkeypatch.setattr(index, "refresh", fail_once(refresh))
+    (project / "Models" / "Order.cs").write_text("namespace Shop.Models { public class Order { } }")
+    assert wait_for(lambda: "Models/Order.cs" in index.files())
+    assert index.live and watched.is_alive()
+
+
+def test_watcher_gives_up_and_clears_live(watched, project, monkeypatch, capsys):
+    index = watched.index
+
+    def broken(*args):
+        raise sqlite3.DatabaseError("database disk image is malformed")
+
+    monkeypatch.setattr(index, "update_paths", broken)
+    monkeypatch.setattr(index, "refresh", broken)
+    (project / "Models" / "Order.cs").write_text("namespace Shop.Models { public class Order { } }")
+    assert wait_for(lambda: not watched.is_alive())
+    assert not index.live
+    assert "Stopped watching" in capsys.readouterr().out
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from connectors.cached_connector import CachedConnector
+from core.response_cache import ResponseCache
+from core.workspace import Workspace, load_workspace
+
+
+@pytest.fixture
+def billing(tmp_path):
+    root = tmp_path / "Billing"
+    (root / "Models").mkdir(parents=True)
+    (root / "Billing.csproj").write_text('<Project Sdk="Microsoft.NET.Sdk.Web"></Project>\n')
+    (root / "Models" / "Invoice.cs").write_text("namespace Billing.Models { public class Invoice { public int Id { get; set; } } }")
+    return root
+
+
+def write_workspace(tmp_path, definition):
+    path = tmp_path / "workspace.json"
+    path.write_text(json.dumps(definition))
+    return str(path)
+
+
+def test_load_workspace(tmp_path, project, billing):
+    path = write_workspace(tmp_path, {
+        "context_name": "AppDbContext", "artifacts": ["model"],
+        "projects": ["Shop", {"project_path": "./Billing", "artifacts": ["views"], "entities": [{"name": "Payment"}]}],
+    })
+    projects = load_workspace(path)["projects"]
+    assert projects == [
+        {"project_path": str(project), "entities": [], "context_name": "AppDbContext", "artifacts": ["model"]},
+        {"project_path": str(billing), "artifacts": ["views"], "entities": [{"name": "Payment"}], "context_name": "AppDbContext"},
+    ]
+
+
+@pytest.mark.parametrize("definition, message", [
+    ({"projects": []}, "non-empty 'projects'"),
+    ({"projects": [{"entities": []}]}, "needs a 'project_path'"),
+])
+def test_load_workspace_errors(tmp_path, definition, message):
+    assert message in load_workspace(write_workspace(tmp_path, definition))["error"]
+    assert "not found" in load_workspace(str(tmp_path / "missing.json"))["error"]
+
+
+def test_plans_share_provider_and_cache(tmp_path, stub, project, billing):
+    connector = CachedConnector(stub, ResponseCache(str(tmp_path / "responses")))
+    projects = load_workspace(write_workspace(tmp_path, {
+        "artifacts": ["model"],
+        "projects": [{"project_path": "Shop", "entities": [{"name": "Order"}]},
+                     {"project_path": "Billing", "entities": [{"name": "Payment"}, {"name": "Refund"}]},
+                     "Shop"],
+    }))["projects"]
+    with Workspace(connector, projects, workers=2, fsync="off") as workspace:
+        plans = workspace.plan()
+        # Projects without entities are analysed only
+        assert [plan["project_path"] for plan in plans] == [str(project), str(billing)]
+        results = workspace.run(plans)
+    assert [result["saved"] for result in results] == [1, 2]
+    assert (project / "Models" / "Order.cs").exists() and (billing / "Models" / "Refund.cs").exists()
+    assert stub.calls == 3
+    with Workspace(connector, projects) as workspace:
+        states = [job["state"] for plan in workspace.plan() for job in plan["jobs"]]
+    assert states == ["up-to-date"] * 3
+
+
+def test_analyze_every_project(stub, project, billing):
+    stub.reply = "All good."
+    with Workspace(stub, [{"project_path": str(project), "entities": []},
+                          {"project_path": str(billing), "entities": []}], workers=2) as workspace:
+        results = workspace.analyze()
+    assert results[str(project)]["missing"] == ["Product"]
+    assert results[str(billing)]["missing"] == ["Invoice"]
+    assert results[str(billing)]["summary"] == "All good."
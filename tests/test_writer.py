@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from core.file_manager import FileManager
+from core.writer import BackgroundWriter
+
+
+@pytest.fixture
+def writer():
+    writer = BackgroundWriter(FileManager(fsync="off"), workers=1, queue_size=1).start()
+    yield writer
+    writer.close()
+
+
+def test_writes_and_reports_unchanged(writer, tmp_path):
+    path = str(tmp_path / "Views" / "Index.cshtml")
+    done = []
+    assert writer.write(path, "<h1>Shop</h1>", on_done=lambda ok, unchanged: done.append((ok, unchanged))).result(5)
+    assert writer.write(path, "<h1>Shop</h1>", on_done=lambda ok, unchanged: done.append((ok, unchanged))).result(5)
+    assert done == [(True, []), (True, [path])]
+    assert writer.written == 1
+
+
+def test_submit_blocks_while_queue_is_full(writer, tmp_path):
+    release = threading.Event()
+    writer.write(str(tmp_path / "a.cs"), "a", on_done=lambda ok, unchanged: release.wait(5))
+    # Wait until the writer thread is busy, then fill the single queue slot
+    while writer.queued():
+        time.sleep(0.01)
+    writer.write(str(tmp_path / "b.cs"), "b")
+    submitted = threading.Event()
+    thread = threading.Thread(target=lambda: (writer.write(str(tmp_path / "c.cs"), "c"), submitted.set()))
+    thread.start()
+    assert not submitted.wait(0.2)
+    release.set()
+    assert submitted.wait(5)
+    thread.join()
+
+
+def test_failed_write(writer, tmp_path):
+    (tmp_path / "Views").write_text("not a directory")
+    future = writer.submit({str(tmp_path / "Views" / "Index.cshtml"): "<h1>Shop</h1>"})
+    assert future.result(5) is False
+    assert writer.failures == [([str(tmp_path / "Views" / "Index.cshtml")], "write failed and was rolled back")]
+
+
+def test_failing_callback_keeps_the_writer_running(writer, tmp_path):
+    def broken(ok, unchanged):
+        raise KeyError("entity")
+
+    assert writer.write(str(tmp_path / "a.cs"), "a", on_done=broken).result(5)
+    # Two more than the queue holds: only a live thread gets them through
+    futures = [writer.write(str(tmp_path / f"{name}.cs"), name) for name in "bcd"]
+    assert all(future.result(5) for future in futures)
+    assert writer.failures == [([str(tmp_path / "a.cs")], "on_done failed: KeyError: 'entity'")]
+
+
+def test_close(tmp_path):
+    writer = BackgroundWriter(FileManager(fsync="off"), workers=2).start()
+    for i in range(10):
+        writer.write(str(tmp_path / "Shop" / f"{i}.cs"), str(i))
+    assert writer.close() == []
+    assert len(list((tmp_path / "Shop").iterdir())) == 10
+    with pytest.raises(RuntimeError):
+        writer.write(str(tmp_path / "late.cs"), "late")